@@ -0,0 +1,53 @@
+"""
+Construction time and per-instance memory of a ~170 material spec, as generated by `make_dataclass`
+(how Materials used to be built), `make_material_spec` and `make_array_spec`.
+
+    python -m benchmarks.bench_materials
+"""
+import timeit
+import tracemalloc
+from dataclasses import field, make_dataclass
+from functools import partial
+
+from satisfactory_tools.core.material import MaterialSpec, make_array_spec, make_material_spec
+
+MATERIALS = [f"material_{i}" for i in range(170)]
+# a typical recipe touches a handful of materials
+AMOUNTS = {MATERIALS[3]: 2.0, MATERIALS[40]: 1.0, MATERIALS[99]: 4.0}
+INSTANCES = 10_000
+
+
+def _spec_types() -> dict[str, type[MaterialSpec]]:
+    return {
+        "make_dataclass": make_dataclass("Materials",
+                                         [(name, float, field(default=0)) for name in MATERIALS],
+                                         bases=(MaterialSpec,), frozen=True),
+        "make_material_spec": make_material_spec("Materials", MATERIALS),
+        "make_array_spec": make_array_spec("Materials", MATERIALS),
+    }
+
+
+def _memory(spec_type: type[MaterialSpec]) -> float:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    specs = [spec_type(**{name: value + i for name, value in AMOUNTS.items()})
+             for i in range(INSTANCES)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del specs
+    return used / INSTANCES
+
+
+def main() -> None:
+    print(f"{'factory':<20}{'construct (us)':>16}{'from_array (us)':>17}{'bytes/instance':>16}")
+    for name, spec_type in _spec_types().items():
+        values = spec_type(**AMOUNTS).to_array()
+        number = 20_000
+        construct = timeit.timeit(partial(spec_type, **AMOUNTS), number=number) / number * 1e6
+        from_array = (timeit.timeit(partial(spec_type.from_array, values), number=number)
+                      / number * 1e6)
+        print(f"{name:<20}{construct:>16.2f}{from_array:>17.2f}{_memory(spec_type):>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
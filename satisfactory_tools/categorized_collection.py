@@ -1,32 +1,150 @@
+from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Generic, Iterable, TypeVar
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import reduce
+from operator import and_, or_
+from typing import Any, Generic, Iterable, Iterator, TypeVar
 
+import numpy as np
 from typing_extensions import Self
 
 K = TypeVar("K")
 V = TypeVar("V")
 
 
+def _bit_indices(bits: int) -> np.ndarray:
+    """
+    Positions of the set bits of a non-negative int, in increasing order.
+    """
+    if not bits:
+        return np.empty(0, dtype=np.intp)
+
+    data = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder="little"))
+
+
+class TagQuery(ABC):
+    """
+    Boolean expression over tags, built from `Tag` with `&`, `|` and `~`. Queries are hashable so
+    collections can cache their results.
+    """
+    __slots__ = ()
+
+    def __and__(self, other: "TagQuery | str") -> "TagQuery":
+        return And(_operands(And, self, other))
+
+    def __or__(self, other: "TagQuery | str") -> "TagQuery":
+        return Or(_operands(Or, self, other))
+
+    def __rand__(self, other: str) -> "TagQuery":
+        return And(_operands(And, other, self))
+
+    def __ror__(self, other: str) -> "TagQuery":
+        return Or(_operands(Or, other, self))
+
+    def __invert__(self) -> "TagQuery":
+        return Not(self)
+
+    @abstractmethod
+    def evaluate(self, collection: "CategorizedCollection[Any, Any]") -> int:
+        """
+        Bitset of the IDs in `collection` that match, before restricting to keys that have a value.
+        """
+
+
+@dataclass(frozen=True, slots=True)
+class Tag(TagQuery):
+    name: str
+
+    def evaluate(self, collection: "CategorizedCollection[Any, Any]") -> int:
+        return collection._tags.get(self.name, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class And(TagQuery):
+    operands: tuple[TagQuery, ...]
+
+    def evaluate(self, collection: "CategorizedCollection[Any, Any]") -> int:
+        return reduce(and_, (collection._evaluate(operand) for operand in self.operands),
+                      collection._present)
+
+
+@dataclass(frozen=True, slots=True)
+class Or(TagQuery):
+    operands: tuple[TagQuery, ...]
+
+    def evaluate(self, collection: "CategorizedCollection[Any, Any]") -> int:
+        return reduce(or_, (collection._evaluate(operand) for operand in self.operands), 0)
+
+
+@dataclass(frozen=True, slots=True)
+class Not(TagQuery):
+    operand: TagQuery
+
+    def evaluate(self, collection: "CategorizedCollection[Any, Any]") -> int:
+        return collection._present & ~collection._evaluate(self.operand)
+
+
+def as_query(query: TagQuery | str) -> TagQuery:
+    return Tag(query) if isinstance(query, str) else query
+
+
+def _operands(kind: type[And | Or], *queries: TagQuery | str) -> tuple[TagQuery, ...]:
+    # flatten nested operations of the same kind, so a & b & c is evaluated as one reduction
+    operands: list[TagQuery] = []
+    for query in map(as_query, queries):
+        operands.extend(query.operands if isinstance(query, kind) else (query,))
+    return tuple(operands)
+
+
 class CategorizedCollection(Generic[K, V]):
     """
     Class  that stores a dictionary and categories for each of its items. This allows
     access to items directly, as well as by category.
+
+    Each key gets an integer ID in insertion order, and each tag is a bitset of IDs held in a Python
+    int, so intersections and counts are word-parallel. `tag` and `query` return read-only views
+    over the collection rather than copies. Query results are cached until the tags or keys change.
     """
     _values: dict[K, V]
-    # tags maps tags to keys, inverse maps keys to tags
-    _tags: dict[str, set[K]]
+    # key -> ID and ID -> key, for every key that has a value or a tag
+    _ids: dict[K, int]
+    _keys: list[K]
+    # bitset of the IDs that have a value
+    _present: int
+    # tags maps tags to bitsets of IDs, inverse maps keys to tags
+    _tags: dict[str, int]
     _inverse_tags: dict[K, set[str]]
+    _query_cache: dict[TagQuery, int]
 
     def __init__(self, items: dict[K, V] | None = None, tags: dict[str, set[K]] | None = None):
-        self._tags = defaultdict(set)
+        self._values = {}
+        self._ids = {}
+        self._keys = []
+        self._present = 0
+        self._tags = {}
         self._inverse_tags = defaultdict(set)
-        if tags is not None:
-            self._tags.update(tags)
-            for tag, keys in tags.items():
-                for key in keys:
-                    self._inverse_tags[key].add(tag)
+        self._query_cache = {}
+
+        for key, value in (items or {}).items():
+            self[key] = value
+
+        for tag, keys in (tags or {}).items():
+            self._tags.setdefault(tag, 0)
+            for key in keys:
+                self.set_tag(key, tag)
 
-        self._values = items or {}
+    def _id(self, key: K) -> int:
+        if (key_id := self._ids.get(key)) is None:
+            key_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return key_id
+
+    def _evaluate(self, query: TagQuery) -> int:
+        if (bits := self._query_cache.get(query)) is None:
+            bits = self._query_cache[query] = query.evaluate(self)
+        return bits
 
     def keys(self) -> Iterable[K]:
         yield from self._values.keys()
@@ -37,41 +155,142 @@ class CategorizedCollection(Generic[K, V]):
     def values(self) -> Iterable[V]:
         yield from self._values.values()
 
-    def update(self, other: Self) -> None:
-        self._values.update(dict(other.items()))
+    def update(self, other: "Self | CategorizedView[K, V]") -> None:
+        for key, value in other.items():
+            self[key] = value
 
         for tag, keys in other.tags.items():
             for key in keys:
                 self.set_tag(key, tag)
 
     def set_tag(self, key: K, tag: str) -> None:
-        self._tags[tag].add(key)
+        bits = self._tags.get(tag, 0)
+        self._tags[tag] = bits | (1 << self._id(key))
         self._inverse_tags[key].add(tag)
+        if self._tags[tag] != bits:
+            self._query_cache.clear()
 
     def __getitem__(self, key: K) -> V:
         return self._values[key]
 
     def __setitem__(self, key: K, value: V) -> None:
+        if key not in self._values:
+            self._present |= 1 << self._id(key)
+            self._query_cache.clear()
         self._values[key] = value
 
     def __contains__(self, key: K) -> bool:
         return key in self._values
 
+    def __len__(self) -> int:
+        return len(self._values)
+
     @property
-    def tags(self) -> dict[str, set[K]]:
-        return self._tags
+    def tags(self) -> Mapping[str, "CategorizedView[K, V]"]:
+        return _TagViews(self)
 
     def value_tags(self, key: K) -> set[str]:
         return self._inverse_tags[key]
 
-    def tag(self, tag: str) -> Self:
-        value_keys = self._tags[tag]
-        inverse_tags = {v: self._inverse_tags[v] for v in value_keys}
-        tags_dict = defaultdict(set)
-        for k, value_set in inverse_tags.items():
-            for v in value_set:
-                tags_dict[v].add(k)
+    def tag(self, tag: str) -> "CategorizedView[K, V]":
+        return CategorizedView(self, Tag(tag))
+
+    def query(self, query: TagQuery | str) -> "CategorizedView[K, V]":
+        """
+        View of the items matching `query`, e.g. `Tag("Assembler") & Tag("alternate") &
+        ~Tag("Rubber")`. Negation is relative to the items of the collection.
+        """
+        return CategorizedView(self, as_query(query))
+
+
+class CategorizedView(Generic[K, V]):
+    """
+    Read-only view of the items of a CategorizedCollection that match a tag query. Views follow
+    later changes to the collection; the query is evaluated once per change of the collection.
+    """
+    __slots__ = ("_collection", "_query")
+
+    _collection: CategorizedCollection[K, V]
+    _query: TagQuery
+
+    def __init__(self, collection: CategorizedCollection[K, V], query: TagQuery) -> None:
+        self._collection = collection
+        self._query = query
+
+    def _bits(self) -> int:
+        return self._collection._present & self._collection._evaluate(self._query)
+
+    def __iter__(self) -> Iterator[K]:
+        keys = self._collection._keys
+        for key_id in _bit_indices(self._bits()).tolist():
+            yield keys[key_id]
+
+    def keys(self) -> Iterable[K]:
+        yield from self
+
+    def items(self) -> Iterable[tuple[K, V]]:
+        values = self._collection._values
+        for key in self:
+            yield key, values[key]
+
+    def values(self) -> Iterable[V]:
+        values = self._collection._values
+        for key in self:
+            yield values[key]
+
+    def __len__(self) -> int:
+        return self._bits().bit_count()
+
+    def __contains__(self, key: K) -> bool:
+        key_id = self._collection._ids.get(key)
+        return key_id is not None and bool(self._bits() >> key_id & 1)
+
+    def __getitem__(self, key: K) -> V:
+        if key not in self:
+            raise KeyError(key)
+        return self._collection._values[key]
+
+    @property
+    def tags(self) -> Mapping[str, "CategorizedView[K, V]"]:
+        return _TagViews(self._collection, self)
+
+    def value_tags(self, key: K) -> set[str]:
+        if key not in self:
+            raise KeyError(key)
+        return self._collection.value_tags(key)
+
+    def tag(self, tag: str) -> "CategorizedView[K, V]":
+        return CategorizedView(self._collection, self._query & Tag(tag))
+
+    def query(self, query: TagQuery | str) -> "CategorizedView[K, V]":
+        return CategorizedView(self._collection, self._query & query)
+
+
+class _TagViews(Mapping[str, CategorizedView[K, V]]):
+    """
+    Tags of a collection, each mapped to a view of its items. Restricted to a view, only the tags
+    that have at least one of the view's items.
+    """
+    __slots__ = ("_bits", "_collection", "_within")
+
+    def __init__(self, collection: CategorizedCollection[K, V],
+                 within: CategorizedView[K, V] | None = None) -> None:
+        self._collection = collection
+        self._within = None if within is None else within._query
+        self._bits = None if within is None else within._bits()
+
+    def _has(self, tag: str) -> bool:
+        tag_bits = self._collection._tags.get(tag)
+        return tag_bits is not None and (self._bits is None or bool(tag_bits & self._bits))
+
+    def __getitem__(self, tag: str) -> CategorizedView[K, V]:
+        if not self._has(tag):
+            raise KeyError(tag)
+        query = Tag(tag) if self._within is None else self._within & Tag(tag)
+        return CategorizedView(self._collection, query)
 
-        values_dict = {k: self._values[k] for k in value_keys}
+    def __iter__(self) -> Iterator[str]:
+        return (tag for tag in self._collection._tags if self._has(tag))
 
-        return type(self)(values_dict, tags_dict)
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -1,25 +1,40 @@
-import json
-import re
-from dataclasses import dataclass, make_dataclass, field
-
-from categorized_collection import CategorizedCollection
-from config_parsing.machines import MachineData, parse_machines
-from config_parsing.materials import parse_materials
-from config_parsing.recipes import RecipeData, parse_recipes
-from core.material import MaterialSpec
-from core.process import ProcessNode
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from satisfactory_tools.categorized_collection import CategorizedCollection
+from satisfactory_tools.config.cache import (
+    DEFAULT_CACHE_DIR,
+    ParsedConfig,
+    load_parsed_config,
+    source_digest,
+    store_parsed_config,
+)
+from satisfactory_tools.config.machines import (
+    BUILDABLE_KEYS,
+    EXTRACTOR_KEYS,
+    GENERATOR_KEYS,
+    Machines,
+    parse_machines,
+)
+from satisfactory_tools.config.materials import RESOURCE_KEYS, MaterialMetadata, parse_materials
+from satisfactory_tools.config.reader import native_class_key, read_sections
+from satisfactory_tools.config.recipes import RECIPE_KEY, RecipeData, RecipeTable, parse_recipes
+from satisfactory_tools.config.standardization import standardize
+from satisfactory_tools.core.material import ArrayMaterialSpec, MaterialSpec, make_material_spec
+from satisfactory_tools.core.process import ProcessNode
+
+# NativeClass sections read by the parsers
+CONFIG_KEYS = (*RESOURCE_KEYS, *BUILDABLE_KEYS, *EXTRACTOR_KEYS, *GENERATOR_KEYS, RECIPE_KEY)
 
 
 def simplify_config(game_config: list[dict[..., ...]]) -> dict[str, ...]:
     simple_config = {}
-    native_class_pattern = r".*\.(\w+)'?"
 
     for config in game_config:
-        if not (match := re.match(native_class_pattern, config["NativeClass"])):
+        if (key := native_class_key(config["NativeClass"])) is None:
             continue
 
-        key = match.group(1)
-
         simple_config[key] = {item["ClassName"]: item for item in config["Classes"]}
 
     return simple_config
@@ -27,30 +42,54 @@ def simplify_config(game_config: list[dict[..., ...]]) -> dict[str, ...]:
 
 @dataclass
 class Config:
-    recipes: CategorizedCollection[str, ProcessNode]
-    materials: MaterialSpec
+    recipes: RecipeTable
+    materials: type[MaterialSpec]
+    machines: Machines | None = None
+    material_metadata: list[MaterialMetadata] = field(default_factory=list)
 
 
-def parse_config(config_path: str, encoding="utf-16"):
-    with open(config_path, "r", encoding=encoding) as f:
-        config_data = simplify_config(json.loads(f.read()))
-        materials = parse_materials(config_data)
-        machines = parse_machines(config_data)
-        recipes = parse_recipes(config_data)
+def _parse(config_path: str | Path, encoding: str) -> ParsedConfig:
+    config_data = read_sections(config_path, CONFIG_KEYS, encoding)
 
-        # TODO: pydantic class to have aliases
-        materials = make_dataclass("Materials",
-                                   [(material.display_name, float, field(default=0)) for material in materials],
-                                   bases=(MaterialSpec,), frozen=True)
+    materials = parse_materials(config_data)
+    # number recipe materials in the order of the Materials fields
+    recipes = parse_recipes(config_data, [material.class_name for material in materials])
 
-    return Config(materials=materials, recipes=recipes)
+    return ParsedConfig(materials=materials, machines=parse_machines(config_data), recipes=recipes)
 
 
-def _make_recipe_data(recipes: CategorizedCollection, machines: dict) -> CategorizedCollection:
+def parse_config(config_path: str | Path, encoding="utf-16",
+                 cache_dir: str | Path | None = DEFAULT_CACHE_DIR):
+    """
+    Parse Docs.json. The parsed data is cached in `cache_dir` under a hash of the file and the
+    parser version, so later starts skip parsing until the file changes. Pass `cache_dir=None` to
+    always parse.
+    """
+    parsed = None
+    if cache_dir is not None:
+        digest = source_digest(config_path, encoding)
+        parsed = load_parsed_config(cache_dir, digest)
+
+    if parsed is None:
+        parsed = _parse(config_path, encoding)
+        if cache_dir is not None:
+            store_parsed_config(cache_dir, digest, parsed)
+
+    # TODO: pydantic class to have aliases
+    # display names contain spaces and dashes, which are not valid field names
+    names = [standardize(material.display_name) for material in parsed.materials]
+    materials = make_material_spec("Materials", names, metadata=parsed.materials)
+
+    return Config(materials=materials, recipes=parsed.recipes, machines=parsed.machines,
+                  material_metadata=parsed.materials)
+
+
+def _make_recipe_data(recipes: CategorizedCollection[str, Any],
+                      machines: dict[str, Any]) -> CategorizedCollection[str, RecipeData]:
     """
     expects recipes to be tagged with the machine keys that they can be constructed by.
     """
-    recipe_data = CategorizedCollection()
+    recipe_data: CategorizedCollection[str, RecipeData] = CategorizedCollection()
      # TODO: there are some shortcomings with this CategorizedCollection and managing tags
 
     for machine_name, machine_type in machines.items():
@@ -62,5 +101,11 @@ def _make_recipe_data(recipes: CategorizedCollection, machines: dict) -> Categor
     return recipe_data
 
 
-def _make_process_node(recipe: RecipeData, machines: list[MachineData]):
-    ...
+def make_process_nodes(config: Config, spec_type: type[ArrayMaterialSpec]) -> list[ProcessNode]:
+    """
+    ProcessNodes of every recipe made in one of the config's producing machines, built from the
+    recipe table's CSR rows. `spec_type` needs one material per column of
+    `config.recipes.materials`.
+    """
+    machines = None if config.machines is None else config.machines.producers
+    return config.recipes.process_nodes(spec_type, machines)
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+from satisfactory_tools.config.machines import Machines
+from satisfactory_tools.config.materials import MaterialMetadata
+from satisfactory_tools.config.recipes import RecipeTable
+
+# bump whenever parsing changes what is produced from the same Docs.json, so stale entries are
+# ignored
+PARSER_VERSION = 2
+
+DEFAULT_CACHE_DIR = (Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+                     / "satisfactory_tools")
+
+
+@dataclass
+class ParsedConfig:
+    """
+    Everything parsed out of Docs.json, before any classes are generated from it. Recipes keep the
+    class names of the machines they are produced in.
+    """
+    materials: list[MaterialMetadata]
+    machines: Machines
+    recipes: RecipeTable
+
+
+def source_digest(config_path: str | Path, encoding: str) -> str:
+    """
+    Digest of the config file's bytes, its encoding and the parser version.
+    """
+    digest = hashlib.blake2b(f"{PARSER_VERSION}\0{encoding}\0".encode(), digest_size=20)
+    with open(config_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _path(cache_dir: Path, digest: str) -> Path:
+    return cache_dir / f"config-{digest}.pkl"
+
+
+def load_parsed_config(cache_dir: str | Path, digest: str) -> ParsedConfig | None:
+    """
+    The cached parse stored under `digest`, or None if there is none or it cannot be read.
+    """
+    path = _path(Path(cache_dir), digest)
+    try:
+        with path.open("rb") as f:
+            parsed = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        # missing, truncated, or written by code whose classes have since moved
+        return None
+
+    return parsed if isinstance(parsed, ParsedConfig) else None
+
+
+def store_parsed_config(cache_dir: str | Path, digest: str, parsed: ParsedConfig) -> None:
+    """
+    Store a parse under `digest`. Failing to write the cache is not an error, the next start parses
+    again.
+    """
+    cache_dir = Path(cache_dir)
+    path = _path(cache_dir, digest)
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # write then rename, so a concurrent reader never sees a partial entry
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        with temporary.open("wb") as f:
+            pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+        temporary.replace(path)
+    except OSError:
+        pass
@@ -2,8 +2,8 @@ import itertools
 from dataclasses import dataclass, fields
 from enum import Enum
 
-from config_parsing.standardization import ConfigData
-from core.material import MaterialSpec
+from satisfactory_tools.config.standardization import ConfigData
+from satisfactory_tools.core.material import MaterialSpec, TupleMaterialSpec
 
 RESOURCE_KEYS = ("FGItemDescriptor",
                  "FGResourceDescriptor",
@@ -28,6 +28,8 @@ class MaterialMetadata(ConfigData):
 
 
 def get_material_metadata(material_spec: type[MaterialSpec]) -> list[MaterialMetadata]:
+    if issubclass(material_spec, TupleMaterialSpec):
+        return list(material_spec.field_metadata())
     return [f.metadata[__file__] for f in fields(material_spec)]
 
 
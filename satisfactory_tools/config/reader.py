@@ -0,0 +1,77 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterable
+
+# start of a top-level entry of Docs.json, up to its Classes array. Quotes inside JSON strings are
+# escaped, so this cannot match string contents; only top-level entries have a NativeClass key.
+_SECTION = re.compile(r'\{\s*"NativeClass"\s*:\s*"((?:[^"\\]|\\.)*)"\s*,\s*"Classes"\s*:')
+_NON_WHITESPACE = re.compile(r"\S")
+_NATIVE_CLASS = re.compile(r".*\.(\w+)'?")
+
+
+def native_class_key(native_class: str) -> str | None:
+    """
+    Short name of a NativeClass, e.g. FGRecipe for
+    "/Script/CoreUObject.Class'/Script/FactoryGame.FGRecipe'".
+    """
+    match = _NATIVE_CLASS.match(native_class)
+    return match.group(1) if match else None
+
+
+def read_sections(config_path: str | Path, keys: Iterable[str], encoding: str = "utf-16",
+                  chunk_size: int = 1 << 16) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    The classes of the NativeClass sections named in `keys`, keyed by ClassName, as
+    `simplify_config` returns them for the whole document. The file is decoded `chunk_size`
+    characters at a time and other sections are skipped without being decoded into objects, so
+    memory is bounded by the wanted sections.
+    """
+    keys = frozenset(keys)
+    decoder = json.JSONDecoder()
+    sections: dict[str, dict[str, dict[str, Any]]] = {}
+
+    with open(config_path, encoding=encoding) as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        while True:
+            match = _SECTION.search(buffer, position)
+            if match is None:
+                if eof:
+                    break
+                # keep a header that may have been cut off by the end of the chunk
+                buffer = buffer[max(position, buffer.rfind("{")):]
+                position = 0
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+
+            key = native_class_key(json.loads(f'"{match.group(1)}"'))
+            if key not in keys:
+                position = match.end()
+                continue
+
+            while True:
+                # the Classes array may start past the end of what has been read so far
+                first = _NON_WHITESPACE.search(buffer, match.end())
+                start = len(buffer) if first is None else first.start()
+                try:
+                    classes, end = decoder.raw_decode(buffer, start)
+                    break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # read at least as much again as is buffered, so retries stay linear in the
+                    # section size
+                    chunk = f.read(max(chunk_size, len(buffer)))
+                    eof = not chunk
+                    buffer += chunk
+
+            sections[key] = {item["ClassName"]: item for item in classes}
+            buffer = buffer[end:]
+            position = 0
+
+    return sections
@@ -1,7 +1,14 @@
 import re
 from dataclasses import dataclass
+from typing import Iterable, Iterator
 
-from config_parsing.standardization import ConfigData, get_class_name
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from satisfactory_tools.config.machines import MachineData
+from satisfactory_tools.config.standardization import ConfigData, get_class_name
+from satisfactory_tools.core.material import ArrayMaterialSpec, SparseMaterialSpec
+from satisfactory_tools.core.process import ProcessNode
 
 RECIPE_KEY = "FGRecipe"
 
@@ -17,27 +24,230 @@ class RecipeData(ConfigData):
     # TODO: power modifiers
 
 
-def parse_recipes(simple_config: dict[str, ...]) -> list[RecipeData]:
-    resource_capture_group = r".*\.(\w+).*?"
-    ingredients_pattern = rf"\(ItemClass={resource_capture_group},Amount=(\d+)\)"
-    recipes = []
+class RecipeTable:
+    """
+    Recipes stored by column rather than as one RecipeData each. Materials, recipes and machines are
+    interned to integer IDs, their index in `materials`, `class_names` and `machine_names`, and
+    amounts are recipes x materials CSR matrices: `input_amounts` and `output_amounts` per cycle,
+    `inputs` and `outputs` per minute. `process_nodes` turns the per-minute rows into ProcessNodes
+    for the solvers, and `recipe` builds the RecipeData of a single recipe on demand.
+    """
+    __slots__ = ("class_names", "display_names", "durations", "input_amounts", "inputs",
+                 "machine_names", "machines", "material_index", "materials", "output_amounts",
+                 "outputs", "recipe_index")
 
-    for config in simple_config[RECIPE_KEY].values():
-        recipe_name = config["mDisplayName"]
+    materials: tuple[str, ...]
+    material_index: dict[str, int]
+    class_names: tuple[str, ...]
+    display_names: tuple[str, ...]
+    recipe_index: dict[str, int]
+    # minutes per cycle
+    durations: np.ndarray
+    input_amounts: csr_matrix
+    output_amounts: csr_matrix
+    inputs: csr_matrix
+    outputs: csr_matrix
+    machine_names: tuple[str, ...]
+    # recipes x machines, true where a machine produces a recipe
+    machines: csr_matrix
+
+    def __init__(self, materials: Iterable[str], class_names: Iterable[str],
+                 display_names: Iterable[str], durations: np.ndarray, input_amounts: csr_matrix,
+                 output_amounts: csr_matrix, machine_names: Iterable[str],
+                 machines: csr_matrix) -> None:
+        self.materials = tuple(materials)
+        self.material_index = {material: i for i, material in enumerate(self.materials)}
+        self.class_names = tuple(class_names)
+        self.display_names = tuple(display_names)
+        self.recipe_index = {class_name: i for i, class_name in enumerate(self.class_names)}
+        self.durations = np.asarray(durations, dtype=np.float64)
+        self.input_amounts = input_amounts
+        self.output_amounts = output_amounts
+        self.machine_names = tuple(machine_names)
+        self.machines = machines
+
+        # recipes without a duration, e.g. ones made by hand, have no rate
+        per_minute = np.divide(1, self.durations, out=np.zeros_like(self.durations),
+                               where=self.durations > 0)
+        self.inputs = _scale_rows(input_amounts, per_minute)
+        self.outputs = _scale_rows(output_amounts, per_minute)
+
+    def __len__(self) -> int:
+        return len(self.class_names)
+
+    def __iter__(self) -> Iterator[RecipeData]:
+        for i in range(len(self)):
+            yield self.recipe(i)
+
+    def __getitem__(self, recipe: int | str) -> RecipeData:
+        return self.recipe(recipe)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RecipeTable):
+            return NotImplemented
+
+        return (self.materials == other.materials and self.class_names == other.class_names
+                and self.display_names == other.display_names
+                and self.machine_names == other.machine_names
+                and np.array_equal(self.durations, other.durations)
+                and all((getattr(self, name) != getattr(other, name)).nnz == 0
+                        for name in ("input_amounts", "output_amounts", "machines")))
+
+    # mutable sparse arrays, equal tables need not stay equal
+    __hash__ = None  # type: ignore[assignment]
+
+    def index(self, recipe: int | str) -> int:
+        return recipe if isinstance(recipe, int) else self.recipe_index[recipe]
+
+    @property
+    def net(self) -> csr_matrix:
+        """
+        Outputs less inputs per minute.
+        """
+        return self.outputs - self.inputs
+
+    def recipe(self, recipe: int | str) -> RecipeData:
+        """
+        RecipeData of a recipe, by row or class name, with amounts per cycle.
+        """
+        row = self.index(recipe)
+
+        def amounts(matrix: csr_matrix) -> dict[str, float]:
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            columns, values = matrix.indices[start:end].tolist(), matrix.data[start:end].tolist()
+            return {self.materials[column]: value for column, value in zip(columns, values)}
+
+        start, end = self.machines.indptr[row], self.machines.indptr[row + 1]
+        return RecipeData(display_name=self.display_names[row], class_name=self.class_names[row],
+                          inputs=amounts(self.input_amounts), outputs=amounts(self.output_amounts),
+                          duration=float(self.durations[row]),
+                          machines={self.machine_names[i]
+                                    for i in self.machines.indices[start:end].tolist()})
+
+
+    def process_nodes(self, spec_type: type[ArrayMaterialSpec] | type[SparseMaterialSpec],
+                      machines: Iterable[MachineData] | None = None) -> list[ProcessNode]:
+        """
+        One ProcessNode per recipe, with per-minute amounts, as specs of `spec_type`'s sparse
+        counterpart. Its materials must be the table's `materials`, in order. The specs wrap slices
+        of the CSR rows directly, without building dense arrays. With `machines`, only recipes
+        produced in one of them are included, taking their power from the first such machine;
+        without, every recipe that has a duration is included, without power.
+        """
+        sparse_type = spec_type.sparse_type()
+        if len(sparse_type.material_names()) != len(self.materials):
+            raise ValueError(f"{spec_type.__name__} has {len(sparse_type.material_names())} "
+                             f"materials, the table has {len(self.materials)}.")
+
+        machine_rows = None
+        if machines is not None:
+            by_name = {machine.class_name: machine for machine in machines}
+            machine_rows = [by_name.get(name) for name in self.machine_names]
 
-        ingredients = {name: float(amt) for name, amt in re.findall(ingredients_pattern, config["mIngredients"])}
-        products = {name: float(amt) for name, amt in re.findall(ingredients_pattern, config["mProduct"])}
+        # one conversion of the whole index arrays, each spec is a view into them
+        input_indices = self.inputs.indices.astype(np.intp)
+        output_indices = self.outputs.indices.astype(np.intp)
+        nodes = []
+        for row in range(len(self)):
+            if self.durations[row] <= 0:
+                continue
 
-        duration = float(config["mManufactoringDuration"]) / 60  # seconds to minutes
-        machines = set(get_class_name(machine) for machine in config["mProducedIn"].strip("()").split(","))
+            power_production = power_consumption = 0.0
+            if machine_rows is not None:
+                start, end = self.machines.indptr[row], self.machines.indptr[row + 1]
+                machine = next((machine_rows[i] for i in self.machines.indices[start:end].tolist()
+                                if machine_rows[i] is not None), None)
+                if machine is None:
+                    continue
+                power_production = machine.power_production
+                power_consumption = machine.power_consumption
 
-        recipes.append(RecipeData(
-            display_name=config["mDisplayName"],
-            class_name=config.get("mClassName") or config["ClassName"],
-            inputs=ingredients,
-            outputs=products,
-            machines=machines,
-            duration=duration))
+            start, end = self.inputs.indptr[row], self.inputs.indptr[row + 1]
+            inputs = sparse_type._wrap(input_indices[start:end], self.inputs.data[start:end])
+            start, end = self.outputs.indptr[row], self.outputs.indptr[row + 1]
+            outputs = sparse_type._wrap(output_indices[start:end], self.outputs.data[start:end])
+            nodes.append(ProcessNode(self.display_names[row], inputs, outputs, power_production,
+                                     power_consumption))
+
+        return nodes
+
+
+def _scale_rows(matrix: csr_matrix, factors: np.ndarray) -> csr_matrix:
+    # each stored value is scaled by the factor of its row, keeping the sparsity structure
+    data = matrix.data * np.repeat(factors, np.diff(matrix.indptr))
+    return csr_matrix((data, matrix.indices, matrix.indptr), shape=matrix.shape)
+
+
+class _Interner:
+    """
+    Dense integer IDs for strings, in order of first appearance.
+    """
+    __slots__ = ("ids",)
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.ids: dict[str, int] = {}
+        for name in names:
+            self(name)
+
+    def __call__(self, name: str) -> int:
+        return self.ids.setdefault(name, len(self.ids))
+
+
+class _CSRBuilder:
+    """
+    Rows of a CSR matrix appended one at a time.
+    """
+    __slots__ = ("data", "indices", "indptr")
+
+    def __init__(self) -> None:
+        self.indptr = [0]
+        self.indices: list[int] = []
+        self.data: list[float] = []
+
+    def append(self, row: dict[int, float]) -> None:
+        for column in sorted(row):
+            self.indices.append(column)
+            self.data.append(row[column])
+        self.indptr.append(len(self.indices))
+
+    def build(self, width: int, dtype: type = np.float64) -> csr_matrix:
+        return csr_matrix((np.array(self.data, dtype=dtype), np.array(self.indices, dtype=np.int32),
+                           np.array(self.indptr, dtype=np.int32)),
+                          shape=(len(self.indptr) - 1, width))
+
+
+def parse_recipes(simple_config: dict[str, ...], materials: Iterable[str] = ()) -> RecipeTable:
+    """
+    Parse every FGRecipe into a RecipeTable. `materials` are class names to number first, so that
+    the table's first columns line up with e.g. the fields of a Materials class; materials only seen
+    in recipes are numbered after them.
+    """
+    # class paths contain no commas, which keeps each match inside one (ItemClass=...,Amount=...)
+    # item
+    resource_capture_group = r"[^,]*\.(\w+)[^,]*"
+    ingredients_pattern = re.compile(rf"\(ItemClass={resource_capture_group},Amount=(\d+)\)")
+
+    material_ids = _Interner(materials)
+    machine_ids = _Interner()
+    class_names, display_names, durations = [], [], []
+    input_amounts, output_amounts, machines = _CSRBuilder(), _CSRBuilder(), _CSRBuilder()
+
+    for config in simple_config[RECIPE_KEY].values():
+        # later entries of a material win, as when parsing into a dict
+        input_amounts.append({material_ids(name): float(amt)
+                              for name, amt in ingredients_pattern.findall(config["mIngredients"])})
+        output_amounts.append({material_ids(name): float(amt)
+                               for name, amt in ingredients_pattern.findall(config["mProduct"])})
+        machines.append({machine_ids(get_class_name(machine)): True
+                         for machine in config["mProducedIn"].strip("()").split(",")})
 
-    return recipes
+        class_names.append(config.get("mClassName") or config["ClassName"])
+        display_names.append(config["mDisplayName"])
+        durations.append(float(config["mManufactoringDuration"]) / 60)  # seconds to minutes
 
+    width = len(material_ids.ids)
+    return RecipeTable(materials=material_ids.ids, class_names=class_names,
+                       display_names=display_names, durations=np.array(durations),
+                       input_amounts=input_amounts.build(width),
+                       output_amounts=output_amounts.build(width), machine_names=machine_ids.ids,
+                       machines=machines.build(len(machine_ids.ids), dtype=bool))
@@ -0,0 +1,268 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Mapping
+
+import networkx as nx
+import numpy as np
+from scipy.optimize import linprog
+
+from satisfactory_tools.core.material import MaterialSpec
+from satisfactory_tools.core.optimizer import (
+    INFEASIBLE,
+    MACHINE_PENALTY,
+    OPTIMAL,
+    UNBOUNDED,
+    Sensitivity,
+    Solution,
+    constraint_matrix,
+)
+from satisfactory_tools.core.process_index import ProcessIndex
+
+if TYPE_CHECKING:
+    from satisfactory_tools.core.process import ProcessNode
+
+# slack below which a material balance counts as tight
+TOLERANCE = 1e-9
+
+
+@dataclass
+class _Component:
+    """
+    Strongly connected component of the producer -> consumer graph. Cyclic components keep the rows
+    and lower bounds of the LP that planned them, to price their materials afterwards.
+    """
+    nodes: list["ProcessNode"]
+    cyclic: bool
+    rows: np.ndarray | None = None
+    row_lower: np.ndarray | None = None
+
+
+def _components(index: ProcessIndex, nodes: list["ProcessNode"]) -> list[_Component]:
+    """
+    Components of the given nodes in topological order, producers before consumers.
+    """
+    members = set(nodes)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from((producer, consumer) for producer, consumer, _ in index.edges()
+                         if producer in members and consumer in members)
+
+    condensed = nx.condensation(graph)
+    position = {node: i for i, node in enumerate(nodes)}
+    components = []
+    for component in nx.topological_sort(condensed):
+        component_nodes = sorted(condensed.nodes[component]["members"], key=position.__getitem__)
+        cyclic = len(component_nodes) > 1 or graph.has_edge(component_nodes[0], component_nodes[0])
+        components.append(_Component(component_nodes, cyclic))
+
+    return components
+
+
+def _single_producers(nodes: Iterable["ProcessNode"]) -> dict[int, "ProcessNode"] | None:
+    """
+    The producer of each material, or None if some material has more than one, which leaves a choice
+    between recipes to the LP.
+    """
+    producers: dict[int, "ProcessNode"] = {}
+    for node in nodes:
+        for material in node.output_materials.nonzero()[0].tolist():
+            if material in producers:
+                return None
+            producers[material] = node
+    return producers
+
+
+def _net(node: "ProcessNode") -> np.ndarray:
+    return node.output_materials.to_array() - node.input_materials.to_array()
+
+
+def _solve_component(component: _Component, need: np.ndarray,
+                     producers: Mapping[int, "ProcessNode"],
+                     costs: np.ndarray) -> tuple[np.ndarray | None, int, str, np.ndarray | None]:
+    """
+    LP over a cyclic component: its materials as rows, with what the rest of the plan still needs of
+    them as lower bounds. Inputs from outside the component are left to the components upstream.
+    """
+    matrix, materials = constraint_matrix(component.nodes)
+    members = set(component.nodes)
+    keep = np.array([producers.get(material) in members for material in materials.tolist()],
+                    dtype=bool)
+
+    component.rows = materials[keep]
+    component.row_lower = need[component.rows].copy()
+    result = linprog(c=costs, bounds=(0, None), A_ub=matrix[keep] * -1,
+                     b_ub=component.row_lower * -1, method="highs")
+
+    if result.status != OPTIMAL:
+        return None, result.status, result.message, None
+    return result.x, OPTIMAL, result.message, -result.ineqlin.marginals
+
+
+def _sweep(nodes: list["ProcessNode"], index: ProcessIndex, producers: Mapping[int, "ProcessNode"],
+           need: np.ndarray,
+           costs: np.ndarray) -> tuple[np.ndarray | None, int, str, list[_Component]]:
+    """
+    Back-propagate `need` from consumers to producers. Each material has one producer, which must
+    make at least what is still needed of it, so every node is scaled to its smallest feasible
+    value. `need` is updated in place to what remains needed, negative for surplus.
+    """
+    columns = {node: i for i, node in enumerate(nodes)}
+    scales = np.zeros(len(nodes))
+    components = _components(index, nodes)
+
+    for component in reversed(components):
+        if component.cyclic:
+            component_costs = costs[[columns[node] for node in component.nodes]]
+            x, status, message, _ = _solve_component(component, need, producers, component_costs)
+            if x is None:
+                return None, status, message, components
+        else:
+            (node,) = component.nodes
+            outputs, amounts = node.output_materials.nonzero()
+            x = [max(0.0, float(np.max(need[outputs] / amounts)))] if len(outputs) else [0.0]
+
+        for node, scale in zip(component.nodes, x):
+            scales[columns[node]] = scale
+            need -= scale * _net(node)
+
+    if np.any(need > TOLERANCE * np.maximum(1, np.abs(need))):
+        return (None, INFEASIBLE, "Some materials are needed but neither produced nor available.",
+                components)
+
+    return scales, OPTIMAL, "Solved by topological sweep.", components
+
+
+def _sensitivity(nodes: list["ProcessNode"], components: list[_Component], need: np.ndarray,
+                 producers: Mapping[int, "ProcessNode"], costs: np.ndarray) -> Sensitivity:
+    """
+    Shadow prices from producers to consumers: each used node breaks even on one material whose
+    balance is tight, and materials with surplus are free. Cyclic components are priced by
+    re-solving their LP with the prices of their outside inputs added to their costs.
+    """
+    columns = {node: i for i, node in enumerate(nodes)}
+    prices = np.zeros(len(need))
+    tight = need > -TOLERANCE * np.maximum(1, np.abs(need))
+
+    for component in components:
+        if component.cyclic:
+            members = set(component.nodes)
+            component_costs = []
+            for node in component.nodes:
+                inputs, amounts = node.input_materials.nonzero()
+                outside = np.array([producers.get(material) not in members
+                                    for material in inputs.tolist()], dtype=bool)
+                component_costs.append(costs[columns[node]]
+                                       + prices[inputs[outside]] @ amounts[outside])
+            planned = np.zeros(len(need))
+            planned[component.rows] = component.row_lower
+            _, _, _, duals = _solve_component(component, planned, producers,
+                                              np.array(component_costs))
+            prices[component.rows] = duals
+            continue
+
+        (node,) = component.nodes
+        outputs, amounts = node.output_materials.nonzero()
+        binding = [i for i, material in enumerate(outputs.tolist()) if tight[material]]
+        if not binding:
+            continue
+
+        inputs, input_amounts = node.input_materials.nonzero()
+        value = costs[columns[node]] + prices[inputs] @ input_amounts
+        output = max(binding, key=lambda i: amounts[i])
+        prices[outputs[output]] = value / amounts[output]
+
+    materials = np.arange(len(need))
+    sensitivity = Sensitivity(nodes=nodes, materials=materials, shadow_prices=prices,
+                              reduced_costs=np.empty(0))
+    sensitivity.reduced_costs = np.array([sensitivity.price(node, costs[columns[node]])
+                                          for node in nodes])
+    return sensitivity
+
+
+def topological_plan(process_nodes: "Iterable[ProcessNode] | ProcessIndex",
+                     target_output: MaterialSpec, available_materials: MaterialSpec | None = None,
+                     costs: Mapping["ProcessNode", float] | None = None,
+                     default_cost: float = 1) -> Solution | None:
+    """
+    `minimize_input` without the full LP, for node sets where every material has a single producer
+    and every node a positive cost. The producer -> consumer graph is condensed into strongly
+    connected components: acyclic ones are scaled by back-propagating demand, like
+    `ProcessNode.__rshift__`, and only each cyclic component, e.g. a recycling loop, gets a small
+    LP. The plan is the least feasible one, and so optimal for any positive costs. Returns None for
+    node sets that need the full LP.
+    """
+    index = ProcessIndex.of(process_nodes)
+    costs = costs or {}
+    eligible = index.eligible(target_output.nonzero()[0].tolist())
+    nodes = [node for node in index if node in eligible]
+
+    producers = _single_producers(nodes)
+    node_costs = np.array([costs.get(node, default_cost) for node in nodes], dtype=np.float64)
+    if producers is None or np.any(node_costs <= 0):
+        return None
+
+    need = target_output.to_array().astype(np.float64)
+    if available_materials is not None:
+        need = need - available_materials.to_array()
+
+    scales, status, message, components = _sweep(nodes, index, producers, need, node_costs)
+    if scales is None:
+        return Solution(nodes=nodes, scales=np.full(len(nodes), np.nan), objective=np.nan,
+                        status=status, message=message)
+
+    return Solution(nodes=nodes, scales=scales, objective=float(node_costs @ scales), status=status,
+                    message=message,
+                    sensitivity=_sensitivity(nodes, components, need, producers, node_costs))
+
+
+def topological_output_plan(process_nodes: "Iterable[ProcessNode] | ProcessIndex",
+                            available_materials: MaterialSpec, target_output: MaterialSpec,
+                            costs: Mapping["ProcessNode", float] | None = None,
+                            default_cost: float = MACHINE_PENALTY) -> Solution | None:
+    """
+    `maximize_output` without the full LP, under the conditions of `topological_plan` and when no
+    node produces an available material. The least plan for one multiple of the target scales
+    linearly, so the output is limited by whichever available material runs out first. Without a
+    sensitivity report.
+    """
+    index = ProcessIndex.of(process_nodes)
+    costs = costs or {}
+    eligible = index.eligible(target_output.nonzero()[0].tolist())
+    nodes = [node for node in index if node in eligible]
+
+    producers = _single_producers(nodes)
+    node_costs = np.array([costs.get(node, default_cost) for node in nodes], dtype=np.float64)
+    supplied = available_materials.nonzero()[0].tolist()
+    if (producers is None or np.any(node_costs <= 0)
+            or any(material in producers for material in supplied)):
+        return None
+
+    # one multiple of the target, with available materials in unlimited supply
+    need = target_output.to_array().astype(np.float64)
+    need[supplied] = -np.inf
+    unit_scales, _, _, _ = _sweep(nodes, index, producers, need.copy(), node_costs)
+
+    if unit_scales is None:
+        # nothing can be made from what is available
+        return Solution(nodes=nodes, scales=np.zeros(len(nodes)), objective=0.0, status=OPTIMAL,
+                        message="Solved by topological sweep.", output_scale=0.0)
+
+    consumed = -sum((scale * _net(node) for node, scale in zip(nodes, unit_scales)),
+                    np.zeros(len(need)))
+    # target materials taken straight from the available ones limit the output like node inputs
+    consumed[supplied] += target_output.to_array()[supplied]
+    limits = [available_materials.to_array()[material] / consumed[material] for material in supplied
+              if consumed[material] > TOLERANCE]
+    unit_objective = float(node_costs @ unit_scales) - 1
+
+    if unit_objective >= 0:
+        output_scale = 0.0
+    elif not limits:
+        return Solution(nodes=nodes, scales=np.full(len(nodes), np.nan), objective=np.nan,
+                        status=UNBOUNDED,
+                        message="Output is not limited by any available material.")
+    else:
+        output_scale = min(limits)
+
+    return Solution(nodes=nodes, scales=unit_scales * output_scale,
+                    objective=unit_objective * output_scale, status=OPTIMAL,
+                    message="Solved by topological sweep.", output_scale=output_scale)
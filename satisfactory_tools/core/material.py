@@ -1,23 +1,75 @@
-from dataclasses import dataclass, fields
+import keyword
+import sys
+from abc import ABCMeta, abstractmethod
+from dataclasses import FrozenInstanceError, dataclass, fields
 from functools import singledispatchmethod
 from numbers import Number
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Iterable, TypeGuard
 
+import numpy as np
+from scipy.sparse import csr_matrix
 from typing_extensions import Self
 
+try:
+    # C accessor used by namedtuple, reads the tuple item directly rather than through __getitem__
+    from _collections import _tuplegetter
+except ImportError:
+    def _tuplegetter(index: int, doc: str) -> property:
+        return property(lambda self: tuple.__getitem__(self, index), doc=doc)
+
 
 class _SignalClass:
     """
     Used for single dispatch on Self type
     """
+    __slots__ = ()
+
+
+# material names of each dataclass MaterialSpec, fields() is too slow to call per from_array
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
 
 @dataclass(frozen=True)
 class MaterialSpec(_SignalClass):
+    __slots__ = ()
 
     @classmethod
     def empty(cls) -> Self:
         return cls()
 
+    @classmethod
+    def material_names(cls) -> tuple[str, ...]:
+        """
+        Material names in field order, which is also the order used by `to_array` and `from_array`.
+        """
+        names = _FIELD_NAMES.get(cls)
+        if names is None:
+            names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+        return names
+
+    @classmethod
+    def from_array(cls, values: Iterable[float]) -> Self:
+        return cls(**dict(zip(cls.material_names(), map(float, values))))
+
+    def to_array(self) -> np.ndarray:
+        return np.fromiter((value for _, value in self), dtype=np.float64,
+                           count=len(self.material_names()))
+
+    def nonzero(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Indices, in `material_names` order, and values of the non-zero materials.
+        """
+        values = self.to_array()
+        indices = np.flatnonzero(values)
+        return indices, values[indices]
+
+    def to_csr(self) -> csr_matrix:
+        """
+        Single row sparse matrix with one column per material.
+        """
+        indices, values = self.nonzero()
+        return csr_matrix((values, indices, [0, len(indices)]),
+                          shape=(1, len(self.material_names())))
+
     def __lt__(self, other: Number) -> Self:
         """
         Return a MaterialSpec where values less than the given number are kept and remaining values set to
@@ -76,17 +128,17 @@ class MaterialSpec(_SignalClass):
             result[name] = value - getattr(other, name)
         return type(self)(**result)
 
-    def __mul__(self, scalar: Number) -> Self:
+    def __mul__(self, scalar: float) -> Self:
         result = {}
         for name, value in self:
             result[name] = value * scalar
         return type(self)(**result)
 
-    def __rmul__(self, scalar: Number) -> Self:
+    def __rmul__(self, scalar: float) -> Self:
         return self * scalar 
 
     @singledispatchmethod
-    def __truediv__(self, other: Any) -> Number | Self:
+    def __truediv__(self, other: Any) -> float | Self:
         return NotImplemented
 
     @__truediv__.register
@@ -98,18 +150,18 @@ class MaterialSpec(_SignalClass):
         return type(self)(**result)
 
     @__truediv__.register(_SignalClass)
-    def _(self, other: Self) -> Number:
+    def _(self, other: Self) -> float:
         if all(value == 0 for _, value in other):
             raise ZeroDivisionError("Cannot divide by empty MaterialSpec.")
 
         return min(getattr(self, name) / value for name, value in other if value > 0)
 
     @singledispatchmethod
-    def __floordiv__(self, other: Any) -> int | Self:
+    def __floordiv__(self, other: Any) -> float | Self:
         return NotImplemented
 
     @__floordiv__.register(_SignalClass)
-    def _(self, other: Self) -> int:
+    def _(self, other: Self) -> float:
         if all(value == 0 for _, value in other):
             raise ZeroDivisionError("Cannot divide by empty MaterialSpec.")
 
@@ -123,8 +175,8 @@ class MaterialSpec(_SignalClass):
         return type(self)(**result)
 
     def __iter__(self):
-        for f in fields(self):
-            yield f.name, getattr(self, f.name)
+        for name in self.material_names():
+            yield name, getattr(self, name)
 
     def __or__(self, other: Self) -> Self:
         if not isinstance(other, MaterialSpec):
@@ -133,9 +185,533 @@ class MaterialSpec(_SignalClass):
         return type(self)(
             **{name: value for (name, value), (_, matched_value) in zip(self, other) if matched_value > 0})
 
-    def __getitem__(self, item: str) -> Number:
+    def __getitem__(self, item: str) -> float:
         return getattr(self, item)
 
     def __repr__(self) -> str:
         return "\n".join(f"{name}: {value}" for name, value in self if value > 0)
 
+
+
+
+class MaterialSchema:
+    """
+    Name to index mapping shared by every instance of a generated material class, so that
+    instances only need to carry their values.
+    """
+    __slots__ = ("index", "names")
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        if len(self.index) != len(self.names):
+            raise ValueError("Material names must be unique.")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def indices(self, amounts: dict[str, float], cls_name: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sorted indices and values of the non-zero entries of `amounts`.
+        """
+        index = self.index
+        pairs = []
+        for name, value in amounts.items():
+            if name not in index:
+                raise TypeError(f"{cls_name}.__init__() got an unexpected keyword argument "
+                                f"'{name}'")
+            if value != 0:
+                pairs.append((index[name], value))
+
+        pairs.sort()
+        return (np.array([i for i, _ in pairs], dtype=np.intp),
+                np.array([v for _, v in pairs], dtype=np.float64))
+
+
+class _SchemaMaterialSpec(MaterialSpec, metaclass=ABCMeta):
+    """
+    Shared behaviour of MaterialSpecs whose values are ordered by a MaterialSchema rather than
+    stored as dataclass fields. Dense and sparse specs of the same schema can be mixed in operators.
+    """
+    __slots__ = ()
+    # defer to our reflected operators when combined with numpy scalars, e.g. np.float64(2) * spec
+    __array_ufunc__ = None
+    _schema: ClassVar[MaterialSchema]
+    _dense_type: ClassVar[type["ArrayMaterialSpec"]]
+    _sparse_type: ClassVar[type["SparseMaterialSpec"]]
+
+    @classmethod
+    def material_names(cls) -> tuple[str, ...]:
+        return cls._schema.names
+
+    @classmethod
+    def dense_type(cls) -> type["ArrayMaterialSpec"]:
+        return cls._dense_type
+
+    @classmethod
+    def sparse_type(cls) -> type["SparseMaterialSpec"]:
+        return cls._sparse_type
+
+    def to_dense(self) -> "ArrayMaterialSpec":
+        return self._dense_type._wrap(self.to_array().copy())
+
+    def to_sparse(self) -> "SparseMaterialSpec":
+        return self._sparse_type._wrap(*self.nonzero())
+
+    def _compatible(self, other: Any) -> TypeGuard["_SchemaMaterialSpec"]:
+        # each schema has exactly one dense and one sparse class, so comparing classes checks the
+        # schema without going through ABCMeta's isinstance, which is slow enough to show in every
+        # operator
+        return other.__class__ is self._dense_type or other.__class__ is self._sparse_type
+
+    @abstractmethod
+    def _gather(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Values at the given schema indices.
+        """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __eq__(self, other: object) -> bool:
+        if not self._compatible(other):
+            return NotImplemented
+
+        indices, values = self.nonzero()
+        other_indices, other_values = other.nonzero()
+        return bool(np.array_equal(indices, other_indices) and np.array_equal(values, other_values))
+
+    def __hash__(self) -> int:
+        indices, values = self.nonzero()
+        return hash((indices.tobytes(), values.tobytes()))
+
+    @abstractmethod
+    def _map(self, function: Callable[[np.ndarray], np.ndarray]) -> Self:
+        """
+        Apply an elementwise function that maps zero to zero.
+        """
+
+    def __mul__(self, scalar: float) -> Self:
+        if not isinstance(scalar, Number):
+            return NotImplemented
+        return self._map(lambda values: values * scalar)
+
+    @singledispatchmethod
+    def __truediv__(self, other: Any) -> float | Self:
+        return NotImplemented
+
+    @__truediv__.register
+    def _(self, other: Number) -> Self:
+        return self._map(lambda values: values / other)
+
+    @__truediv__.register(_SignalClass)
+    def _(self, other: Self) -> float:
+        if not self._compatible(other):
+            return NotImplemented
+
+        indices, values = other.nonzero()
+        if not len(indices):
+            raise ZeroDivisionError("Cannot divide by empty MaterialSpec.")
+
+        mask = values > 0
+        return float(np.min(self._gather(indices[mask]) / values[mask]))
+
+    @singledispatchmethod
+    def __floordiv__(self, other: Any) -> float | Self:
+        return NotImplemented
+
+    @__floordiv__.register(_SignalClass)
+    def _(self, other: Self) -> float:
+        if not self._compatible(other):
+            return NotImplemented
+
+        indices, values = other.nonzero()
+        if not len(indices):
+            raise ZeroDivisionError("Cannot divide by empty MaterialSpec.")
+
+        mask = values > 0
+        return float(np.min(self._gather(indices[mask]) // values[mask]))
+
+    @__floordiv__.register
+    def _(self, other: Number) -> Self:
+        return self._map(lambda values: values // other)
+
+    def __iter__(self):
+        yield from zip(self._schema.names, self.to_array().tolist())
+
+    def __getitem__(self, item: str) -> float:
+        return float(self._gather(np.array([self._schema.index[item]]))[0])
+
+    def __repr__(self) -> str:
+        indices, values = self.nonzero()
+        names = self._schema.names
+        return "\n".join(f"{names[i]}: {value}"
+                         for i, value in zip(indices.tolist(), values.tolist()) if value > 0)
+
+
+class ArrayMaterialSpec(_SchemaMaterialSpec):
+    """
+    MaterialSpec whose values are stored in a contiguous float64 vector, ordered by the class's
+    MaterialSchema. Every operator is a single vectorized call rather than a walk over fields.
+    Subclasses are created with `make_array_spec`.
+    """
+    __slots__ = ("_values",)
+    _values: np.ndarray
+
+    def __init__(self, **amounts: float) -> None:
+        indices, values = self._schema.indices(amounts, type(self).__name__)
+        array = np.zeros(len(self._schema))
+        array[indices] = values
+        array.flags.writeable = False
+        object.__setattr__(self, "_values", array)
+
+    @classmethod
+    def _wrap(cls, values: np.ndarray) -> Self:
+        """
+        Construct without copying or validating. `values` must be a fresh float64 vector in schema
+        order that is not referenced elsewhere.
+        """
+        spec = object.__new__(cls)
+        values.flags.writeable = False
+        object.__setattr__(spec, "_values", values)
+        return spec
+
+    @staticmethod
+    def _property(index: int) -> property:
+        def getter(self: "ArrayMaterialSpec") -> float:
+            return float(self._values[index])
+
+        return property(getter)
+
+    @classmethod
+    def from_array(cls, values: Iterable[float]) -> Self:
+        array = np.array(values, dtype=np.float64)
+        if array.shape != (len(cls._schema),):
+            raise ValueError(f"Expected {len(cls._schema)} values, "
+                             f"got array of shape {array.shape}.")
+
+        return cls._wrap(array)
+
+    def to_array(self) -> np.ndarray:
+        return self._values
+
+    def nonzero(self) -> tuple[np.ndarray, np.ndarray]:
+        indices = np.flatnonzero(self._values)
+        return indices, self._values[indices]
+
+    def _gather(self, indices: np.ndarray) -> np.ndarray:
+        return self._values[indices]
+
+    def _other_values(self, other: Any) -> np.ndarray | None:
+        if self._compatible(other):
+            return other.to_array()
+        return None
+
+    def __hash__(self) -> int:
+        return super().__hash__()
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is self._dense_type:
+            return bool(np.array_equal(self._values, other._values))
+        return super().__eq__(other)
+
+    def __lt__(self, other: Number) -> Self:
+        return self._wrap(np.where(self._values < other, self._values, 0.0))
+
+    def __gt__(self, other: Number) -> Self:
+        return self._wrap(np.where(self._values > other, self._values, 0.0))
+
+    def __le__(self, other: Number) -> Self:
+        return self._wrap(np.where(self._values <= other, self._values, 0.0))
+
+    def __ge__(self, other: Number) -> Self:
+        return self._wrap(np.where(self._values >= other, self._values, 0.0))
+
+    def __add__(self, other: Self | Any) -> Self:
+        if other.__class__ is self._sparse_type:
+            values = self._values.copy()
+            values[other._indices] += other._data
+            return self._wrap(values)
+        if (values := self._other_values(other)) is None:
+            return NotImplemented
+        return self._wrap(self._values + values)
+
+    def __sub__(self, other: Self | Any) -> Self:
+        if other.__class__ is self._sparse_type:
+            values = self._values.copy()
+            values[other._indices] -= other._data
+            return self._wrap(values)
+        if (values := self._other_values(other)) is None:
+            return NotImplemented
+        return self._wrap(self._values - values)
+
+    def _map(self, function: Callable[[np.ndarray], np.ndarray]) -> Self:
+        return self._wrap(function(self._values))
+
+    def __or__(self, other: Self) -> Self:
+        if (values := self._other_values(other)) is None:
+            return NotImplemented
+        return self._wrap(np.where(values > 0, self._values, 0.0))
+
+
+class SparseMaterialSpec(_SchemaMaterialSpec):
+    """
+    MaterialSpec that only stores its non-zero materials, as sorted schema indices and their values.
+    Suited to recipes, which touch a handful of the materials in a schema. Adding or subtracting a
+    dense spec produces a dense spec, every other operator keeps the sparse representation.
+    Subclasses are created alongside their dense counterpart by `make_array_spec`.
+    """
+    __slots__ = ("_data", "_indices")
+    _data: np.ndarray
+    _indices: np.ndarray
+
+    def __init__(self, **amounts: float) -> None:
+        indices, values = self._schema.indices(amounts, type(self).__name__)
+        indices.flags.writeable = False
+        values.flags.writeable = False
+        object.__setattr__(self, "_indices", indices)
+        object.__setattr__(self, "_data", values)
+
+    @classmethod
+    def _wrap(cls, indices: np.ndarray, data: np.ndarray) -> Self:
+        """
+        Construct without copying or validating. `indices` must be sorted and unique, and neither
+        array may be mutated afterwards. Explicit zeros are dropped.
+        """
+        if not data.all():
+            keep = data != 0
+            indices, data = indices[keep], data[keep]
+
+        spec = object.__new__(cls)
+        indices.flags.writeable = False
+        data.flags.writeable = False
+        object.__setattr__(spec, "_indices", indices)
+        object.__setattr__(spec, "_data", data)
+        return spec
+
+    @staticmethod
+    def _property(index: int) -> property:
+        def getter(self: "SparseMaterialSpec") -> float:
+            position = self._indices.searchsorted(index)
+            if position < len(self._indices) and self._indices[position] == index:
+                return float(self._data[position])
+            return 0.0
+
+        return property(getter)
+
+    @classmethod
+    def from_array(cls, values: Iterable[float]) -> Self:
+        array = np.asarray(values, dtype=np.float64)
+        if array.shape != (len(cls._schema),):
+            raise ValueError(f"Expected {len(cls._schema)} values, "
+                             f"got array of shape {array.shape}.")
+
+        indices = np.flatnonzero(array)
+        return cls._wrap(indices, array[indices])
+
+    @classmethod
+    def from_csr(cls, row: csr_matrix) -> Self:
+        row = csr_matrix(row)
+        row.sum_duplicates()
+        return cls._wrap(row.indices.astype(np.intp), row.data.astype(np.float64))
+
+    def to_array(self) -> np.ndarray:
+        values = np.zeros(len(self._schema))
+        values[self._indices] = self._data
+        return values
+
+    def nonzero(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._indices, self._data
+
+    def _gather(self, indices: np.ndarray) -> np.ndarray:
+        if not len(self._indices):
+            return np.zeros(len(indices))
+
+        positions = np.minimum(self._indices.searchsorted(indices), len(self._indices) - 1)
+        return np.where(self._indices[positions] == indices, self._data[positions], 0.0)
+
+    def _filter(self, mask: np.ndarray) -> Self:
+        return self._wrap(self._indices[mask], self._data[mask])
+
+    def _combine(self, other: "_SchemaMaterialSpec", sign: float) -> Self:
+        other_indices, other_data = other.nonzero()
+        indices = np.union1d(self._indices, other_indices)
+        values = np.zeros(len(indices))
+        values[indices.searchsorted(self._indices)] = self._data
+        values[indices.searchsorted(other_indices)] += sign * other_data
+        return self._wrap(indices, values)
+
+    def __lt__(self, other: Number) -> Self:
+        return self._filter(self._data < other)
+
+    def __gt__(self, other: Number) -> Self:
+        return self._filter(self._data > other)
+
+    def __le__(self, other: Number) -> Self:
+        return self._filter(self._data <= other)
+
+    def __ge__(self, other: Number) -> Self:
+        return self._filter(self._data >= other)
+
+    def __add__(self, other: Self | Any) -> Self:
+        if not self._compatible(other):
+            return NotImplemented
+        if other.__class__ is self._dense_type:
+            # mixing with a dense spec gives a dense spec
+            return other + self  # type: ignore[return-value]
+        return self._combine(other, 1)
+
+    def __sub__(self, other: Self | Any) -> Self:
+        if not self._compatible(other):
+            return NotImplemented
+        if other.__class__ is self._dense_type:
+            values = -other._values
+            values[self._indices] += self._data
+            return other._wrap(values)  # type: ignore[return-value]
+        return self._combine(other, -1)
+
+    def _map(self, function: Callable[[np.ndarray], np.ndarray]) -> Self:
+        return self._wrap(self._indices, function(self._data))
+
+    def __or__(self, other: Self) -> Self:
+        if not self._compatible(other):
+            return NotImplemented
+
+        indices, values = other.nonzero()
+        kept = indices[values > 0]
+        return self._wrap(kept, self._gather(kept))
+
+    def to_csr(self) -> csr_matrix:
+        return csr_matrix((self._data, self._indices, [0, len(self._indices)]),
+                          shape=(1, len(self._schema)))
+
+
+def make_array_spec(name: str, materials: Iterable[str]) -> type[ArrayMaterialSpec]:
+    """
+    Create an ArrayMaterialSpec subclass with one read-only attribute per material, together with
+    a SparseMaterialSpec counterpart sharing the same MaterialSchema, available through
+    `sparse_type()`.
+    """
+    schema = MaterialSchema(materials)
+
+    def namespace(base: type[ArrayMaterialSpec] | type[SparseMaterialSpec]) -> dict[str, Any]:
+        attributes: dict[str, Any] = {"__slots__": (), "_schema": schema}
+        attributes.update({material: base._property(i) for i, material in enumerate(schema.names)})
+        return attributes
+
+    dense: type[ArrayMaterialSpec] = type(name, (ArrayMaterialSpec,), namespace(ArrayMaterialSpec))
+    sparse: type[SparseMaterialSpec] = type(f"Sparse{name}", (SparseMaterialSpec,),
+                                            namespace(SparseMaterialSpec))
+
+    for spec_type in (dense, sparse):
+        spec_type._dense_type = dense
+        spec_type._sparse_type = sparse
+
+    return dense
+
+
+# MaterialSpec's comparisons, arithmetic and name lookup deliberately replace tuple's
+class TupleMaterialSpec(MaterialSpec, tuple[float, ...]):  # type: ignore[misc]
+    """
+    MaterialSpec whose values are the items of a tuple, in `material_names` order, with one
+    read-only property per material. Instances have no `__dict__` and are built by a single tuple
+    allocation. Subclasses are generated by `make_material_spec`, the fast counterpart of a
+    `make_dataclass` MaterialSpec with the same material fields.
+    """
+    __slots__ = ()
+    # defer to our reflected operators when combined with numpy scalars, which would otherwise treat
+    # the tuple as an array
+    __array_ufunc__ = None
+    _fields: ClassVar[tuple[str, ...]] = ()
+    _field_metadata: ClassVar[tuple[Any, ...]] = ()
+
+    if not TYPE_CHECKING:
+        # construction is done entirely by the generated __new__; object.__init__ ignores its
+        # arguments when __new__ is overridden
+        __init__ = object.__init__
+
+    @classmethod
+    def material_names(cls) -> tuple[str, ...]:
+        return cls._fields
+
+    @classmethod
+    def field_metadata(cls) -> tuple[Any, ...]:
+        """
+        Metadata given to `make_material_spec` for each material, in `material_names` order.
+        """
+        return cls._field_metadata
+
+    @classmethod
+    def from_array(cls, values: Iterable[float]) -> Self:
+        array = np.asarray(values, dtype=np.float64)
+        if array.shape != (len(cls._fields),):
+            raise ValueError(f"Expected {len(cls._fields)} values, "
+                             f"got array of shape {array.shape}.")
+
+        return tuple.__new__(cls, array.tolist())
+
+    def to_array(self) -> np.ndarray:
+        return np.fromiter(tuple.__iter__(self), dtype=np.float64, count=len(self._fields))
+
+    def __iter__(self):
+        return zip(self._fields, tuple.__iter__(self))
+
+    def __eq__(self, other: object) -> bool:
+        # like a dataclass, only specs of the same class compare equal
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return tuple.__eq__(self, other)
+
+    __ne__ = object.__ne__
+    __hash__ = tuple.__hash__
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __getnewargs__(self) -> tuple[float, ...]:
+        return tuple(tuple.__iter__(self))
+
+
+def make_material_spec(name: str, materials: Iterable[str], module: str | None = None,
+                       metadata: Iterable[Any] | None = None) -> type[TupleMaterialSpec]:
+    """
+    Create a TupleMaterialSpec subclass with one field per material, defaulting to 0. The
+    constructor is generated with one parameter per material, as `make_dataclass` would, so
+    construction is a single call. `module` is set as the class's `__module__` for pickling, and
+    defaults to the caller's module. `metadata`, one item per material, is returned by
+    `field_metadata`.
+    """
+    materials = tuple(materials)
+    metadata = (None,) * len(materials) if metadata is None else tuple(metadata)
+    if len(metadata) != len(materials):
+        raise ValueError(f"Expected metadata for {len(materials)} materials, got {len(metadata)}.")
+    for material in materials:
+        if not material.isidentifier() or keyword.iskeyword(material) or material.startswith("_"):
+            raise ValueError("Material names must be identifiers not starting with '_': "
+                             f"{material!r}")
+    if len(set(materials)) != len(materials):
+        raise ValueError("Material names must be unique.")
+
+    parameters = "".join(f", {material}=0" for material in materials)
+    values = "".join(f"{material}, " for material in materials)
+    namespace: dict[str, Any] = {"_tuple_new": tuple.__new__}
+    exec(f"def __new__(_cls{parameters}):\n    return _tuple_new(_cls, ({values}))", namespace)
+
+    attributes: dict[str, Any] = {"__slots__": (), "_fields": materials,
+                                  "_field_metadata": metadata, "__new__": namespace["__new__"]}
+    attributes.update({material: _tuplegetter(i, f"Amount of {material}")
+                       for i, material in enumerate(materials)})
+    spec_type = type(name, (TupleMaterialSpec,), attributes)
+
+    if module is None:
+        module = sys._getframe(1).f_globals.get("__name__", "__main__")
+    spec_type.__module__ = module
+
+    return spec_type
@@ -0,0 +1,159 @@
+from numbers import Number
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing_extensions import Self
+
+from satisfactory_tools.core.material import MaterialSpec, SparseMaterialSpec
+
+# one row per spec, one column per material
+MATRIX_NDIM = 2
+
+
+class MaterialBatch:
+    """
+    N MaterialSpecs of the same type stacked into an N x M matrix, one row per spec and one column
+    per material in `material_names` order. Aggregations over many specs become a single reduction
+    instead of a MaterialSpec construction per term.
+    """
+    __slots__ = ("matrix", "spec_type")
+
+    spec_type: type[MaterialSpec]
+    matrix: np.ndarray
+
+    def __init__(self, spec_type: type[MaterialSpec], matrix: np.ndarray) -> None:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim != MATRIX_NDIM or matrix.shape[1] != len(spec_type.material_names()):
+            raise ValueError(f"Expected a matrix with {len(spec_type.material_names())} columns, "
+                             f"got shape {matrix.shape}.")
+
+        self.spec_type = spec_type
+        self.matrix = matrix
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[MaterialSpec],
+                   spec_type: type[MaterialSpec] | None = None) -> Self:
+        """
+        Stack specs into a batch. `spec_type` is required when `specs` may be empty, and otherwise
+        defaults to the type of the first spec.
+        """
+        specs = list(specs)
+        if spec_type is None:
+            if not specs:
+                raise ValueError("Cannot infer the spec type of an empty batch.")
+            spec_type = type(specs[0])
+
+        width = len(spec_type.material_names())
+        matrix = np.zeros((len(specs), width))
+
+        if all(isinstance(spec, SparseMaterialSpec) for spec in specs):
+            # scatter all non-zeros at once rather than expanding each row
+            pairs = [spec.nonzero() for spec in specs]
+            rows = np.repeat(np.arange(len(specs)), [len(indices) for indices, _ in pairs])
+            if len(rows):
+                matrix[rows, np.concatenate([indices for indices, _ in pairs])] = \
+                    np.concatenate([values for _, values in pairs])
+        else:
+            for row, spec in enumerate(specs):
+                matrix[row] = spec.to_array()
+
+        return cls(spec_type, matrix)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.matrix.shape
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def __getitem__(self, row: int) -> MaterialSpec:
+        return self.spec_type.from_array(self.matrix[row])
+
+    def __iter__(self) -> Iterator[MaterialSpec]:
+        for row in self.matrix:
+            yield self.spec_type.from_array(row)
+
+    def to_specs(self) -> list[MaterialSpec]:
+        return list(self)
+
+    def to_csr(self) -> csr_matrix:
+        return csr_matrix(self.matrix)
+
+    def _new(self, matrix: np.ndarray) -> Self:
+        batch = object.__new__(type(self))
+        batch.spec_type = self.spec_type
+        batch.matrix = matrix
+        return batch
+
+    def scale(self, factors: Sequence[float] | np.ndarray) -> Self:
+        """
+        Multiply each row by its own factor.
+        """
+        factors = np.asarray(factors, dtype=np.float64)
+        if factors.shape != (len(self),):
+            raise ValueError(f"Expected {len(self)} factors, got array of shape {factors.shape}.")
+
+        return self._new(self.matrix * factors[:, None])
+
+    def __mul__(self, scalar: Number) -> Self:
+        if not isinstance(scalar, Number):
+            return NotImplemented
+        return self._new(self.matrix * scalar)
+
+    def __rmul__(self, scalar: Number) -> Self:
+        return self * scalar
+
+    def sum(self, weights: Sequence[float] | np.ndarray | None = None) -> MaterialSpec:
+        """
+        Column sums as a single spec, optionally weighting each row.
+        """
+        if weights is None:
+            return self.spec_type.from_array(self.matrix.sum(axis=0))
+
+        return self.spec_type.from_array(np.asarray(weights, dtype=np.float64) @ self.matrix)
+
+    def _where(self, mask: np.ndarray) -> Self:
+        return self._new(np.where(mask, self.matrix, 0.0))
+
+    def __lt__(self, other: Number) -> Self:
+        """
+        Keep values less than the given number, setting the rest to zero, as MaterialSpec does.
+        """
+        return self._where(self.matrix < other)
+
+    def __gt__(self, other: Number) -> Self:
+        return self._where(self.matrix > other)
+
+    def __le__(self, other: Number) -> Self:
+        return self._where(self.matrix <= other)
+
+    def __ge__(self, other: Number) -> Self:
+        return self._where(self.matrix >= other)
+
+    @staticmethod
+    def net_flow(inputs: "MaterialBatch", outputs: "MaterialBatch",
+                 weights: Sequence[float] | np.ndarray | None = None
+                 ) -> tuple[MaterialSpec, MaterialSpec]:
+        """
+        Pool the inputs and outputs of a set of processes into net inputs and net outputs. Materials
+        that are both consumed and produced are cancelled against each other, matching
+        `(sum_inputs - (sum_outputs | sum_inputs)) > 0` on the summed specs.
+        """
+        if inputs.spec_type is not outputs.spec_type or len(inputs) != len(outputs):
+            raise ValueError("Input and output batches must have the same spec type and length.")
+
+        if weights is None:
+            sum_inputs = inputs.matrix.sum(axis=0)
+            sum_outputs = outputs.matrix.sum(axis=0)
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            sum_inputs = weights @ inputs.matrix
+            sum_outputs = weights @ outputs.matrix
+
+        net_inputs = sum_inputs - np.where(sum_inputs > 0, sum_outputs, 0.0)
+        net_outputs = sum_outputs - np.where(sum_outputs > 0, sum_inputs, 0.0)
+
+        spec_type = inputs.spec_type
+        return (spec_type.from_array(np.where(net_inputs > 0, net_inputs, 0.0)),
+                spec_type.from_array(np.where(net_outputs > 0, net_outputs, 0.0)))
@@ -0,0 +1,987 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, OptimizeResult, linprog, milp
+from scipy.sparse import csc_matrix, hstack, identity, vstack
+
+from satisfactory_tools.core.material import MaterialSpec
+from satisfactory_tools.core.process_index import ProcessIndex
+from satisfactory_tools.core.solution_cache import (
+    CachedSolution,
+    SolutionCache,
+    node_digest,
+    schema_digest,
+    spec_digest,
+)
+
+try:
+    import highspy
+except ImportError:  # optional, without it every solve is a cold linprog solve
+    highspy = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from satisfactory_tools.config.machines import MachineData
+    from satisfactory_tools.core.process import ProcessNode
+
+MINIMIZE_INPUT = "minimize_input"
+MAXIMIZE_OUTPUT = "maximize_output"
+
+# small penalty for using machines when maximizing output, to avoid creating redundant loops
+MACHINE_PENALTY = .0001
+# amounts and objective differences below this are solver noise
+TOLERANCE = 1e-9
+
+# linprog status codes, which solutions use regardless of the backend
+OPTIMAL = 0
+ITERATION_LIMIT = 1
+INFEASIBLE = 2
+UNBOUNDED = 3
+OTHER = 4
+
+
+def constraint_matrix(nodes: Sequence["ProcessNode"], include_power: bool = False,
+                      required_materials: np.ndarray | None = None
+                      ) -> tuple[csc_matrix, np.ndarray]:
+    """
+    Sparse matrix of net production where each node is a column and each material is a row,
+    assembled from the nodes' non-zero materials only. Materials that no node touches are dropped,
+    unless listed in `required_materials`. Returns the matrix and the material index of each row.
+    When `include_power` is set, a final row holds net power production.
+    """
+    rows, columns, values = [], [np.empty(0, dtype=np.intp)], [np.empty(0)]
+    for column, node in enumerate(nodes):
+        input_indices, input_values = node.input_materials.nonzero()
+        output_indices, output_values = node.output_materials.nonzero()
+
+        rows += [output_indices, input_indices]
+        columns.append(np.full(len(output_indices) + len(input_indices), column))
+        values += [output_values, -input_values]
+
+    rows.append(np.empty(0, dtype=np.intp) if required_materials is None else required_materials)
+    materials, compact_rows = np.unique(np.concatenate(rows), return_inverse=True)
+    compact_rows = compact_rows[:len(compact_rows) - len(rows[-1])]
+
+    # duplicate entries, e.g. a material that is both an input and an output, are summed
+    column_indices = np.concatenate(columns).astype(np.intp)
+    matrix = csc_matrix((np.concatenate(values), (compact_rows, column_indices)),
+                        shape=(len(materials), len(nodes)))
+
+    if include_power:
+        power = [node.power_production - node.power_consumption for node in nodes]
+        matrix = vstack([matrix, csc_matrix(np.array([power], dtype=np.float64))], format="csc")
+
+    return matrix, materials
+
+
+@dataclass
+class Solution:
+    """
+    Scale of each node in an optimal (or best found) plan. When maximizing output, `output_scale` is
+    the number of target outputs produced.
+    """
+    nodes: list["ProcessNode"]
+    scales: np.ndarray
+    objective: float
+    status: int
+    message: str
+    output_scale: float | None = None
+    sensitivity: "Sensitivity | None" = field(default=None, repr=False)
+
+    @property
+    def success(self) -> bool:
+        return self.status == OPTIMAL
+
+    def __getitem__(self, node: "ProcessNode") -> float:
+        return float(self.scales[self.nodes.index(node)])
+
+    def active(self, tolerance: float = TOLERANCE) -> dict["ProcessNode", float]:
+        """
+        Nodes used by the plan, with their scales.
+        """
+        return {node: float(scale) for node, scale in zip(self.nodes, self.scales)
+                if scale > tolerance}
+
+
+@dataclass
+class Sensitivity:
+    """
+    Marginal values of an optimal plan, read off the same solve:
+    - `shadow_prices`: objective change per extra unit required of each material in `materials`,
+      i.e. per unit of target, or per unit less available. `power_price` is the same for net power,
+      when included.
+    - `reduced_costs`: objective change per unit of each node in `nodes` forced into the plan.
+      Unused nodes with a positive reduced cost would make the plan worse.
+    - `requirement_ranges` and `cost_ranges`: (lower, upper) of each material's requirement and
+      each node's cost over which the plan's basis, and so these prices, stay valid. Only available
+      with highspy, and computed only for a `ProcessOptimizer` created with `ranging=True`.
+
+    Prices are first order, so answers from them hold for one change at a time within its range.
+    """
+    nodes: list["ProcessNode"] = field(repr=False)
+    materials: np.ndarray
+    shadow_prices: np.ndarray
+    reduced_costs: np.ndarray
+    power_price: float | None = None
+    requirement_ranges: np.ndarray | None = None
+    cost_ranges: np.ndarray | None = None
+
+    def shadow_price(self, material: int) -> float:
+        """
+        Shadow price of a material by index, zero for materials outside the model.
+        """
+        rows = np.flatnonzero(self.materials == material)
+        return float(self.shadow_prices[rows[0]]) if len(rows) else 0.0
+
+    def prices(self, spec_type: type[MaterialSpec]) -> MaterialSpec:
+        """
+        Shadow prices as a spec of the given type.
+        """
+        values = np.zeros(len(spec_type.material_names()))
+        values[self.materials] = self.shadow_prices
+        return spec_type.from_array(values)
+
+    def marginal_cost(self, change: MaterialSpec) -> float:
+        """
+        First order objective change from requiring `change` more of each material.
+        """
+        return float(self.shadow_prices @ change.to_array()[self.materials])
+
+    def reduced_cost(self, node: "ProcessNode") -> float:
+        return float(self.reduced_costs[self.nodes.index(node)])
+
+    def price(self, node: "ProcessNode", cost: float = 1) -> float:
+        """
+        Reduced cost of any node at the given cost, including nodes outside the model, e.g. an
+        alternate recipe. A negative value means adding the node would improve the plan. Materials
+        outside the model are priced at zero.
+        """
+        indices, amounts = node.output_materials.nonzero()
+        value = cost - sum(self.shadow_price(material) * amount
+                           for material, amount in zip(indices.tolist(), amounts))
+        indices, amounts = node.input_materials.nonzero()
+        value += sum(self.shadow_price(material) * amount
+                     for material, amount in zip(indices.tolist(), amounts))
+        if self.power_price is not None:
+            value -= self.power_price * (node.power_production - node.power_consumption)
+        return float(value)
+
+
+@dataclass
+class MachinePlan(Solution):
+    """
+    Whole machines per node, from `ProcessOptimizer.minimize_machines`. `scales` are the total clock
+    of each node's machines, at most its machine count, so all machines of a node but one run at
+    full clock. `bound` is the best proven lower bound on the objective and `gap` the relative
+    distance to it.
+    """
+    machines: np.ndarray = field(default_factory=lambda: np.empty(0))
+    bound: float = np.nan
+    buildings: Mapping["ProcessNode", "MachineData"] = field(default_factory=dict, repr=False)
+
+    @property
+    def gap(self) -> float:
+        if not np.isfinite(self.objective):
+            return np.nan
+        return max(self.objective - self.bound, 0.0) / max(abs(self.objective), TOLERANCE)
+
+    def counts(self) -> dict["ProcessNode", int]:
+        """
+        Machines built for each used node.
+        """
+        return {node: int(count) for node, count in zip(self.nodes, self.machines) if count > 0}
+
+    def building_counts(self) -> dict[str, int]:
+        """
+        Machines built per building, by the display name of each node's MachineData, or the node
+        name when it has none.
+        """
+        totals: dict[str, int] = {}
+        for node, count in self.counts().items():
+            name = self.buildings[node].display_name if node in self.buildings else node.name
+            totals[name] = totals.get(name, 0) + count
+        return totals
+
+
+@dataclass
+class _Model:
+    """
+    Assembled linear program: minimize costs @ x subject to matrix @ x >= row_lower and x >= 0.
+    Columns are `nodes`, followed by an output column when maximizing output.
+    """
+    mode: str
+    nodes: list["ProcessNode"]
+    materials: np.ndarray
+    matrix: csc_matrix
+    row_lower: np.ndarray
+    costs: np.ndarray
+    target: MaterialSpec | None = None
+    columns: dict["ProcessNode", int] = field(init=False)
+    rows: dict[int, int] = field(init=False)
+    basis: "highspy.HighsBasis | None" = field(default=None, init=False)
+    # row duals of the last optimal solve, and with `ranging`, (lower, upper) cost and requirement
+    # ranges
+    duals: np.ndarray | None = field(default=None, init=False, repr=False)
+    ranging: bool = field(default=False, init=False)
+    cost_ranges: np.ndarray | None = field(default=None, init=False, repr=False)
+    requirement_ranges: np.ndarray | None = field(default=None, init=False, repr=False)
+    _highs: "highspy.Highs | None" = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.columns = {node: i for i, node in enumerate(self.nodes)}
+        self.rows = {material: i for i, material in enumerate(self.materials.tolist())}
+
+    def solve(self) -> tuple[np.ndarray | None, float, int, str]:
+        """
+        Column values, objective, status and message. Column values are None unless optimal.
+        """
+        if not len(self.costs):
+            # e.g. every node was presolved away, neither backend accepts a model without columns
+            if np.all(self.row_lower <= 0):
+                self.duals = np.zeros(len(self.row_lower))
+                return np.empty(0), 0.0, OPTIMAL, "Nothing to produce."
+            return None, np.nan, INFEASIBLE, "No nodes can produce the target."
+
+        if highspy is None:
+            return self._solve_linprog()
+        return self._solve_highs()
+
+    def solve_with_column(self, rows: np.ndarray, values: np.ndarray,
+                          cost: float) -> tuple[np.ndarray | None, float, int, str]:
+        """
+        Solve with one extra column, given by its non-zero rows and values, without changing the
+        model. With highspy the column is added to the solved model, re-solved from its basis and
+        removed again, so each call only pays for the pivots the column causes.
+        """
+        if highspy is not None and len(self.costs) and (self._highs is None or self.basis is None):
+            self.solve()
+
+        highs = self._highs
+        basis = self.basis
+        if highspy is None or highs is None or basis is None:
+            column = csc_matrix((values, (rows, np.zeros(len(rows), dtype=np.intp))),
+                                shape=(self.matrix.shape[0], 1))
+            extended = _Model(self.mode, [], self.materials,
+                              hstack([self.matrix, column], format="csc"), self.row_lower,
+                              np.append(self.costs, cost))
+            return extended.solve()
+
+        num_columns = self.matrix.shape[1]
+        highs.addCol(cost, 0, highspy.kHighsInf, len(rows), rows.astype(np.int32),
+                     values.astype(np.float64))
+        try:
+            highs.run()
+            model_status = highs.getModelStatus()
+            status = _HIGHS_STATUS.get(model_status, OTHER)
+            message = highs.modelStatusToString(model_status)
+            if status != OPTIMAL:
+                return None, np.nan, status, message
+            x = np.array(highs.getSolution().col_value)
+            return x, highs.getInfo().objective_function_value, status, message
+        finally:
+            highs.deleteCols(1, np.array([num_columns], dtype=np.int32))
+            highs.setBasis(basis)
+
+    def _solve_linprog(self) -> tuple[np.ndarray | None, float, int, str]:
+        # use -1 factor to convert problem of materials * coefficients >= bounds to linprog's A_ub
+        result = linprog(c=self.costs, bounds=(0, None), A_ub=self.matrix * -1,
+                         b_ub=self.row_lower * -1, method="highs")
+        objective = result.fun if result.fun is not None else np.nan
+        if result.status == OPTIMAL:
+            # marginals are with respect to b_ub, which is the negated lower bound
+            self.duals = -result.ineqlin.marginals
+            self.cost_ranges = self.requirement_ranges = None
+        return result.x, objective, result.status, result.message
+
+    def _solve_highs(self) -> tuple[np.ndarray | None, float, int, str]:
+        infinity = highspy.kHighsInf
+        num_rows, num_columns = self.matrix.shape
+
+        if self._highs is None:
+            highs = highspy.Highs()
+            highs.setOptionValue("output_flag", False)
+
+            lp = highspy.HighsLp()
+            lp.num_col_ = num_columns
+            lp.num_row_ = num_rows
+            lp.col_cost_ = self.costs
+            lp.col_lower_ = np.zeros(num_columns)
+            lp.col_upper_ = np.full(num_columns, infinity)
+            lp.row_lower_ = self.row_lower
+            lp.row_upper_ = np.full(num_rows, infinity)
+            lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+            lp.a_matrix_.start_ = self.matrix.indptr
+            lp.a_matrix_.index_ = self.matrix.indices
+            lp.a_matrix_.value_ = self.matrix.data
+            highs.passModel(lp)
+            self._highs = highs
+        else:
+            # HiGHS keeps the basis of the last solve and warm starts from it
+            highs = self._highs
+            # missing from the highspy stubs, but part of its API
+            highs.changeRowsBounds(num_rows,  # type: ignore[attr-defined]
+                                   np.arange(num_rows), self.row_lower, np.full(num_rows, infinity))
+            highs.changeColsCost(num_columns, np.arange(num_columns), self.costs)
+
+        highs.run()
+        model_status = highs.getModelStatus()
+        message = highs.modelStatusToString(model_status)
+        status = _HIGHS_STATUS.get(model_status, OTHER)
+
+        if status != OPTIMAL:
+            return None, np.nan, status, message
+
+        self.basis = highs.getBasis()
+        solution = highs.getSolution()
+        self.duals = np.array(solution.row_dual)
+        self.cost_ranges = self.requirement_ranges = None
+        if self.ranging:
+            ranging_status, ranging = highs.getRanging()
+            if ranging_status == highspy.HighsStatus.kOk:
+                self.cost_ranges = np.column_stack([ranging.col_cost_dn.value_[:num_columns],
+                                                    ranging.col_cost_up.value_[:num_columns]])
+                self.requirement_ranges = np.column_stack([ranging.row_bound_dn.value_[:num_rows],
+                                                           ranging.row_bound_up.value_[:num_rows]])
+
+        x = np.array(solution.col_value)
+        return x, highs.getInfo().objective_function_value, status, message
+
+
+class ProcessOptimizer:
+    """
+    Optimization over a fixed set of process nodes that keeps its assembled model (constraint
+    matrix, bounds, costs and eligible nodes) and the last basis between solves. Changing targets,
+    available materials or costs only updates the affected bounds or costs and re-solves from the
+    previous basis. The model is only rebuilt when a request needs nodes or materials it does not
+    contain, and then grows to cover both the old and new requests, so stepping back and forth
+    between targets stays warm.
+
+    Warm starts need the optional `highspy` package, otherwise each solve falls back to linprog on
+    the cached model.
+
+    With a SolutionCache, results are looked up by the content of the request and node set before
+    solving, so identical optimizations, even over equal nodes rebuilt in another session, are not
+    solved twice.
+    """
+    index: ProcessIndex
+    include_power: bool
+    costs: dict["ProcessNode", float]
+    solution: Solution | None
+    cache: SolutionCache | None
+    ranging: bool
+
+    def __init__(self, process_nodes: "Iterable[ProcessNode] | ProcessIndex",
+                 include_power: bool = False, costs: Mapping["ProcessNode", float] | None = None,
+                 cache: SolutionCache | None = None, ranging: bool = False) -> None:
+        self.index = ProcessIndex.of(process_nodes)
+        self.include_power = include_power
+        self.costs = dict(costs or {})
+        self.solution = None
+        self.cache = cache
+        # cost and requirement ranging roughly doubles the time of a warm re-solve, so it is opt-in
+        self.ranging = ranging
+
+        self._model: _Model | None = None
+        self._digests: dict["ProcessNode", bytes] = {}
+        self._digests_fingerprint: int | None = None
+        self._content_digest = b""
+
+    @property
+    def basis(self) -> "highspy.HighsBasis | None":
+        """
+        Basis of the last optimal solve, when solving with highspy.
+        """
+        return None if self._model is None else self._model.basis
+
+    def minimize_input(self, target_output: MaterialSpec,
+                       available_materials: MaterialSpec | None = None) -> Solution:
+        """
+        Produce at least `target_output` at the least total node cost. `available_materials` are
+        supplied from outside the process and may be consumed without being produced.
+        """
+        target_indices = target_output.nonzero()[0]
+        eligible = self.index.eligible(target_indices.tolist(), self.include_power)
+
+        model = self._prepare(MINIMIZE_INPUT, eligible, target_indices, None)
+        model.row_lower = self._row_lower(model, target_output, available_materials)
+        return self._solve(self._cache_key(MINIMIZE_INPUT, target_output, available_materials))
+
+    def solve_many(self, targets: Iterable[MaterialSpec],
+                   available_materials: MaterialSpec | None = None, max_workers: int | None = None,
+                   chunksize: int = 1) -> Iterator["SweepResult"]:
+        """
+        `minimize_input` for each target, sharing one model assembled for all of them. Solves are
+        spread over a pool of `max_workers` processes, each keeping its own warm model, and results
+        are yielded in target order as they finish. `max_workers=1` solves in this process without a
+        pool.
+        """
+        targets = list(targets)
+        if not targets:
+            return
+
+        target_indices = np.unique(np.concatenate([target.nonzero()[0] for target in targets]))
+        eligible = self.index.eligible(target_indices.tolist(), self.include_power)
+        model = self._prepare(MINIMIZE_INPUT, eligible, target_indices, None)
+
+        row_lowers = (self._row_lower(model, target, available_materials) for target in targets)
+
+        if max_workers == 1:
+            worker_model = _Model(MINIMIZE_INPUT, [], model.materials, model.matrix,
+                                  model.row_lower, model.costs)
+            results: Iterator[tuple[float, int, np.ndarray, np.ndarray]] = (
+                _solve_sweep_target(row_lower, worker_model) for row_lower in row_lowers)
+            for target_index, result in enumerate(results):
+                yield SweepResult(target_index, *result, nodes=model.nodes)
+            return
+
+        executor = ProcessPoolExecutor(max_workers, initializer=_init_sweep_worker,
+                                       initargs=(model.materials, model.matrix, model.costs))
+        try:
+            results = executor.map(_solve_sweep_target, row_lowers, chunksize=chunksize)
+            for target_index, result in enumerate(results):
+                yield SweepResult(target_index, *result, nodes=model.nodes)
+        finally:
+            # stop pending solves if the caller stops consuming results early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def maximize_output(self, available_materials: MaterialSpec,
+                        target_output: MaterialSpec) -> Solution:
+        """
+        Produce as many multiples of `target_output` as possible without consuming more than
+        `available_materials`.
+        """
+        target_indices = target_output.nonzero()[0]
+        eligible = self.index.eligible(target_indices.tolist(), self.include_power)
+
+        model = self._prepare(MAXIMIZE_OUTPUT, eligible, target_indices, target_output)
+        model.row_lower = self._row_lower(model, None, available_materials)
+        return self._solve(self._cache_key(MAXIMIZE_OUTPUT, target_output, available_materials))
+
+    def minimize_machines(self, target_output: MaterialSpec,
+                          available_materials: MaterialSpec | None = None, time_limit: float = 1.0,
+                          machines: Mapping["ProcessNode", "MachineData"] | None = None,
+                          heuristic_only: bool = False) -> MachinePlan:
+        """
+        Produce at least `target_output` with the fewest whole machines, weighted by node cost. Each
+        node gets an integer machine count bounding its scale, with underclocking covering the
+        remainder.
+
+        The LP relaxation is rounded up and repaired by re-solving with one machine fewer on a node
+        at a time, which is usually close to optimal. The rest of the `time_limit` seconds go to an
+        exact MILP, unless `heuristic_only`. The best plan found within the budget is returned, with
+        status OPTIMAL once its gap is closed and ITERATION_LIMIT otherwise. `machines` labels the
+        building each node runs in, for `MachinePlan.building_counts`.
+        """
+        deadline = time.monotonic() + time_limit
+        relaxation = self.minimize_input(target_output, available_materials)
+        model = self._current_model()
+
+        if not relaxation.success:
+            return MachinePlan(nodes=model.nodes, scales=relaxation.scales,
+                               objective=relaxation.objective, status=relaxation.status,
+                               message=relaxation.message,
+                               machines=np.zeros(len(model.nodes)), buildings=dict(machines or {}))
+
+        # machines are the objective, with the machine penalty on scales to avoid needless
+        # overproduction; in the relaxation machines equal scales, which bounds the objective from
+        # below
+        weights = model.costs
+        bound = (1 + MACHINE_PENALTY) * relaxation.objective
+        x, counts = _round_and_repair(model, relaxation.scales, deadline)
+        objective = float(weights @ counts + MACHINE_PENALTY * weights @ x)
+        status, message = ITERATION_LIMIT, "Rounded and repaired LP relaxation."
+
+        remaining = deadline - time.monotonic()
+        if not heuristic_only and remaining > 0 and objective - bound > TOLERANCE * abs(objective):
+            result = _solve_milp(model, remaining)
+            width = len(model.nodes)
+            if result.x is not None and result.fun < objective:
+                x, counts = result.x[:width], np.round(result.x[width:])
+                objective = float(result.fun)
+            if result.mip_dual_bound is not None and np.isfinite(result.mip_dual_bound):
+                bound = max(bound, float(result.mip_dual_bound))
+            if result.status == OPTIMAL:
+                bound = max(bound, objective)
+            message = result.message
+
+        if objective - bound <= TOLERANCE * abs(objective):
+            status = OPTIMAL
+
+        return MachinePlan(nodes=model.nodes, scales=x, objective=objective, status=status,
+                           message=message, machines=counts, bound=bound,
+                           buildings=dict(machines or {}))
+
+    def rank_alternates(self, target_output: MaterialSpec, candidates: Iterable["ProcessNode"],
+                        top_k: int = 5, available_materials: MaterialSpec | None = None,
+                        max_workers: int | None = None) -> list["AlternateRank"]:
+        """
+        Rank candidate nodes, e.g. alternate recipes, by how much adding each one to the optimizer's
+        nodes would lower the cost of producing `target_output`. Every candidate is priced by its
+        reduced cost at the shadow prices of one solve, which covers the materials of all
+        candidates. A candidate with a non-negative reduced cost cannot improve the plan on its own,
+        and one consuming a material no base node supplies is priced at infinity. Of the rest, the
+        `top_k` most negative are confirmed by re-solving with the candidate added, spread over
+        `max_workers` processes (`max_workers=1` solves in this process).
+
+        Confirmed candidates come first, by improvement, followed by the rest by reduced cost.
+        """
+        candidates = list(candidates)
+        target_indices = target_output.nonzero()[0]
+        required = np.unique(np.concatenate([target_indices.astype(np.intp)] + [
+            np.concatenate([node.input_materials.nonzero()[0],
+                            node.output_materials.nonzero()[0]]).astype(np.intp)
+            for node in candidates]))
+        # with the candidates' materials as rows, their producers compete with them and get priced
+        eligible = self.index.eligible(required.tolist(), self.include_power)
+
+        model = self._prepare(MINIMIZE_INPUT, eligible, required, None)
+        model.row_lower = self._row_lower(model, target_output, available_materials)
+        base = self._solve()
+        sensitivity = base.sensitivity
+
+        if not base.success or sensitivity is None:
+            raise RuntimeError("Cannot rank alternates, the base optimization failed: "
+                               f"{base.message}")
+
+        # the dual of a material nothing supplies is arbitrary, a candidate consuming it never runs
+        produced = np.asarray(model.matrix.maximum(0).sum(axis=1)).ravel() > 0
+        supplied = produced | (model.row_lower < 0)
+        unsupplied = set(model.materials[~supplied[:len(model.materials)]].tolist())
+
+        estimates = [np.inf if unsupplied.intersection(node.input_materials.nonzero()[0].tolist())
+                     else sensitivity.price(node, self.costs.get(node, 1)) for node in candidates]
+        order = sorted(range(len(candidates)), key=lambda i: estimates[i])
+        confirm = [i for i in order[:top_k] if estimates[i] < -TOLERANCE]
+        columns = [self._column(model, candidates[i]) for i in confirm]
+
+        if max_workers == 1:
+            results = [_solve_alternate(column, model) for column in columns]
+        else:
+            with ProcessPoolExecutor(max_workers, initializer=_init_alternate_worker,
+                                     initargs=(model.materials, model.matrix, model.costs,
+                                               model.row_lower)) as executor:
+                results = list(executor.map(_solve_alternate, columns))
+
+        confirmed = dict(zip(confirm, results, strict=True))
+        ranks = []
+        for i in order:
+            rank = AlternateRank(node=candidates[i], reduced_cost=estimates[i])
+            if (result := confirmed.get(i)) is not None:
+                rank.objective, rank.status, rank.scale = result
+                rank.improvement = base.objective - rank.objective
+            ranks.append(rank)
+
+        return sorted(ranks, key=lambda rank: (not rank.confirmed, -(rank.improvement or 0),
+                                               rank.reduced_cost))
+
+    def _column(self, model: _Model, node: "ProcessNode") -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Non-zero rows, values and cost of a node as a column of `model`, whose rows must cover its
+        materials.
+        """
+        values = np.zeros(model.matrix.shape[0])
+        rows = len(model.materials)
+        values[:rows] = (node.output_materials.to_array()[model.materials]
+                         - node.input_materials.to_array()[model.materials])
+        if self.include_power:
+            values[rows] = node.power_production - node.power_consumption
+
+        nonzero = np.flatnonzero(values)
+        return nonzero, values[nonzero], self.costs.get(node, 1)
+
+    def set_costs(self, costs: Mapping["ProcessNode", float]) -> None:
+        """
+        Update node costs, applied to the next solve.
+        """
+        self.costs.update(costs)
+        if self._model is not None:
+            self._model.costs = self._costs(self._model.mode, self._model.nodes)
+
+    def resolve(self) -> Solution:
+        """
+        Solve the current model again, e.g. after `set_costs`.
+        """
+        model = self._current_model()
+        return self._solve(self._cache_key(model.mode, model.target, None, model))
+
+    def _current_model(self) -> _Model:
+        if self._model is None:
+            raise RuntimeError("Nothing to re-solve, call minimize_input or maximize_output first.")
+        return self._model
+
+    def _node_digests(self) -> dict["ProcessNode", bytes]:
+        if self._digests_fingerprint != self.index.fingerprint:
+            self._digests = {node: node_digest(node) for node in self.index}
+            self._content_digest = b"".join(sorted(self._digests.values()))
+            self._digests_fingerprint = self.index.fingerprint
+        return self._digests
+
+    def _cache_key(self, mode: str, target: MaterialSpec | None,
+                   available_materials: MaterialSpec | None,
+                   model: _Model | None = None) -> str | None:
+        """
+        Content hash of everything that determines the solution: request, node set, costs and
+        solver. Re-solves pass the `model`, whose rows, columns and row bounds stand in for the
+        request.
+        """
+        if self.cache is None:
+            return None
+
+        digests = self._node_digests()
+        costs = sorted(digests[node] + np.float64(cost).tobytes()
+                       for node, cost in self.costs.items() if node in digests)
+        solver = "linprog" if highspy is None else "highspy"
+        parts: list[bytes | str] = [mode, str(self.include_power), str(self.ranging), solver,
+                                    repr(MACHINE_PENALTY), self._content_digest, b"".join(costs)]
+
+        if target is not None:
+            parts += [schema_digest(type(target)), spec_digest(target)]
+        if available_materials is not None:
+            parts.append(spec_digest(available_materials))
+        if model is not None:
+            # row bounds only mean something together with the materials of the rows and the columns
+            parts += [model.materials.tobytes(), model.row_lower.tobytes(),
+                      b"".join(digests[node] for node in model.nodes)]
+
+        return self.cache.key(parts)
+
+    def _costs(self, mode: str, nodes: Sequence["ProcessNode"]) -> np.ndarray:
+        default = 1 if mode == MINIMIZE_INPUT else MACHINE_PENALTY
+        costs = [self.costs.get(node, default) for node in nodes]
+
+        if mode == MAXIMIZE_OUTPUT:
+            # reward for producing more output
+            costs.append(-1)
+
+        return np.array(costs, dtype=np.float64)
+
+    def _prepare(self, mode: str, eligible: set["ProcessNode"], required_materials: np.ndarray,
+                 target: MaterialSpec | None) -> _Model:
+        model = self._model
+        if (model is not None
+                and model.mode == mode
+                and (target is None or model.target == target)
+                and eligible.issubset(model.columns)
+                and all(material in model.rows for material in required_materials.tolist())):
+            return model
+
+        nodes = list(eligible)
+        if model is not None and model.mode == mode:
+            nodes = model.nodes + [node for node in nodes if node not in model.columns]
+            required_materials = np.union1d(required_materials, model.materials)
+
+        matrix, materials = constraint_matrix(nodes, self.include_power, required_materials)
+
+        if mode == MAXIMIZE_OUTPUT and target is not None:
+            # sink column consuming one multiple of the target, mirroring the sources that supply
+            # ingredients when minimizing input
+            consumed = -target.to_array()[materials]
+            if self.include_power:
+                consumed = np.append(consumed, 0)
+            matrix = hstack([matrix, csc_matrix(consumed[:, None])], format="csc")
+
+        self._model = model = _Model(mode=mode, nodes=nodes, materials=materials, matrix=matrix,
+                                     row_lower=np.zeros(matrix.shape[0]),
+                                     costs=self._costs(mode, nodes), target=target)
+        return model
+
+    @staticmethod
+    def _row_lower(model: _Model, target_output: MaterialSpec | None,
+                   available_materials: MaterialSpec | None) -> np.ndarray:
+        # production + available >= target, or equivalently production >= target - available
+        row_lower = np.zeros(model.matrix.shape[0])
+        if target_output is not None:
+            row_lower[:len(model.materials)] += target_output.to_array()[model.materials]
+        if available_materials is not None:
+            row_lower[:len(model.materials)] -= available_materials.to_array()[model.materials]
+
+        # with include_power, the last row is net power production >= 0
+        return row_lower
+
+    def _solve(self, cache_key: str | None = None) -> Solution:
+        model = self._current_model()
+
+        if (cache_key is not None and self.cache is not None
+                and (cached := self.cache.get(cache_key)) is not None):
+            self.solution = self._restore(cached)
+            return self.solution
+
+        model.ranging = self.ranging
+        x, objective, status, message = model.solve()
+
+        output_scale = None
+        if model.mode == MAXIMIZE_OUTPUT and x is not None:
+            output_scale = float(x[-1])
+            x = x[:-1]
+
+        if x is None:
+            x = np.full(len(model.nodes), np.nan)
+
+        sensitivity = None
+        if status == OPTIMAL and model.duals is not None:
+            sensitivity = self._sensitivity(model, model.duals)
+        self.solution = Solution(nodes=model.nodes, scales=x, objective=objective, status=status,
+                                 message=message, output_scale=output_scale,
+                                 sensitivity=sensitivity)
+
+        if cache_key is not None and self.cache is not None:
+            self.cache.put(cache_key, self._store(self.solution))
+
+        return self.solution
+
+    def _sensitivity(self, model: _Model, duals: np.ndarray) -> Sensitivity:
+        width = len(model.nodes)
+        rows = len(model.materials)
+        # a column's reduced cost is its cost less the value of what it produces at the row duals
+        reduced_costs = model.costs - model.matrix.T @ duals
+
+        return Sensitivity(nodes=model.nodes, materials=model.materials, shadow_prices=duals[:rows],
+                           reduced_costs=reduced_costs[:width],
+                           power_price=float(duals[rows]) if self.include_power else None,
+                           requirement_ranges=None if model.requirement_ranges is None else
+                           model.requirement_ranges[:rows],
+                           cost_ranges=None if model.cost_ranges is None else
+                           model.cost_ranges[:width])
+
+    def _store(self, solution: Solution) -> CachedSolution:
+        digests = self._node_digests()
+        used = [i for i, scale in enumerate(solution.scales.tolist()) if scale != 0]
+        sensitivity = solution.sensitivity
+        return CachedSolution(nodes=[digests[solution.nodes[i]] for i in used],
+                              scales=solution.scales[used], objective=solution.objective,
+                              status=solution.status, message=solution.message,
+                              output_scale=solution.output_scale,
+                              columns=None if sensitivity is None else
+                              [digests[node] for node in sensitivity.nodes],
+                              sensitivity=None if sensitivity is None else
+                              replace(sensitivity, nodes=[]))
+
+    def _restore(self, cached: CachedSolution) -> Solution:
+        """
+        Map a cached solution onto the current model's nodes by content. Nodes with equal content
+        take the stored scales in turn.
+        """
+        model = self._current_model()
+        digests = self._node_digests()
+
+        pending: dict[bytes, list[float]] = {}
+        for digest, scale in zip(cached.nodes, cached.scales.tolist()):
+            pending.setdefault(digest, []).append(scale)
+
+        scales = np.zeros(len(model.nodes))
+        if cached.status != OPTIMAL:
+            scales[:] = np.nan
+        for i, node in enumerate(model.nodes):
+            if stored := pending.get(digests[node]):
+                scales[i] = stored.pop(0)
+
+        return Solution(nodes=model.nodes, scales=scales, objective=cached.objective,
+                        status=cached.status, message=cached.message,
+                        output_scale=cached.output_scale,
+                        sensitivity=self._restore_sensitivity(cached))
+
+    def _restore_sensitivity(self, cached: CachedSolution) -> Sensitivity | None:
+        """
+        Cached sensitivity with its per node values reordered onto the current model's nodes, or
+        None if some node has no stored counterpart.
+        """
+        if cached.sensitivity is None or cached.columns is None:
+            return None
+
+        model = self._current_model()
+        digests = self._node_digests()
+        positions: dict[bytes, list[int]] = {}
+        for position, digest in enumerate(cached.columns):
+            positions.setdefault(digest, []).append(position)
+
+        order = []
+        for node in model.nodes:
+            if not (stored := positions.get(digests[node])):
+                return None
+            order.append(stored.pop(0))
+
+        sensitivity = cached.sensitivity
+        return replace(sensitivity, nodes=model.nodes,
+                       reduced_costs=sensitivity.reduced_costs[order],
+                       cost_ranges=None if sensitivity.cost_ranges is None else
+                       sensitivity.cost_ranges[order])
+
+
+@dataclass
+class SweepResult:
+    """
+    Outcome for one target of a sweep. Only the nodes the plan uses are stored, as `columns`
+    positions in the node list shared by every result of the sweep.
+    """
+    target_index: int
+    objective: float
+    status: int
+    columns: np.ndarray
+    scales: np.ndarray
+    nodes: list["ProcessNode"] = field(repr=False)
+
+    @property
+    def success(self) -> bool:
+        return self.status == OPTIMAL
+
+    def active(self) -> dict["ProcessNode", float]:
+        """
+        Nodes used by the plan, with their scales.
+        """
+        return {self.nodes[column]: float(scale)
+                for column, scale in zip(self.columns.tolist(), self.scales)}
+
+
+@dataclass
+class AlternateRank:
+    """
+    A candidate node from `ProcessOptimizer.rank_alternates`. `reduced_cost` estimates the change in
+    objective per unit of the node. Confirmed candidates also hold the objective and status of the
+    plan with the node added, the node's scale in it and the improvement over the base plan.
+    """
+    node: "ProcessNode"
+    reduced_cost: float
+    objective: float | None = None
+    status: int | None = None
+    scale: float | None = None
+    improvement: float | None = None
+
+    @property
+    def confirmed(self) -> bool:
+        return self.objective is not None
+
+
+def _round_and_repair(model: _Model, scales: np.ndarray,
+                      deadline: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Whole machines from a relaxed solution: round every scale up, which stays feasible, then
+    repeatedly take one machine away from the node with the most idle capacity and re-solve the
+    scales under the remaining machines, keeping the result whenever it needs fewer machines. Stops
+    at the deadline or when no node can lose a machine.
+    """
+    weights = model.costs
+
+    def objective(x: np.ndarray, counts: np.ndarray) -> float:
+        return float(weights @ counts + MACHINE_PENALTY * weights @ x)
+
+    counts = np.ceil(scales - TOLERANCE).clip(min=0)
+    x = np.minimum(scales, counts)
+    best = objective(x, counts)
+    tried: set[int] = set()
+
+    while time.monotonic() < deadline:
+        candidates = [column for column in np.flatnonzero(counts).tolist() if column not in tried]
+        if not candidates:
+            break
+
+        column = max(candidates, key=lambda column: counts[column] - x[column])
+        tried.add(column)
+
+        # unused nodes stay open, so production can move onto them
+        upper = np.where(counts > 0, counts, np.inf)
+        upper[column] -= 1
+        result = linprog(c=weights, bounds=np.column_stack([np.zeros(len(upper)), upper]),
+                         A_ub=model.matrix * -1, b_ub=model.row_lower * -1, method="highs")
+        if result.status != OPTIMAL:
+            continue
+
+        repaired_counts = np.ceil(result.x - TOLERANCE).clip(min=0)
+        repaired = np.minimum(result.x, repaired_counts)
+        if (value := objective(repaired, repaired_counts)) < best - TOLERANCE:
+            x, counts, best = repaired, repaired_counts, value
+            tried.clear()
+
+    return x, counts
+
+
+def _solve_milp(model: _Model, time_limit: float) -> OptimizeResult:
+    """
+    Scales and integer machine counts as one MILP: the model's constraints on scales, each scale at
+    most its machine count.
+    """
+    width = len(model.nodes)
+    weights = model.costs
+    constraints = [
+        LinearConstraint(hstack([model.matrix, csc_matrix(model.matrix.shape)], format="csc"),
+                         lb=model.row_lower, ub=np.inf),
+        LinearConstraint(hstack([identity(width), -identity(width)], format="csc"),
+                         lb=-np.inf, ub=0),
+    ]
+    return milp(c=np.concatenate([MACHINE_PENALTY * weights, weights]), constraints=constraints,
+                integrality=np.concatenate([np.zeros(width), np.ones(width)]),
+                bounds=Bounds(0, np.inf), options={"time_limit": time_limit})
+
+
+# model of the sweep worker process, set up once by `_init_sweep_worker`
+_sweep_worker: dict[str, _Model] = {}
+
+
+def _init_sweep_worker(materials: np.ndarray, matrix: csc_matrix, costs: np.ndarray) -> None:
+    _sweep_worker["model"] = _Model(MINIMIZE_INPUT, [], materials, matrix,
+                                    np.zeros(matrix.shape[0]), costs)
+
+
+def _solve_sweep_target(row_lower: np.ndarray,
+                        model: _Model | None = None) -> tuple[float, int, np.ndarray, np.ndarray]:
+    if model is None:
+        model = _sweep_worker["model"]
+    model.row_lower = row_lower
+    x, objective, status, _ = model.solve()
+
+    if x is None:
+        return objective, status, np.empty(0, dtype=np.intp), np.empty(0)
+
+    columns = np.flatnonzero(x > TOLERANCE)
+    return objective, status, columns, x[columns]
+
+
+def _init_alternate_worker(materials: np.ndarray, matrix: csc_matrix, costs: np.ndarray,
+                           row_lower: np.ndarray) -> None:
+    _sweep_worker["model"] = _Model(MINIMIZE_INPUT, [], materials, matrix, row_lower, costs)
+
+
+def _solve_alternate(column: tuple[np.ndarray, np.ndarray, float],
+                     model: _Model | None = None) -> tuple[float, int, float]:
+    if model is None:
+        model = _sweep_worker["model"]
+    x, objective, status, _ = model.solve_with_column(*column)
+    return objective, status, np.nan if x is None else float(x[-1])
+
+
+def solve_many(targets: Iterable[MaterialSpec],
+               process_nodes: "Iterable[ProcessNode] | ProcessIndex", include_power: bool = False,
+               available_materials: MaterialSpec | None = None,
+               costs: Mapping["ProcessNode", float] | None = None, max_workers: int | None = None,
+               chunksize: int = 1) -> Iterator[SweepResult]:
+    """
+    Minimize input for each of many targets over the same nodes, see `ProcessOptimizer.solve_many`.
+    """
+    optimizer = ProcessOptimizer(process_nodes, include_power, costs)
+    yield from optimizer.solve_many(targets, available_materials, max_workers, chunksize)
+
+
+def rank_alternates(target_output: MaterialSpec,
+                    process_nodes: "Iterable[ProcessNode] | ProcessIndex",
+                    candidates: Iterable["ProcessNode"], include_power: bool = False,
+                    available_materials: MaterialSpec | None = None,
+                    costs: Mapping["ProcessNode", float] | None = None, top_k: int = 5,
+                    max_workers: int | None = None) -> list[AlternateRank]:
+    """
+    Rank candidate alternates against base nodes, see `ProcessOptimizer.rank_alternates`.
+    """
+    optimizer = ProcessOptimizer(process_nodes, include_power, costs)
+    return optimizer.rank_alternates(target_output, candidates, top_k, available_materials,
+                                     max_workers)
+
+
+if highspy is not None:
+    _HIGHS_STATUS = {
+        highspy.HighsModelStatus.kOptimal: OPTIMAL,
+        highspy.HighsModelStatus.kIterationLimit: ITERATION_LIMIT,
+        highspy.HighsModelStatus.kTimeLimit: ITERATION_LIMIT,
+        highspy.HighsModelStatus.kInfeasible: INFEASIBLE,
+        highspy.HighsModelStatus.kUnboundedOrInfeasible: INFEASIBLE,
+        highspy.HighsModelStatus.kUnbounded: UNBOUNDED,
+    }
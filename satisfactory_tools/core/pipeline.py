@@ -0,0 +1,134 @@
+from functools import reduce
+from operator import rshift
+from typing import TYPE_CHECKING, Sequence, overload
+
+import numpy as np
+
+from satisfactory_tools.core.material import MaterialSpec
+from satisfactory_tools.core.material_batch import MaterialBatch
+
+if TYPE_CHECKING:
+    from satisfactory_tools.core.process import ProcessNode
+
+
+class ProcessPipeline:
+    """
+    A chain of ProcessNodes compiled once for repeated evaluation. `outputs` gives the same result
+    as `inputs >> first >> ... >> last` and `inputs` the same as `first >> ... >> last >> outputs`,
+    but for a whole batch of specs or levels at a time: each hop is one vectorized min-ratio over
+    the batch instead of a MaterialSpec construction per hop and per spec.
+    """
+    __slots__ = ("_hops", "_pooled_inputs", "_pooled_outputs", "nodes", "spec_type")
+
+    nodes: tuple["ProcessNode", ...]
+    spec_type: type[MaterialSpec]
+    # positive input indices, their amounts and the dense outputs of each node, in chain order
+    _hops: tuple[tuple[np.ndarray, np.ndarray, np.ndarray], ...]
+    _pooled_inputs: np.ndarray
+    _pooled_outputs: np.ndarray
+
+    def __init__(self, *nodes: "ProcessNode") -> None:
+        if not nodes:
+            raise ValueError("Cannot compile an empty pipeline.")
+
+        spec_type = type(nodes[0].input_materials)
+        names = spec_type.material_names()
+        if any(node.input_materials.material_names() != names
+               or node.output_materials.material_names() != names for node in nodes):
+            raise ValueError("All nodes of a pipeline must use the same materials.")
+
+        hops = []
+        for node in nodes:
+            indices, amounts = node.input_materials.nonzero()
+            positive = amounts > 0
+            hops.append((indices[positive], amounts[positive],
+                         node.output_materials.to_array().copy()))
+
+        # `first >> ... >> last` pools the chain into one composite node, so solving for inputs is
+        # one hop
+        pooled = reduce(rshift, nodes)
+
+        self.nodes = nodes
+        self.spec_type = spec_type
+        self._hops = tuple(hops)
+        self._pooled_inputs = pooled.input_materials.to_array().copy()
+        self._pooled_outputs = pooled.output_materials.to_array().copy()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        return " >> ".join(node.name for node in self.nodes)
+
+    def _batch(self, specs: MaterialSpec | MaterialBatch,
+               levels: Sequence[float] | np.ndarray | None) -> np.ndarray:
+        if isinstance(specs, MaterialBatch):
+            if levels is not None:
+                raise ValueError("Levels only apply to a single spec.")
+            return specs.matrix
+
+        values = specs.to_array()
+        if levels is None:
+            return values[None, :]
+        return np.asarray(levels, dtype=np.float64)[:, None] * values
+
+    @staticmethod
+    def _scales(matrix: np.ndarray, indices: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+        """
+        `spec // materials` for every row of `matrix` at once.
+        """
+        if not len(indices):
+            raise ZeroDivisionError("Cannot divide by empty MaterialSpec.")
+
+        return np.min(matrix[:, indices] // amounts, axis=1)
+
+    def _result(self, matrix: np.ndarray, specs: MaterialSpec | MaterialBatch,
+                levels: Sequence[float] | np.ndarray | None) -> MaterialSpec | MaterialBatch:
+        if isinstance(specs, MaterialSpec) and levels is None:
+            return self.spec_type.from_array(matrix[0])
+        return MaterialBatch(self.spec_type, matrix)
+
+    @overload
+    def outputs(self, inputs: MaterialSpec) -> MaterialSpec: ...
+
+    @overload
+    def outputs(self, inputs: MaterialSpec,
+                levels: Sequence[float] | np.ndarray) -> MaterialBatch: ...
+
+    @overload
+    def outputs(self, inputs: MaterialBatch) -> MaterialBatch: ...
+
+    def outputs(self, inputs: MaterialSpec | MaterialBatch,
+                levels: Sequence[float] | np.ndarray | None = None) -> MaterialSpec | MaterialBatch:
+        """
+        Outputs of running `inputs` through each node in turn, as `inputs >> first >> ... >> last`.
+        Given `levels`, one row per multiple `level * inputs`; given a batch, one row per spec in
+        the batch.
+        """
+        matrix = self._batch(inputs, levels)
+        for indices, amounts, outputs in self._hops:
+            matrix = self._scales(matrix, indices, amounts)[:, None] * outputs
+
+        return self._result(matrix, inputs, levels)
+
+    @overload
+    def inputs(self, outputs: MaterialSpec) -> MaterialSpec: ...
+
+    @overload
+    def inputs(self, outputs: MaterialSpec,
+               levels: Sequence[float] | np.ndarray) -> MaterialBatch: ...
+
+    @overload
+    def inputs(self, outputs: MaterialBatch) -> MaterialBatch: ...
+
+    def inputs(self, outputs: MaterialSpec | MaterialBatch,
+               levels: Sequence[float] | np.ndarray | None = None) -> MaterialSpec | MaterialBatch:
+        """
+        Inputs needed for `outputs`, as `first >> ... >> last >> outputs`, with `levels` and batches
+        as in `outputs`.
+        """
+        matrix = self._batch(outputs, levels)
+        indices = np.flatnonzero(self._pooled_outputs > 0)
+        scales = self._scales(matrix, indices, self._pooled_outputs[indices])
+
+        return self._result(scales[:, None] * self._pooled_inputs, outputs, levels)
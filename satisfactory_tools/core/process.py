@@ -1,46 +1,103 @@
-from dataclasses import dataclass, fields
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
 from functools import singledispatchmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable, Mapping
 
 import networkx as nx
 import numpy as np
-from pydantic import BaseModel
-from scipy.optimize import linprog
+from pydantic import BaseModel, ConfigDict, InstanceOf
 from typing_extensions import Self
 
-from core.material import MaterialSpec
+from satisfactory_tools.core.decomposition import topological_output_plan, topological_plan
+from satisfactory_tools.core.material import MaterialSpec
+from satisfactory_tools.core.material_batch import MaterialBatch
+from satisfactory_tools.core.optimizer import (
+    MACHINE_PENALTY,
+    MachinePlan,
+    ProcessOptimizer,
+    Sensitivity,
+    Solution,
+)
+from satisfactory_tools.core.pipeline import ProcessPipeline
+from satisfactory_tools.core.process_index import ProcessIndex
+from satisfactory_tools.core.solution_cache import DEFAULT_CACHE, SolutionCache
 
+if TYPE_CHECKING:
+    from satisfactory_tools.config.machines import MachineData
 
-def dataclass_to_list(dc):
-    return [getattr(dc, f.name) for f in fields(dc)]
 
 class _SignalClass:
     """
     Used for single dispatch on Self type
     """
+    __slots__ = ()
+
+class ProcessNode(_SignalClass):
+    """
+    A recipe, or a pool of recipes, as the materials it consumes and produces per unit of scale.
+    Nodes are built in bulk, on every `>>` and when loading the recipe catalog, so construction
+    stores its arguments without validation; use `model_validate` for nodes that come from outside,
+    e.g. a saved file. Nodes are treated as immutable once built and are identified by instance,
+    e.g. as graph vertices, rather than by value.
+    """
+    __slots__ = ("input_materials", "internal_nodes", "name", "output_materials",
+                 "power_consumption", "power_production", "scale")
 
-class ProcessNode(BaseModel, _SignalClass):
     name: str  # TODO: use an enum of node types, rather than names, to make plotting easier
     input_materials: MaterialSpec
     output_materials: MaterialSpec
     power_production: float
     power_consumption: float
-    internal_nodes: set[Self] = field(default=set)
-    scale: float = 1
+    internal_nodes: frozenset["ProcessNode"]
+    scale: float
+
+    def __init__(self, name: str, input_materials: MaterialSpec, output_materials: MaterialSpec,
+                 power_production: float, power_consumption: float,
+                 internal_nodes: Iterable["ProcessNode"] = frozenset(), scale: float = 1) -> None:
+        self.name = name
+        self.input_materials = input_materials
+        self.output_materials = output_materials
+        self.power_production = power_production
+        self.power_consumption = power_consumption
+        self.internal_nodes = frozenset(internal_nodes)
+        self.scale = scale
 
     @classmethod
-    def from_nodes(cls, *nodes: Self) -> Self:
-        empty = nodes[0].input_materials.empty()  # FIXME: why
-        sum_inputs = sum((node.input_materials for node in nodes), empty)
-        sum_outputs = sum((node.output_materials for node in nodes), empty)
+    def model_validate(cls, data: Mapping[str, Any]) -> Self:
+        """
+        Build a node from untrusted data, checking field types and that both specs share a schema.
+        """
+        fields = _ProcessNodeFields.model_validate(data)
+        if fields.input_materials.material_names() != fields.output_materials.material_names():
+            raise ValueError("Input and output materials must use the same materials.")
 
-        net_inputs = (sum_inputs - (sum_outputs | sum_inputs)) > 0
-        net_outputs = (sum_outputs - (sum_inputs | sum_outputs)) > 0
+        return cls(fields.name, fields.input_materials, fields.output_materials,
+                   fields.power_production, fields.power_consumption,
+                   internal_nodes=fields.internal_nodes, scale=fields.scale)
+
+    def model_dump(self) -> dict[str, Any]:
+        """
+        Fields of this node as accepted by `model_validate`.
+        """
+        return {name: getattr(self, name) for name in _ProcessNodeFields.model_fields}
+
+    @staticmethod
+    def _net_flow(nodes: tuple["ProcessNode", ...]) -> tuple[MaterialSpec, MaterialSpec]:
+        spec_type = type(nodes[0].input_materials)
+        inputs = MaterialBatch.from_specs((node.input_materials for node in nodes), spec_type)
+        outputs = MaterialBatch.from_specs((node.output_materials for node in nodes), spec_type)
+
+        return MaterialBatch.net_flow(inputs, outputs)
+
+    @classmethod
+    def from_nodes(cls, *nodes: Self) -> Self:
+        net_inputs, net_outputs = cls._net_flow(nodes)
 
         power_production = sum(node.power_production for node in nodes)
         power_consumption = sum(node.power_consumption for node in nodes)
 
-        return cls(name="Composite", input_materials=net_inputs, output_materials=net_outputs,power_production=power_production, power_consumption=power_consumption, internal_nodes=set(nodes))
+        return cls("Composite", net_inputs, net_outputs, power_production, power_consumption,
+                   internal_nodes=nodes)
 
     def __repr__(self) -> str:
         ingredients = " ".join(repr(self.input_materials).splitlines())
@@ -57,8 +114,9 @@ class ProcessNode(BaseModel, _SignalClass):
 
     @__rshift__.register
     def _(self, other: MaterialSpec) -> MaterialSpec:
+        # a spec floor divided by a spec is a float, which the dispatcher's signature cannot express
         scale = other // self.output_materials
-        return self.input_materials * scale
+        return self.input_materials * scale  # type: ignore[operator]
 
     @__rshift__.register(_SignalClass)
     def _(self, other: Self) -> Self:
@@ -74,13 +132,21 @@ class ProcessNode(BaseModel, _SignalClass):
 
     @__lshift__.register
     def _(self, other: MaterialSpec) -> MaterialSpec:
-        scale = self.input_materials // other
-        return self.output_materials * scale
+        scale = other // self.input_materials
+        return self.output_materials * scale  # type: ignore[operator]
 
     @__lshift__.register(_SignalClass)
     def _(self, other: Self) -> Self:
         return self.from_nodes(other, self)
 
+    @staticmethod
+    def compile(*nodes: "ProcessNode") -> ProcessPipeline:
+        """
+        Compile `first >> second >> ...` into a pipeline that evaluates many input or output levels
+        at once
+        """
+        return ProcessPipeline(*nodes)
+
     def __rrshift__(self, other: Self | MaterialSpec | Any) -> Self | MaterialSpec:
         """
         Solve for inputs or join process nodes
@@ -116,22 +182,263 @@ class CompositeProcessNode(ProcessNode):
     graphs. These are suitable for abstracting away network details for use as nodes in larger optimizations or
     calculating material throughput, but not for optimizing network topology.
     """
-    nodes: set[ProcessNode]
+    __slots__ = ("nodes",)
 
-    def __init__(self, *nodes: ProcessNode) -> None:
-        # TODO: make empty materials
-        empty = nodes[0].input_materials.empty()  # FIXME: why
-        sum_inputs = sum((node.input_materials for node in nodes), empty)
-        sum_outputs = sum((node.output_materials for node in nodes), empty)
+    nodes: frozenset[ProcessNode]
 
-        net_inputs = (sum_inputs - (sum_outputs | sum_inputs)) > 0
-        net_outputs = (sum_outputs - (sum_inputs | sum_outputs)) > 0
+    def __init__(self, *nodes: ProcessNode) -> None:
+        net_inputs, net_outputs = self._net_flow(nodes)
 
         power_production = sum(node.power_production for node in nodes)
         power_consumption = sum(node.power_consumption for node in nodes)
-        self.nodes = set(nodes)
 
-        super().__init__(name="Composite", input_materials=net_inputs, output_materials=net_outputs,power_production=power_production, power_consumption=power_consumption)
+        super().__init__("Composite", net_inputs, net_outputs, power_production, power_consumption)
+        self.nodes = frozenset(nodes)
+
+
+class _ProcessNodeFields(BaseModel):
+    """
+    Field types of a ProcessNode, checked by `ProcessNode.model_validate`.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    # MaterialSpecs are dataclasses, which pydantic would otherwise build from dicts
+    input_materials: InstanceOf[MaterialSpec]
+    output_materials: InstanceOf[MaterialSpec]
+    power_production: float
+    power_consumption: float
+    internal_nodes: frozenset[ProcessNode] = frozenset()
+    scale: float = 1
+
+
+@dataclass
+class PresolvedProcess:
+    """
+    Reduced node set for one optimization request. Chains of nodes whose outputs all feed a single
+    other node are merged into CompositeProcessNodes, and `expansions` maps each merged node to the
+    original nodes it runs per unit of its scale. `dropped` holds the nodes that can never run or
+    are dominated by another recipe for the same product. `costs` holds the cost of every remaining
+    node, merged nodes costing the sum of their parts, and `original_costs` the cost of each node
+    kept by presolve. `merges` records each merge in order, as the producer, the linking material
+    that set the merge ratio and the producer's cost, to price the linking materials when expanding
+    a sensitivity report.
+    """
+    index: ProcessIndex
+    costs: dict[ProcessNode, float]
+    expansions: dict[ProcessNode, list[tuple[ProcessNode, float]]]
+    dropped: set[ProcessNode]
+    original_costs: dict[ProcessNode, float] = field(default_factory=dict)
+    merges: list[tuple[ProcessNode, int, float]] = field(default_factory=list)
+
+    @property
+    def nodes(self) -> list[ProcessNode]:
+        return list(self.index)
+
+    def expand(self, solution: Solution) -> Solution:
+        """
+        Solution over the original nodes, from a solution over the presolved nodes.
+        """
+        scales: dict[ProcessNode, float] = {}
+        for node, scale in zip(solution.nodes, solution.scales.tolist()):
+            for original, ratio in self.expansions.get(node, ((node, 1.0),)):
+                scales[original] = scales.get(original, 0.0) + scale * ratio
+
+        nodes = list(scales)
+        sensitivity = None
+        if solution.sensitivity is not None:
+            sensitivity = self._expand_sensitivity(solution.sensitivity, nodes)
+        return Solution(nodes=nodes, scales=np.array(list(scales.values()), dtype=np.float64),
+                        objective=solution.objective, status=solution.status,
+                        message=solution.message, output_scale=solution.output_scale,
+                        sensitivity=sensitivity)
+
+    def _expand_sensitivity(self, sensitivity: Sensitivity,
+                            nodes: list[ProcessNode]) -> Sensitivity:
+        """
+        Sensitivity over the original nodes. Materials merged away are priced, latest merge first,
+        so that each merged producer breaks even; with these prices every merged node's reduced cost
+        is that of the merged node containing it. Cost ranges only apply to the presolved nodes and
+        are dropped.
+        """
+        prices = dict(zip(sensitivity.materials.tolist(), sensitivity.shadow_prices.tolist()))
+        ranges = {} if sensitivity.requirement_ranges is None else \
+            dict(zip(sensitivity.materials.tolist(), sensitivity.requirement_ranges.tolist()))
+        power_price = sensitivity.power_price or 0.0
+
+        for producer, material, cost in reversed(self.merges):
+            inputs, amounts = producer.input_materials.nonzero()
+            value = cost + sum(prices.get(input, 0.0) * amount
+                               for input, amount in zip(inputs.tolist(), amounts))
+            value -= power_price * (producer.power_production - producer.power_consumption)
+            prices[material] = value / producer.output_materials.to_array()[material]
+
+        materials = np.array(sorted(prices), dtype=np.intp)
+        shadow_prices = np.array([prices[material] for material in materials.tolist()])
+        expanded = Sensitivity(nodes=nodes, materials=materials, shadow_prices=shadow_prices,
+                               reduced_costs=np.empty(0), power_price=sensitivity.power_price)
+        expanded.reduced_costs = np.array([expanded.price(node, self.original_costs.get(node, 1))
+                                           for node in nodes])
+        if ranges:
+            expanded.requirement_ranges = np.array([ranges.get(material, (np.nan, np.nan))
+                                                    for material in materials.tolist()])
+        return expanded
+
+
+# presolved node sets by request, so that repeated optimizations over the same recipes get the same
+# merged nodes, and with them reuse the index and model built for those nodes
+_PRESOLVED: OrderedDict[tuple[Any, ...], PresolvedProcess] = OrderedDict()
+PRESOLVE_CACHE_SIZE = 8
+
+
+def _starved(nodes: Iterable[ProcessNode], available: frozenset[int]) -> set[ProcessNode]:
+    """
+    Nodes that can never run: they consume a material that is neither available nor produced by any
+    node that can run, so its balance forces them to zero. Loops that sustain themselves are kept.
+    """
+    nodes = set(nodes)
+    producers: dict[int, int] = defaultdict(int)
+    consumers: dict[int, list[ProcessNode]] = defaultdict(list)
+    for node in nodes:
+        for material in node.output_materials.nonzero()[0].tolist():
+            producers[material] += 1
+        for material in node.input_materials.nonzero()[0].tolist():
+            consumers[material].append(node)
+
+    pending = [material for material in consumers
+               if material not in available and not producers[material]]
+    starved: set[ProcessNode] = set()
+
+    while pending:
+        for node in consumers[pending.pop()]:
+            if node in starved:
+                continue
+            starved.add(node)
+            for material in node.output_materials.nonzero()[0].tolist():
+                producers[material] -= 1
+                if not producers[material] and material not in available:
+                    pending.append(material)
+
+    return starved
+
+
+def _dominated(nodes: Iterable[ProcessNode], costs: Mapping[ProcessNode, float],
+               default_cost: float, include_power: bool) -> set[ProcessNode]:
+    """
+    Single product recipes for which another recipe of the same product needs no more of any input,
+    cost or power per unit of product. Of identical recipes, all but the first are dominated.
+    """
+    groups: dict[int, list[ProcessNode]] = defaultdict(list)
+    profiles: dict[ProcessNode, np.ndarray] = {}
+    for node in nodes:
+        outputs, amounts = node.output_materials.nonzero()
+        if len(outputs) != 1:
+            continue
+
+        profile: list[np.ndarray | list[float]] = [node.input_materials.to_array(),
+                                                   [costs.get(node, default_cost)]]
+        if include_power:
+            profile.append([node.power_consumption, -node.power_production])
+        profiles[node] = np.concatenate(profile) / amounts[0]
+        groups[int(outputs[0])].append(node)
+
+    dominated: set[ProcessNode] = set()
+    for group in groups.values():
+        kept: list[ProcessNode] = []
+        for node in group:
+            if any(np.all(profiles[other] <= profiles[node]) for other in kept):
+                dominated.add(node)
+                continue
+
+            beaten = {other for other in kept if np.all(profiles[node] <= profiles[other])}
+            dominated |= beaten
+            kept = [other for other in kept if other not in beaten] + [node]
+
+    return dominated
+
+
+def _scaled(node: ProcessNode, ratio: float) -> ProcessNode:
+    spec_type = type(node.input_materials)
+    return ProcessNode(node.name, spec_type.from_array(node.input_materials.to_array() * ratio),
+                       spec_type.from_array(node.output_materials.to_array() * ratio),
+                       node.power_production * ratio, node.power_consumption * ratio)
+
+
+def _chain_consumer(index: ProcessIndex, producer: ProcessNode, protected: frozenset[int],
+                    include_power: bool) -> ProcessNode | None:
+    """
+    The one node consuming everything `producer` makes, if `producer` is the only source of each of
+    those materials and none of them is a target or available. Running `producer` beyond that
+    consumer's needs can then only waste cost.
+    """
+    outputs = producer.output_materials.nonzero()[0].tolist()
+    if not outputs or (include_power and producer.power_production > 0):
+        return None
+
+    consumer = None
+    for material in outputs:
+        consumers = index.consumers.get(material, ())
+        if (material in protected or len(index.producers.get(material, ())) != 1
+                or len(consumers) != 1):
+            return None
+        (other,) = consumers
+        if other is producer or (consumer is not None and other is not consumer):
+            return None
+        consumer = other
+
+    return consumer
+
+
+def _collapse_chains(index: ProcessIndex, protected: frozenset[int],
+                     costs: dict[ProcessNode, float], include_power: bool,
+                     merges: list[tuple[ProcessNode, int, float]]
+                     ) -> dict[ProcessNode, list[tuple[ProcessNode, float]]]:
+    """
+    Merge each producer into its chain consumer in place, at the ratio that covers the consumer's
+    needs, until no chains remain, appending each merge to `merges`. Returns the expansion of each
+    merged node into original nodes.
+    """
+    expansions: dict[ProcessNode, list[tuple[ProcessNode, float]]] = {}
+    pending = list(index)
+
+    while pending:
+        producer = pending.pop()
+        if producer not in index or costs[producer] < 0:
+            continue
+        if (consumer := _chain_consumer(index, producer, protected, include_power)) is None:
+            continue
+
+        linked, produced = producer.output_materials.nonzero()
+        needed = consumer.input_materials.to_array()[linked]
+        ratios = needed / produced
+        ratio = float(ratios.max())
+        merges.append((producer, int(linked[ratios.argmax()]), costs[producer]))
+
+        merged = CompositeProcessNode(_scaled(producer, ratio), consumer)
+        # the linking materials cancel, up to rounding in the ratio
+        spec_type = type(merged.input_materials)
+        net_inputs = merged.input_materials.to_array().copy()
+        net_inputs[linked] = 0
+        net_outputs = merged.output_materials.to_array().copy()
+        net_outputs[linked] = np.where(net_outputs[linked] > 1e-9 * needed, net_outputs[linked], 0)
+        merged.input_materials = spec_type.from_array(net_inputs)
+        merged.output_materials = spec_type.from_array(net_outputs)
+
+        index.remove(producer)
+        index.remove(consumer)
+        index.add(merged)
+
+        costs[merged] = costs.pop(consumer) + ratio * costs.pop(producer)
+        produced = expansions.pop(producer, [(producer, 1.0)])
+        expansions[merged] = [*expansions.pop(consumer, [(consumer, 1.0)]),
+                              *((node, ratio * scale) for node, scale in produced)]
+
+        # the merged node may now end a chain, or be the only consumer of its suppliers
+        pending.append(merged)
+        for material in merged.input_materials.nonzero()[0].tolist():
+            pending.extend(index.producers.get(material, ()))
+
+    return expansions
 
 
 class Process(ProcessNode):
@@ -142,7 +449,7 @@ class Process(ProcessNode):
     different contexts or optimizations. Representing the graph this way saves us from needing an additional
     intermediate class or modifying nodes.
 
-    # TODO: save solution to Process
+    Solutions are kept by ProcessOptimizer, which the optimization classmethods use.
     """
     graph: nx.MultiGraph
 
@@ -151,89 +458,154 @@ class Process(ProcessNode):
         super().__init__(process_graph.nodes)
 
     @classmethod
-    def _filter_eligible_nodes(cls, output_node: ProcessNode, available_nodes: list[ProcessNode]) -> list[ProcessNode]:
-        graph = cls._make_graph([output_node] + available_nodes)
-        return nx.ancestors(graph, output_node) | {output_node}
+    def _filter_eligible_nodes(cls, output_node: ProcessNode,
+                               available_nodes: list[ProcessNode] | ProcessIndex,
+                               include_power: bool = False) -> set[ProcessNode]:
+        """
+        The output node and every available node upstream of it. With `include_power`, power
+        producers and their suppliers are eligible too, since they are not upstream of any material
+        output.
+        """
+        materials = output_node.input_materials.nonzero()[0].tolist()
+        return {output_node} | ProcessIndex.of(available_nodes).eligible(materials, include_power)
 
-    @staticmethod
-    def _make_graph(nodes: list[ProcessNode]) -> nx.MultiGraph:
-        graph = nx.MultiGraph()
-        graph.add_nodes_from(nodes)
-
-        for i, node_1 in enumerate(nodes):
-            for node_2 in nodes[i:]:
-                # TODO: add all materials as attributes to node
-                # TODO: add scale attribute to node
-                # TODO: add cost attribute to node
-                if any(v for _, v in node_1.input_materials | node_2.output_materials):
-                    graph.add_edge(node_1, node_2)
-                if any(v for _, v in node_2.input_materials | node_1.output_materials):
-                    graph.add_edge(node_2, node_1)
-
-        return graph
+    @classmethod
+    def _make_graph(cls, nodes: list[ProcessNode] | ProcessIndex) -> nx.MultiDiGraph:
+        """
+        Directed graph with an edge from producer to consumer for each material they share, keyed by
+        the material's index.
+        """
+        # TODO: add scale attribute to node
+        # TODO: add cost attribute to node
+        return ProcessIndex.of(nodes).graph()
 
     @classmethod
-    def minimize_input(cls, target_output: MaterialSpec, process_nodes: list[ProcessNode],include_power=False):
+    def presolve(cls, target_output: MaterialSpec, process_nodes: list[ProcessNode] | ProcessIndex,
+                 available_materials: MaterialSpec | None = None, include_power: bool = False,
+                 costs: Mapping[ProcessNode, float] | None = None,
+                 default_cost: float = 1) -> PresolvedProcess:
         """
-        Find the weights on process nodes that produce the desired output with the least input and
-        process cost.
-        
-        # TODO: availability constraints
+        Shrink the node set before optimizing, without changing the optimal objective:
+        - nodes that are not upstream of the target, or consume a material nothing can supply, are
+          dropped
+        - single product recipes dominated by another recipe of the same product are dropped
+        - linear chains, where one node's outputs are only made by it and only used by one other
+          node, are merged into CompositeProcessNodes
+
+        Solve over `PresolvedProcess.index` with `PresolvedProcess.costs`, then `expand` the
+        solution back to per recipe scales. Results are reused for repeated requests over the same
+        node set.
         """
-        output = ProcessNode("Output", target_output, target_output, 0, 0)
+        index = ProcessIndex.of(process_nodes)
+        targets = frozenset(target_output.nonzero()[0].tolist())
+        available = frozenset() if available_materials is None else \
+            frozenset(available_materials.nonzero()[0].tolist())
+        costs = dict(costs or {})
+
+        key = (index.fingerprint, targets, available, include_power, default_cost,
+               frozenset(costs.items()))
+        if (presolved := _PRESOLVED.get(key)) is not None:
+            _PRESOLVED.move_to_end(key)
+            return presolved
+
+        eligible = index.eligible(targets, include_power)
+        starved = _starved(eligible, available)
+        runnable = [node for node in index if node in eligible and node not in starved]
+        dominated = _dominated(runnable, costs, default_cost, include_power)
+
+        reduced = ProcessIndex(node for node in runnable if node not in dominated)
+        # dropping recipes may leave their suppliers unused
+        upstream = reduced.eligible(targets, include_power)
+        for node in [node for node in reduced if node not in upstream]:
+            reduced.remove(node)
+
+        node_costs = {node: costs.get(node, default_cost) for node in reduced}
+        original_costs = dict(node_costs)
+        merges: list[tuple[ProcessNode, int, float]] = []
+        expansions = _collapse_chains(reduced, targets | available, node_costs, include_power,
+                                      merges)
+
+        presolved = _PRESOLVED[key] = PresolvedProcess(index=reduced, costs=node_costs,
+                                                       expansions=expansions,
+                                                       dropped=eligible - upstream,
+                                                       original_costs=original_costs, merges=merges)
+        while len(_PRESOLVED) > PRESOLVE_CACHE_SIZE:
+            _PRESOLVED.popitem(last=False)
+
+        return presolved
 
-        connected_nodes = cls._filter_eligible_nodes(output, process_nodes)
-        costs = [1 for _ in connected_nodes]  # TODO: cost per recipe
-        output_lower_bound = np.array(dataclass_to_list(target_output))
+    @classmethod
+    def minimize_input(cls, target_output: MaterialSpec,
+                       process_nodes: list[ProcessNode] | ProcessIndex, include_power=False,
+                       cache: SolutionCache | None = DEFAULT_CACHE, presolve: bool = True,
+                       decompose: bool = True) -> Solution:
+        """
+        Find the weights on process nodes that produce the desired output with the least input and
+        process cost. `process_nodes` may be a prebuilt ProcessIndex, to reuse it across
+        optimizations. Use a ProcessOptimizer directly to keep the model for re-solving with other
+        targets or costs.
+
+        Results are memoized in `cache`, pass None to always solve. With `presolve`, the LP runs on
+        the reduced node set from `presolve` and the solution is expanded back to the given nodes.
+        With `decompose`, node sets with a single producer per material are planned by
+        `topological_plan` without the full LP, or caching, unless power is included.
+        """
+        presolved = None
+        if presolve:
+            presolved = cls.presolve(target_output, process_nodes, include_power=include_power)
+        nodes = process_nodes if presolved is None else presolved.index
+        costs = None if presolved is None else presolved.costs
 
-        # matrix where each machine is a column and each material is a row
-        material_constraints = np.array(
-            [dataclass_to_list(node.output_materials - node.input_materials) 
-                + ([node.power_consumption - node.power_production] if include_power else []) 
-                for node in connected_nodes]).T
+        solution = None
+        if decompose and not include_power:
+            solution = topological_plan(nodes, target_output, costs=costs)
+        if solution is None:
+            optimizer = ProcessOptimizer(nodes, include_power, costs=costs, cache=cache)
+            solution = optimizer.minimize_input(target_output)
 
-        # use -1 factor to convert problem of materials * coeefficients >= outputs to minimization
-        # production >= target
-        bounds = (0, None)
-        solution = linprog(c=costs,
-                           bounds=bounds,
-                           A_ub=material_constraints * -1, b_ub=output_lower_bound * -1)
+        return solution if presolved is None else presolved.expand(solution)
 
-        # temporary during testing, parse into instance of self
-        return solution
+    @classmethod
+    def minimize_machines(cls, target_output: MaterialSpec,
+                          process_nodes: list[ProcessNode] | ProcessIndex, include_power=False,
+                          time_limit: float = 1.0,
+                          machines: Mapping[ProcessNode, "MachineData"] | None = None
+                          ) -> MachinePlan:
+        """
+        Like `minimize_input`, but with whole machines per node, see
+        `ProcessOptimizer.minimize_machines`. Runs on the given nodes without presolve, since merged
+        chains would fix machine ratios.
+        """
+        optimizer = ProcessOptimizer(process_nodes, include_power)
+        return optimizer.minimize_machines(target_output, time_limit=time_limit, machines=machines)
 
     @classmethod
-    def maximize_output(cls, available_materials: MaterialSpec, target_output: MaterialSpec, process_nodes: list[ProcessNode], include_power=False):
+    def maximize_output(cls, available_materials: MaterialSpec, target_output: MaterialSpec,
+                        process_nodes: list[ProcessNode] | ProcessIndex, include_power=False,
+                        cache: SolutionCache | None = DEFAULT_CACHE, presolve: bool = True,
+                        decompose: bool = True) -> Solution:
         """
         Maximize production of output materials where input materials are constrained. If extractors
         are allowed, problem may be unbounded due to unlimited material supply. This may be addressed
         by future work that constrains extractors by total available supply or changes how extractor
         cost is modelled.
-        """
-        # sinks node for output, mirror to minimize input requiring source nodes for ingredients
-        output = ProcessNode("Output", target_output, target_output.empty(), 0, 0)
-
-        visited = cls._filter_eligible_nodes(output, process_nodes)
-
-        # small penalty for using machines, to avoid creating redundant loops, reward for producing
-        # more output
-        costs = [-1 if node is output else .0001 for node in visited]  # TODO: cost per recipe
-
-        # matrix where each machine is a column and each material is a row. production is positive,
-        # consumption is negative
-        material_constraints = np.array(
-            [dataclass_to_list(node.output_materials - node.input_materials) for node in visited]).T
 
-        material_consumption_upper_bound = dataclass_to_list(available_materials)
-
-        # -1*consumption <= available
-        # byproducts >= 0
-        bounds = (0, None)
-
-        solution = linprog(c=costs,
-                           bounds=bounds,
-                           A_ub=material_constraints*-1,
-                           b_ub=material_consumption_upper_bound)
-
-        # temporary during testing, parse into instance of self
-        return solution
+        Results are memoized in `cache`, pass None to always solve. `presolve` and `decompose` work
+        as in `minimize_input`, see `topological_output_plan` for when the full LP is skipped.
+        """
+        presolved = None
+        if presolve:
+            presolved = cls.presolve(target_output, process_nodes, available_materials,
+                                     include_power, default_cost=MACHINE_PENALTY)
+        nodes = process_nodes if presolved is None else presolved.index
+        costs = None if presolved is None else presolved.costs
+
+        solution = None
+        if decompose and not include_power:
+            solution = topological_output_plan(nodes, available_materials, target_output,
+                                               costs=costs)
+        if solution is None:
+            optimizer = ProcessOptimizer(nodes, include_power, costs=costs, cache=cache)
+            solution = optimizer.maximize_output(available_materials, target_output)
+
+        return solution if presolved is None else presolved.expand(solution)
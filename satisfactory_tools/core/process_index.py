@@ -0,0 +1,211 @@
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING, ClassVar, Iterable, Iterator
+
+import networkx as nx
+
+if TYPE_CHECKING:
+    from satisfactory_tools.core.process import ProcessNode
+
+
+class ProcessIndex:
+    """
+    Inverted index from each material to the nodes that produce and consume it. Materials are keyed
+    by their index in `material_names` order. Edges between nodes are read off the index, so
+    building a graph or walking upstream costs time proportional to the number of real connections
+    rather than comparing every pair of nodes. An index can be built once for a recipe set and
+    passed to any number of optimizations in place of the node list.
+
+    The upstream closure of each material is cached, bounded to `closure_cache_size` entries with
+    least recently used eviction, under the index's fingerprint. Adding or removing nodes changes
+    the fingerprint and drops the cached closures.
+    """
+    _nodes: dict["ProcessNode", None]
+    producers: dict[int, set["ProcessNode"]]
+    consumers: dict[int, set["ProcessNode"]]
+    power_producers: set["ProcessNode"]
+    closure_cache_size: int
+    _fingerprint: int
+    _closures: OrderedDict[tuple[int, int], frozenset["ProcessNode"]]
+
+    # indexes built implicitly from node lists, see `for_nodes`
+    _shared: ClassVar[OrderedDict[frozenset["ProcessNode"], "ProcessIndex"]] = OrderedDict()
+    shared_cache_size: ClassVar[int] = 8
+
+    def __init__(self, nodes: Iterable["ProcessNode"] = (), closure_cache_size: int = 1024) -> None:
+        # dict rather than set to keep insertion order stable across runs
+        self._nodes = {}
+        self.producers = defaultdict(set)
+        self.consumers = defaultdict(set)
+        self.power_producers = set()
+        self.closure_cache_size = closure_cache_size
+        self._fingerprint = 0
+        self._closures = OrderedDict()
+
+        for node in nodes:
+            self.add(node)
+
+    @classmethod
+    def for_nodes(cls, nodes: Iterable["ProcessNode"]) -> "ProcessIndex":
+        """
+        Index of the given nodes, reusing a recently built one for the same node set so that its
+        cached closures carry over between calls that pass the same list. The returned index is
+        shared and must not be modified.
+        """
+        key = frozenset(nodes)
+        if (index := cls._shared.get(key)) is not None:
+            cls._shared.move_to_end(key)
+            return index
+
+        index = cls._shared[key] = cls(nodes)
+        while len(cls._shared) > cls.shared_cache_size:
+            cls._shared.popitem(last=False)
+
+        return index
+
+    @classmethod
+    def of(cls, nodes: "Iterable[ProcessNode] | ProcessIndex") -> "ProcessIndex":
+        """
+        `nodes` itself if it is already an index, otherwise the shared index from `for_nodes`.
+        """
+        return nodes if isinstance(nodes, ProcessIndex) else cls.for_nodes(nodes)
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        Order independent hash of the indexed node set, updated incrementally as nodes are added and
+        removed.
+        """
+        return hash((self._fingerprint, len(self._nodes)))
+
+    @staticmethod
+    def _node_hash(node: "ProcessNode") -> int:
+        # mix the identity hash so that summing does not cancel structured values such as addresses
+        return hash((node,)) & 0xFFFFFFFFFFFFFFFF
+
+    def _invalidate(self) -> None:
+        self._closures.clear()
+
+    def add(self, node: "ProcessNode") -> None:
+        if node in self._nodes:
+            return
+
+        self._nodes[node] = None
+        self._fingerprint = (self._fingerprint + self._node_hash(node)) & 0xFFFFFFFFFFFFFFFF
+        self._invalidate()
+        for material in node.output_materials.nonzero()[0].tolist():
+            self.producers[material].add(node)
+        for material in node.input_materials.nonzero()[0].tolist():
+            self.consumers[material].add(node)
+        if node.power_production > 0:
+            self.power_producers.add(node)
+
+    def remove(self, node: "ProcessNode") -> None:
+        del self._nodes[node]
+        self._fingerprint = (self._fingerprint - self._node_hash(node)) & 0xFFFFFFFFFFFFFFFF
+        self._invalidate()
+        for material in node.output_materials.nonzero()[0].tolist():
+            self.producers[material].discard(node)
+        for material in node.input_materials.nonzero()[0].tolist():
+            self.consumers[material].discard(node)
+        self.power_producers.discard(node)
+
+    def __contains__(self, node: "ProcessNode") -> bool:
+        return node in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __iter__(self) -> Iterator["ProcessNode"]:
+        yield from self._nodes
+
+    def edges(self) -> Iterator[tuple["ProcessNode", "ProcessNode", int]]:
+        """
+        (producer, consumer, material) for every material passed from one node to another.
+        """
+        for material, producers in self.producers.items():
+            consumers = self.consumers.get(material, ())
+            for producer in producers:
+                for consumer in consumers:
+                    yield producer, consumer, material
+
+    def graph(self, extra_nodes: Iterable["ProcessNode"] = ()) -> nx.MultiDiGraph:
+        """
+        Directed graph with an edge from producer to consumer, keyed by material, for each material
+        the two share. `extra_nodes` are connected to the indexed nodes without being added to the
+        index.
+        """
+        extra_nodes = [node for node in extra_nodes if node not in self._nodes]
+
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self._nodes)
+        graph.add_nodes_from(extra_nodes)
+        graph.add_edges_from(self.edges())
+
+        for node in extra_nodes:
+            inputs = node.input_materials.nonzero()[0].tolist()
+            outputs = node.output_materials.nonzero()[0].tolist()
+
+            for material in inputs:
+                graph.add_edges_from((producer, node, material)
+                                     for producer in self.producers.get(material, ()))
+            for material in outputs:
+                graph.add_edges_from((node, consumer, material)
+                                     for consumer in self.consumers.get(material, ()))
+            graph.add_edges_from((node, node, material) for material in set(inputs) & set(outputs))
+
+        return graph
+
+    def upstream(self, materials: Iterable[int]) -> set["ProcessNode"]:
+        """
+        Every indexed node that directly or transitively produces one of the given materials, as the
+        union of each material's cached closure.
+        """
+        return set().union(*(self.closure(material) for material in set(materials)))
+
+    def eligible(self, materials: Iterable[int], include_power: bool = False) -> set["ProcessNode"]:
+        """
+        Nodes that may take part in producing the given materials: everything upstream of them and,
+        with `include_power`, every power producer and its suppliers, since power producers are not
+        upstream of any material.
+        """
+        materials = set(materials)
+        eligible: set["ProcessNode"] = set()
+
+        if include_power:
+            eligible |= self.power_producers
+            for node in self.power_producers:
+                materials.update(node.input_materials.nonzero()[0].tolist())
+
+        return eligible | self.upstream(materials)
+
+    def closure(self, material: int) -> frozenset["ProcessNode"]:
+        """
+        Every indexed node that directly or transitively produces the given material.
+        """
+        key = (self.fingerprint, material)
+        if (closure := self._closures.get(key)) is not None:
+            self._closures.move_to_end(key)
+            return closure
+
+        closure = self._closures[key] = frozenset(self._traverse_upstream([material]))
+        while len(self._closures) > self.closure_cache_size:
+            self._closures.popitem(last=False)
+
+        return closure
+
+    def _traverse_upstream(self, materials: Iterable[int]) -> set["ProcessNode"]:
+        visited: set["ProcessNode"] = set()
+        seen_materials = set(materials)
+        pending = list(seen_materials)
+
+        while pending:
+            for producer in self.producers.get(pending.pop(), ()):
+                if producer in visited:
+                    continue
+                visited.add(producer)
+                for material in producer.input_materials.nonzero()[0].tolist():
+                    if material not in seen_materials:
+                        seen_materials.add(material)
+                        pending.append(material)
+
+        return visited
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from satisfactory_tools.core.material import MaterialSpec
+
+if TYPE_CHECKING:
+    from satisfactory_tools.core.optimizer import Sensitivity
+    from satisfactory_tools.core.process import ProcessNode
+
+
+def spec_digest(spec: MaterialSpec) -> bytes:
+    """
+    Stable digest of a spec's non-zero materials. Specs of the same schema with equal values have
+    the same digest across runs.
+    """
+    indices, values = spec.nonzero()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(indices, dtype=np.int64).tobytes())
+    digest.update(np.asarray(values, dtype=np.float64).tobytes())
+    return digest.digest()
+
+
+def node_digest(node: "ProcessNode") -> bytes:
+    """
+    Stable digest of a node's name, materials and power.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(node.name.encode())
+    digest.update(spec_digest(node.input_materials))
+    digest.update(spec_digest(node.output_materials))
+    power = np.array([node.power_production, node.power_consumption], dtype=np.float64)
+    digest.update(power.tobytes())
+    return digest.digest()
+
+
+def schema_digest(spec_type: type[MaterialSpec]) -> bytes:
+    return hashlib.blake2b("\0".join(spec_type.material_names()).encode(), digest_size=16).digest()
+
+
+@dataclass
+class CachedSolution:
+    """
+    Solution stored without node references: `nodes` holds the digest of each node with a non-zero
+    scale, so a cached solution can be mapped back onto equal nodes built in another session. The
+    sensitivity report is stored without its nodes, with `columns` holding the digest of each.
+    """
+    nodes: list[bytes]
+    scales: np.ndarray
+    objective: float
+    status: int
+    message: str
+    output_scale: float | None
+    columns: list[bytes] | None = None
+    sensitivity: "Sensitivity | None" = None
+
+
+# file name prefix of entries on disk
+_PREFIX = "solution-"
+
+
+class SolutionCache:
+    """
+    Optimization results memoized under a content hash of everything that determines them. Entries
+    live in a bounded in-memory LRU and, when `directory` is set, in one file per entry that
+    survives restarts. `config_version` is mixed into every key, so entries from another game config
+    are never returned; `invalidate` drops everything when the config changes in place.
+    """
+    maxsize: int
+    directory: Path | None
+    config_version: str
+    hits: int
+    misses: int
+    _entries: OrderedDict[str, CachedSolution]
+
+    def __init__(self, maxsize: int = 256, directory: str | Path | None = None,
+                 config_version: str = "") -> None:
+        self.maxsize = maxsize
+        self.directory = None if directory is None else Path(directory)
+        self.config_version = config_version
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, parts: Iterable[bytes | str]) -> str:
+        digest = hashlib.blake2b(self.config_version.encode(), digest_size=20)
+        for part in parts:
+            data = part.encode() if isinstance(part, str) else part
+            # length prefix keeps (ab, c) and (a, bc) apart
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path | None:
+        return None if self.directory is None else self.directory / f"{_PREFIX}{key}.pkl"
+
+    def get(self, key: str) -> CachedSolution | None:
+        if (entry := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if (path := self._path(key)) is not None and path.exists():
+            with path.open("rb") as f:
+                entry = pickle.load(f)
+            self._remember(key, entry)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, entry: CachedSolution) -> None:
+        self._remember(key, entry)
+
+        if (path := self._path(key)) is not None:
+            # write then rename, so a concurrent reader never sees a partial entry
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            with temporary.open("wb") as f:
+                pickle.dump(entry, f)
+            temporary.replace(path)
+
+    def _remember(self, key: str, entry: CachedSolution) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, config_version: str | None = None) -> None:
+        """
+        Drop every entry, in memory and on disk, e.g. after the game config changed. Optionally
+        switch to a new config version for future keys.
+        """
+        self._entries.clear()
+        if self.directory is not None:
+            # only entries this cache wrote, the directory may be shared with other files
+            for path in self.directory.glob(f"{_PREFIX}*.pkl"):
+                path.unlink(missing_ok=True)
+
+        if config_version is not None:
+            self.config_version = config_version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# used by Process.minimize_input and Process.maximize_output unless another cache is given
+DEFAULT_CACHE = SolutionCache()
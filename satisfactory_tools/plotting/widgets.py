@@ -1,5 +1,4 @@
 from collections import defaultdict
-from dataclasses import asdict
 from typing import Mapping, Tuple, Type
 
 from ipytree import Node, Tree
@@ -70,8 +69,12 @@ def recipe_widget(recipes) -> Tuple[Tree, Mapping[str, RecipeData]]:
 
 
 def material_widget(material_class: Type[MaterialSpec], value_range=(-1000, 1000)):
+    """
+    One slider per material. Specs are immutable, so every change builds a new spec through the
+    class's keyword constructor, available as the widget's `result`.
+    """
     materials = material_class()
-    w = interactive(materials.__init__, **{k: value_range for k in asdict(materials).keys()})
+    w = interactive(material_class, **{k: value_range for k in type(materials).material_names()})
     return w, materials
 
 
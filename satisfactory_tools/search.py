@@ -0,0 +1,67 @@
+import re
+from collections import defaultdict
+from typing import Iterable
+
+import numpy as np
+
+_NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+
+def _normalize(text: str) -> str:
+    # the same normalisation thefuzz applies before scoring
+    return _NON_ALPHANUMERIC.sub(" ", text).lower().strip()
+
+
+def _trigrams(text: str) -> set[str]:
+    """
+    Character trigrams of every word of `text`, padded so that one and two letter prefixes are grams
+    too.
+    """
+    grams: set[str] = set()
+    for word in _normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    Trigram index over a fixed list of strings, built once, that shortlists the strings sharing the
+    most trigrams with a query. Running a full fuzzy scorer on the shortlist instead of every string
+    keeps search cost proportional to the matches rather than the list.
+    """
+    __slots__ = ("_postings", "choices")
+
+    choices: tuple[str, ...]
+    _postings: dict[str, np.ndarray]
+
+    def __init__(self, choices: Iterable[str]):
+        self.choices = tuple(choices)
+
+        postings = defaultdict(list)
+        for i, choice in enumerate(self.choices):
+            for gram in _trigrams(choice):
+                postings[gram].append(i)
+
+        self._postings = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.choices)
+
+    def candidates(self, query: str, limit: int = 50) -> list[tuple[str, int]]:
+        """
+        Up to `limit` choices sharing trigrams with `query`, with the number of shared trigrams,
+        best first.
+        """
+        hits = [self._postings[gram] for gram in _trigrams(query) if gram in self._postings]
+        if not hits or limit <= 0:
+            return []
+
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.choices))
+        matched = np.flatnonzero(counts)
+        if len(matched) > limit:
+            matched = np.sort(matched[np.argpartition(-counts[matched], limit - 1)[:limit]])
+        # stable, so ties keep the order of the choices
+        matched = matched[np.argsort(-counts[matched], kind="stable")]
+
+        return [(self.choices[i], int(counts[i])) for i in matched.tolist()]
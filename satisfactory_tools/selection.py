@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Any, Generic, Iterable, Mapping, TypeVar
+
+from satisfactory_tools.categorized_collection import CategorizedCollection
+
+K = TypeVar("K")
+
+
+class TagSelection(Generic[K]):
+    """
+    Set of selected keys of a CategorizedCollection, with the number of selected keys per tag kept
+    up to date by +1/-1 per change rather than recounted.
+    """
+    __slots__ = ("counts", "elements", "selected")
+
+    elements: CategorizedCollection[K, Any]
+    selected: set[K]
+    # tag -> number of selected keys with that tag; the same dict for the lifetime of the selection,
+    # so it can be bound to UI elements
+    counts: dict[str, int]
+
+    def __init__(self, elements: CategorizedCollection[K, Any]):
+        self.elements = elements
+        self.selected = set()
+        self.counts = dict.fromkeys(elements.tags, 0)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.selected
+
+    def __len__(self) -> int:
+        return len(self.selected)
+
+    def select(self, changes: Mapping[K, bool]) -> set[K]:
+        """
+        Select or deselect keys as one batch, each tag count is written once. Returns the keys whose
+        state changed; changes that match the current state, such as UI echoes of a batch, are
+        ignored.
+        """
+        changed = set()
+        deltas: Counter[str] = Counter()
+        for key, value in changes.items():
+            if value == (key in self.selected):
+                continue
+
+            if value:
+                self.selected.add(key)
+            else:
+                self.selected.discard(key)
+            changed.add(key)
+
+            step = 1 if value else -1
+            for tag in self.elements.value_tags(key):
+                deltas[tag] += step
+
+        for tag, delta in deltas.items():
+            if delta:
+                self.counts[tag] = self.counts.get(tag, 0) + delta
+
+        return changed
+
+    def toggle(self, keys: Iterable[K]) -> set[K]:
+        """
+        Select all of `keys`, or deselect them if they are all selected already.
+        """
+        keys = list(keys)
+        value = not all(key in self.selected for key in keys)
+        return self.select(dict.fromkeys(keys, value))
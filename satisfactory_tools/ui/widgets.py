@@ -1,4 +1,8 @@
+import asyncio
+
 from satisfactory_tools.categorized_collection import CategorizedCollection
+from satisfactory_tools.search import SearchIndex
+from satisfactory_tools.selection import TagSelection
 from thefuzz import process
 from nicegui import ui
 from collections import Counter
@@ -6,52 +10,143 @@ from functools import partial
 
 
 class Picker:
+    # seconds without typing before the search runs, and how many index candidates get fully scored
+    debounce = 0.15
+    shortlist = 100
+    # virtualized selector list: height of one row in px, and rows kept rendered above and below the
+    # view
+    row_height = 40
+    buffer_rows = 5
+
     def __init__(self, elements: CategorizedCollection[str, ...]):
         self.elements = elements
+        self._item_index = SearchIndex(self.elements.keys())
+        self._tag_index = SearchIndex(self.elements.tags.keys())
+        self._filter_task: asyncio.Task[None] | None = None
+        self._selection = TagSelection(self.elements)
+        # switch values, written only for keys whose selection changed
         self._selected = {key: False for key in self.elements.keys()}
         self._selector_visibility = {key: True for key in self.elements.keys()}
 
-        self._category_visibility = {key: True for key in self.elements.keys()}
-        self._category_counters = {key: 0 for key in self.elements.keys()}
+        self._category_visibility = {tag: True for tag in self.elements.tags.keys()}
+        self._category_counters = self._selection.counts
+
+        # virtualized selector list, see render_virtual_selectors
+        self._row_switches: list[ui.switch] = []
+        self._row_keys: list[str | None] = []
+        self._visible_keys: list[str] | None = None
+        self._scroll_position = 0.0
+        self._top_spacer: ui.element | None = None
+        self._bottom_spacer: ui.element | None = None
 
     def render_category_selectors(self, ui: ui) -> None:
         for tag in self.elements.tags.keys():
-            with ui.circular_progress(max=len(list(self.elements.tag(tag).values())), show_value=False).bind_value_from(self._category_counters, tag).bind_visibility_from(self._category_visibility, tag):
-                ui.button(tag, on_click=partial(self._category_select, tag)).props("flat round").bind_visibility_from(self._category_visibility, tag)
+            progress = ui.circular_progress(max=len(self.elements.tag(tag)), show_value=False)
+            progress.bind_value_from(self._category_counters, tag)
+            progress.bind_visibility_from(self._category_visibility, tag)
+            with progress:
+                button = ui.button(tag, on_click=partial(self._category_select, tag))
+                button.props("flat round").bind_visibility_from(self._category_visibility, tag)
 
 
     def render_search_box(self, ui: ui) -> None:
-        searchbox = ui.input(placeholder="Search...", on_change=lambda e: self._filter(e.value))
+        searchbox = ui.input(placeholder="Search...",
+                             on_change=lambda e: self._schedule_filter(e.value))
         searchbox.props("clearable")
 
     def render_selectors(self, ui: ui) -> None:
         for key in self.elements.keys():
-            # FIXME: there might be an update order thing here, with a race between updating selected
-            # FIXME: and updating the category selectors. The on_change might have the value in an event,
-            # FIXME: which would obviate this issue entirely.
-            # FIXME: there's also a parallel issue, in that selecting by category will trigger the
-            # FIXME: on_change for every element in the category
-            switch = ui.switch(key, on_change=partial(self._update_category_selectors, item=key))
+            # the new value comes with the event; the echoes of a category select already match the
+            # selection and are dropped by _select
+            switch = ui.switch(key, on_change=lambda e, key=key: self._select({key: e.value}))
             switch.bind_value(self._selected, key)
             switch.bind_visibility_from(self._selector_visibility, key)
 
-    def _category_select(self, category: str) -> None:
-        visible_keys = set(self.elements.tag(category).keys()) & {k for k, v in self._selector_visibility.items() if v}
-        all_selected = all(self._selected[key] for key in visible_keys)
-        for value in visible_keys:
-            self._selected[value] = not all_selected
-
-        self._update_category_selectors()
+    def render_virtual_selectors(self, ui: ui, height: int = 480) -> None:
+        """
+        Selector list for large collections: only the rows in view plus `buffer_rows` on either side
+        get a switch, and the switches are reassigned to other keys as the list scrolls or is
+        filtered. Spacers above and below keep the scrollbar the size of the whole list.
+        """
+        rows = -(-height // self.row_height) + 2 * self.buffer_rows
+        scroll_area = ui.scroll_area(on_scroll=lambda e: self._scroll(e.vertical_position))
+        with scroll_area.style(f"height: {height}px"):
+            self._top_spacer = ui.element("div")
+            for row in range(rows):
+                switch = ui.switch(on_change=lambda e, row=row: self._select_row(row, e.value))
+                switch.style(f"height: {self.row_height}px")
+                self._row_switches.append(switch)
+            self._bottom_spacer = ui.element("div")
+
+        self._row_keys = [None] * rows
+        self._render_rows()
+
+    def _scroll(self, position: float) -> None:
+        first_row = self._first_row()
+        self._scroll_position = position
+        # within the buffer the rendered rows still cover the view
+        if self._first_row() != first_row:
+            self._render_rows()
+
+    def _first_row(self) -> int:
+        return max(0, int(self._scroll_position // self.row_height) - self.buffer_rows)
+
+    def _render_rows(self) -> None:
+        if not self._row_switches or self._top_spacer is None or self._bottom_spacer is None:
+            return
 
-    def _update_category_selectors(self, item: str | None = None):
-        print("category update")
-        if item:
-            update_tags = self.elements.value_tags(item)
-        else:
-            update_tags = set(self.elements.tags.keys())
+        if self._visible_keys is None:
+            self._visible_keys = [key for key in self.elements.keys()
+                                  if self._selector_visibility[key]]
+
+        keys = self._visible_keys
+        first = min(self._first_row(), max(0, len(keys) - len(self._row_switches)))
+        window = keys[first:first + len(self._row_switches)]
+        self._top_spacer.style(f"height: {first * self.row_height}px")
+        below = len(keys) - first - len(window)
+        self._bottom_spacer.style(f"height: {below * self.row_height}px")
+
+        for row, switch in enumerate(self._row_switches):
+            key = window[row] if row < len(window) else None
+            # assign the key first, the on_change echo of set_value then matches the selection
+            self._row_keys[row] = key
+            if key is None:
+                switch.set_visibility(False)
+                continue
+
+            switch.set_text(key)
+            switch.set_value(self._selected[key])
+            switch.set_visibility(True)
+
+    def _select_row(self, row: int, value: bool) -> None:
+        if (key := self._row_keys[row]) is not None:
+            self._select({key: value})
 
-        for tag in update_tags:
-            self._category_counters[tag] = sum(self._selected[k] for k in self.elements.tag(tag).keys())
+    def _category_select(self, category: str) -> None:
+        visible_keys = [key for key in self.elements.tag(category)
+                        if self._selector_visibility[key]]
+        for key in self._selection.toggle(visible_keys):
+            self._selected[key] = key in self._selection
+        self._render_rows()
+
+    def _select(self, changes: dict[str, bool]) -> None:
+        changed = self._selection.select(changes)
+        for key in changed:
+            self._selected[key] = key in self._selection
+        if changed:
+            self._render_rows()
+
+    def _schedule_filter(self, search: str) -> None:
+        # a newer keystroke cancels the pending search, so only the last query is scored
+        if self._filter_task is not None:
+            self._filter_task.cancel()
+        self._filter_task = asyncio.ensure_future(self._debounced_filter(search))
+
+    async def _debounced_filter(self, search: str) -> None:
+        await asyncio.sleep(self.debounce)
+        self._filter(search)
+        self._visible_keys = None
+        self._render_rows()
 
     def _filter(self, search: str):
         if not search:
@@ -65,22 +160,32 @@ class Picker:
 
         threshold = 75
 
-        item_scores = process.extract(search, self.elements.keys(), limit=None)
-        tag_scores = process.extract(search, self.elements.tags.keys(), limit=None)
-        visible_categories = {k for k, score in tag_scores if score > threshold}
-        for k, score in item_scores:
-            self._selector_visibility[k] = (score > threshold) or any(visible_categories & self.elements.value_tags(k))
+        # only the index's shortlist is scored; everything else shares no trigram with the search
+        item_candidates = [k for k, _ in self._item_index.candidates(search, self.shortlist)]
+        tag_candidates = [k for k, _ in self._tag_index.candidates(search, self.shortlist)]
+        item_scores = dict(process.extract(search, item_candidates, limit=None))
+        tag_scores = dict(process.extract(search, tag_candidates, limit=None))
+
+        visible_categories = {k for k, score in tag_scores.items() if score > threshold}
+        for k in self._selector_visibility.keys():
+            tagged = any(visible_categories & self.elements.value_tags(k))
+            self._selector_visibility[k] = (item_scores.get(k, 0) > threshold) or tagged
 
-        for k, score in tag_scores:
-            self._category_visibility[k] = (score > threshold)
+        for k in self._category_visibility.keys():
+            self._category_visibility[k] = (tag_scores.get(k, 0) > threshold)
 
     @property
     def selected(self) -> set[...]:
-        yield from (self.elements[key] for key, value in self._selected.items() if value)
+        yield from (self.elements[key] for key in self._selection.selected)
 
 
 
-def fuzzy_sort_picker(ui: ui, elements: CategorizedCollection[str, ...]):
+def fuzzy_sort_picker(ui: ui, elements: CategorizedCollection[str, ...],
+                      virtualize: bool | None = None):
+    """
+    Search box, category selectors and a switch per element. `virtualize` renders only the switches
+    in view, by default for collections of more than 500 elements.
+    """
     picker = Picker(elements)
     picker.render_search_box(ui)
     # TODO: categories--use badges to indicate total selected
@@ -90,6 +195,12 @@ def fuzzy_sort_picker(ui: ui, elements: CategorizedCollection[str, ...]):
     with ui.row() as grid:
         picker.render_category_selectors(ui)
 
-    with ui.row() as grid:
-        picker.render_selectors(ui)
+    if virtualize is None:
+        virtualize = len(elements) > 500
+
+    if virtualize:
+        picker.render_virtual_selectors(ui)
+    else:
+        with ui.row() as grid:
+            picker.render_selectors(ui)
 
@@ -1,10 +1,20 @@
-from dataclasses import field, make_dataclass
-
-from satisfactory_tools.core.material import MaterialSpec
+from satisfactory_tools.core.material import make_array_spec, make_material_spec
+from satisfactory_tools.core.process import ProcessNode
 
 materials = [chr(i) for i in range(97, 107)]
 
-Materials = make_dataclass("Materials",
-                           [(name, float, field(default=0)) for name in materials],
-                           bases=(MaterialSpec,), frozen=True)
+Materials = make_material_spec("Materials", materials)
+
+
+ArrayMaterials = make_array_spec("ArrayMaterials", materials)
+
 
+def chain(spec_type=ArrayMaterials):
+    """
+    Two step chain making c and d: source supplies a and b, first turns them into e and f, and
+    second turns those into c and d.
+    """
+    source = ProcessNode("source", spec_type(), spec_type(a=2, b=4), 0, 0)
+    first = ProcessNode("first", spec_type(a=2, b=4), spec_type(e=4, f=7), 0, 0)
+    second = ProcessNode("second", spec_type(e=4, f=7), spec_type(c=2, d=4), 0, 0)
+    return [source, first, second]
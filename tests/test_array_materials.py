@@ -0,0 +1,96 @@
+from dataclasses import FrozenInstanceError
+
+import numpy as np
+import pytest
+
+from tests import ArrayMaterials, Materials
+
+
+def test_array_materials():
+    mats = ArrayMaterials(a=1, b=2, f=6)
+
+    assert mats.a == 1
+    assert mats.b == 2
+    assert mats.c == 0
+    assert mats["f"] == 6
+    assert dict(mats) == dict(Materials(a=1, b=2, f=6))
+
+
+def test_array_materials_shared_schema():
+    first = ArrayMaterials(a=1)
+    second = ArrayMaterials(b=2)
+
+    assert first._schema is second._schema
+    assert ArrayMaterials.material_names() == Materials.material_names()
+
+
+def test_array_materials_unknown_material():
+    with pytest.raises(TypeError):
+        ArrayMaterials(z=1)
+
+
+def test_array_materials_frozen():
+    mats = ArrayMaterials(a=1)
+
+    with pytest.raises(FrozenInstanceError):
+        mats.a = 2
+
+    with pytest.raises(ValueError):
+        mats.to_array()[0] = 2
+
+
+@pytest.mark.parametrize("operation", [
+    lambda x, y: x + y,
+    lambda x, y: x - y,
+    lambda x, y: x * 2,
+    lambda x, y: 2 * x,
+    lambda x, y: x / 2,
+    lambda x, y: x // 2,
+    lambda x, y: x | y,
+    lambda x, y: x < 3,
+    lambda x, y: x <= 3,
+    lambda x, y: x > 3,
+    lambda x, y: x >= 3,
+])
+def test_array_materials_match_dataclass(operation):
+    values = dict(a=1, b=2, c=3, d=4, e=5, f=6)
+    other = dict(c=3, d=4, e=5, g=1)
+
+    expected = operation(Materials(**values), Materials(**other))
+    result = operation(ArrayMaterials(**values), ArrayMaterials(**other))
+
+    assert isinstance(result, ArrayMaterials)
+    assert dict(result) == dict(expected)
+
+
+def test_array_materials_divide_by_material():
+    numerator = ArrayMaterials(a=1, b=2, c=3, d=4, e=5, f=6)
+    denominator = ArrayMaterials(e=2, f=1)
+
+    assert numerator / denominator == 2.5
+    assert numerator // denominator == 2
+
+    with pytest.raises(ZeroDivisionError):
+        numerator / ArrayMaterials()
+
+    with pytest.raises(ZeroDivisionError):
+        numerator // ArrayMaterials()
+
+
+def test_array_materials_equality():
+    assert ArrayMaterials(a=1, b=2) == ArrayMaterials(a=1, b=2)
+    assert ArrayMaterials(a=1, b=2) != ArrayMaterials(a=1)
+    assert hash(ArrayMaterials(a=1, b=2)) == hash(ArrayMaterials(a=1, b=2))
+    assert np.float64(2) * ArrayMaterials(a=1) == ArrayMaterials(a=2)
+
+
+def test_array_materials_rejects_other_schema():
+    with pytest.raises(TypeError):
+        ArrayMaterials(a=1) + Materials(a=1)
+
+
+def test_materials_array_round_trip():
+    mats = Materials(a=1, c=3)
+
+    assert Materials.from_array(mats.to_array()) == mats
+    assert ArrayMaterials.from_array(mats.to_array()) == ArrayMaterials(a=1, c=3)
@@ -0,0 +1,114 @@
+import pytest
+
+from satisfactory_tools.categorized_collection import And, CategorizedCollection, Tag, TagQuery
+
+
+def _collection():
+    return CategorizedCollection({"a": 1, "b": 2, "c": 3},
+                                 {"x": {"a", "b"}, "y": {"b", "c"}, "empty": set()})
+
+
+def test_tag_view():
+    collection = _collection()
+    view = collection.tag("x")
+
+    assert list(view.items()) == [("a", 1), ("b", 2)]
+    assert len(view) == 2
+    assert "a" in view and "c" not in view and "missing" not in view
+    assert view["b"] == 2
+    with pytest.raises(KeyError):
+        view["c"]
+    assert not hasattr(view, "__setitem__")
+
+
+def test_tag_view_is_live():
+    collection = _collection()
+    view = collection.tag("x")
+
+    collection["d"] = 4
+    collection.set_tag("d", "x")
+    collection["a"] = 10
+
+    assert dict(view.items()) == {"a": 10, "b": 2, "d": 4}
+
+
+def test_nested_tags_intersect():
+    collection = _collection()
+
+    assert list(collection.tag("x").tag("y").keys()) == ["b"]
+    assert list(collection.tag("x").tags) == ["x", "y"]
+    tags = collection.tag("x").tags
+    assert {tag: set(view) for tag, view in tags.items()} == {"x": {"a", "b"}, "y": {"b"}}
+    assert collection.tag("x").value_tags("b") == {"x", "y"}
+    with pytest.raises(KeyError):
+        collection.tag("x").value_tags("c")
+
+
+def test_tags():
+    collection = _collection()
+
+    assert list(collection.tags) == ["x", "y", "empty"]
+    assert len(collection.tags["empty"]) == 0
+    with pytest.raises(KeyError):
+        collection.tags["missing"]
+
+
+def test_unknown_tag_is_empty():
+    collection = _collection()
+
+    assert len(collection.tag("missing")) == 0
+    assert list(collection.tag("missing").values()) == []
+    assert "missing" not in collection.tags
+
+
+def test_tagged_key_without_value():
+    collection = _collection()
+    collection.set_tag("pending", "x")
+
+    assert "pending" not in collection.tag("x")
+    assert len(collection.tag("x")) == 2
+
+
+def test_update_from_view():
+    collection = CategorizedCollection()
+    collection.update(_collection().tag("y"))
+
+    assert dict(collection.items()) == {"b": 2, "c": 3}
+    tags = collection.tags
+    assert {tag: set(view) for tag, view in tags.items()} == {"x": {"b"}, "y": {"b", "c"}}
+
+
+def test_query():
+    collection = CategorizedCollection({"a": 1, "b": 2, "c": 3, "d": 4},
+                                       {"x": {"a", "b", "c"}, "y": {"b", "c"}, "z": {"c", "d"}})
+
+    assert list(collection.query(Tag("x") & Tag("y") & ~Tag("z")).keys()) == ["b"]
+    assert list(collection.query(Tag("y") | "z").keys()) == ["b", "c", "d"]
+    assert list(collection.query(~Tag("x")).keys()) == ["d"]
+    assert list(collection.query(~Tag("missing")).keys()) == ["a", "b", "c", "d"]
+    assert list(collection.query("x").query(~Tag("y")).keys()) == ["a"]
+    assert list(collection.tag("y").tags) == ["x", "y", "z"]
+    assert Tag("x") & Tag("y") & Tag("z") == And((Tag("x"), Tag("y"), Tag("z")))
+
+
+def test_query_cache_invalidated_on_mutation():
+    collection = _collection()
+    view = collection.query(Tag("x") & ~Tag("y"))
+
+    assert list(view) == ["a"]
+    assert collection._query_cache
+
+    collection["a"] = 10
+    assert collection._query_cache
+
+    collection["d"] = 4
+    collection.set_tag("d", "x")
+    assert list(view) == ["a", "d"]
+
+    collection.set_tag("a", "y")
+    assert list(view) == ["d"]
+
+
+def test_tag_query_is_abstract():
+    with pytest.raises(TypeError):
+        TagQuery()
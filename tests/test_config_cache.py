@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+import satisfactory_tools.config as module
+import satisfactory_tools.config.cache as cache
+from satisfactory_tools.config.machines import BUILDABLE_KEYS, EXTRACTOR_KEYS, GENERATOR_KEYS
+from satisfactory_tools.config.materials import RESOURCE_KEYS, get_material_metadata
+from satisfactory_tools.config.recipes import RECIPE_KEY
+from satisfactory_tools.core.material import make_array_spec
+from satisfactory_tools.core.optimizer import ProcessOptimizer
+
+ORE = "BlueprintGeneratedClass'\"/Game/Resource/Desc_OreIron.Desc_OreIron_C\"'"
+INGOT = "BlueprintGeneratedClass'\"/Game/Resource/Desc_IronIngot.Desc_IronIngot_C\"'"
+
+
+def _native(key, classes):
+    return {"NativeClass": f"Class'/Script/FactoryGame.{key}'", "Classes": classes}
+
+
+def _docs(duration="2.000000"):
+    keys = (*RESOURCE_KEYS, *BUILDABLE_KEYS, *EXTRACTOR_KEYS, *GENERATOR_KEYS)
+    classes = {key: [] for key in keys}
+    classes["FGResourceDescriptor"] = [
+        {"ClassName": "Desc_OreIron_C", "mDisplayName": "Iron Ore", "mForm": "RF_SOLID",
+         "mEnergyValue": "0"}]
+    classes["FGItemDescriptor"] = [
+        {"ClassName": "Desc_IronIngot_C", "mDisplayName": "Iron_Ingot", "mForm": "RF_SOLID",
+         "mEnergyValue": "0"}]
+    classes["FGBuildableManufacturer"] = [
+        {"ClassName": "Build_SmelterMk1_C", "mDisplayName": "Smelter",
+         "mPowerConsumption": "4.000000"}]
+    classes[RECIPE_KEY] = [
+        {"ClassName": "Recipe_IngotIron_C", "mDisplayName": "Iron Ingot",
+         "mIngredients": f"((ItemClass={ORE},Amount=1))",
+         "mProduct": f"((ItemClass={INGOT},Amount=1))",
+         "mManufactoringDuration": duration,
+         "mProducedIn": "(\"/Game/Buildable/Build_SmelterMk1.Build_SmelterMk1_C\")"}]
+
+    return [_native(key, value) for key, value in classes.items()]
+
+
+@pytest.fixture
+def docs(tmp_path):
+    path = tmp_path / "Docs.json"
+    path.write_text(json.dumps(_docs()), encoding="utf-16")
+    return path
+
+
+def test_parse_config(docs, tmp_path):
+    config = module.parse_config(docs, cache_dir=None)
+
+    assert config.materials.material_names() == ("Iron_Ingot", "Iron_Ore")
+    class_names = [material.class_name for material in config.material_metadata]
+    assert class_names == ["Desc_IronIngot_C", "Desc_OreIron_C"]
+    assert get_material_metadata(config.materials) == config.material_metadata
+    assert [machine.display_name for machine in config.machines.producers] == ["Smelter"]
+    (recipe,) = config.recipes
+    assert recipe.inputs == {"Desc_OreIron_C": 1.0}
+    assert recipe.machines == {"Build_SmelterMk1_C"}
+    assert not list(tmp_path.glob("cache"))
+
+
+def test_make_process_nodes(docs):
+    config = module.parse_config(docs, cache_dir=None)
+    spec_type = make_array_spec("DocsMaterials", config.materials.material_names())
+
+    (smelt,) = module.make_process_nodes(config, spec_type)
+    solution = ProcessOptimizer([smelt]).minimize_input(spec_type(Iron_Ingot=60),
+                                                        spec_type(Iron_Ore=100))
+
+    assert smelt.power_consumption == 4
+    assert smelt.input_materials == spec_type.sparse_type()(Iron_Ore=30)
+    assert solution.active() == pytest.approx({smelt: 2})
+
+
+def test_parse_config_uses_cache(docs, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    parsed = module.parse_config(docs, cache_dir=cache_dir)
+
+    assert len(list(cache_dir.glob("config-*.pkl"))) == 1
+
+    def fail(*args):
+        raise AssertionError("should have been loaded from the cache")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(module, "_parse", fail)
+        loaded = module.parse_config(docs, cache_dir=cache_dir)
+
+    assert loaded.recipes == parsed.recipes
+    assert loaded.machines == parsed.machines
+    assert loaded.materials.material_names() == parsed.materials.material_names()
+
+    # a changed file or parser is parsed again
+    docs.write_text(json.dumps(_docs(duration="4.000000")), encoding="utf-16")
+    (recipe,) = module.parse_config(docs, cache_dir=cache_dir).recipes
+    assert recipe.duration == pytest.approx(4 / 60)
+
+    monkeypatch.setattr(cache, "PARSER_VERSION", cache.PARSER_VERSION + 1)
+    calls = []
+    parse = module._parse
+    monkeypatch.setattr(module, "_parse", lambda *args: calls.append(args) or parse(*args))
+    module.parse_config(docs, cache_dir=cache_dir)
+
+    assert len(calls) == 1
+
+
+def test_corrupt_cache_is_parsed_again(docs, tmp_path):
+    cache_dir = tmp_path / "cache"
+    module.parse_config(docs, cache_dir=cache_dir)
+    (entry,) = cache_dir.glob("config-*.pkl")
+    entry.write_bytes(b"not a pickle")
+
+    config = module.parse_config(docs, cache_dir=cache_dir)
+
+    assert len(config.recipes) == 1
+    assert cache.load_parsed_config(cache_dir, cache.source_digest(docs, "utf-16")) is not None
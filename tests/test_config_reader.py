@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+import satisfactory_tools.config as config
+from satisfactory_tools.config.reader import read_sections
+from tests.test_config_cache import _docs, _native
+
+
+def _document():
+    docs = _docs()
+    # unwanted sections, one of them quoting a section header inside a string
+    schematic = {"ClassName": "Schematic_1", "mDescription": '{"NativeClass": "x"}'}
+    docs.insert(0, _native("FGSchematic", [schematic]))
+    belts = [{"ClassName": f"Belt_{i}", "mSpeed": str(i)} for i in range(50)]
+    docs.append(_native("FGBuildableConveyorBelt", belts))
+    return docs
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_read_sections_matches_simplify_config(tmp_path, indent, chunk_size):
+    path = tmp_path / "Docs.json"
+    docs = _document()
+    path.write_text(json.dumps(docs, indent=indent), encoding="utf-16")
+
+    sections = read_sections(path, config.CONFIG_KEYS, chunk_size=chunk_size)
+    expected = {key: value for key, value in config.simplify_config(docs).items()
+                if key in config.CONFIG_KEYS}
+
+    assert sections == expected
+    assert "FGSchematic" not in sections
+
+
+def test_read_sections_truncated(tmp_path):
+    path = tmp_path / "Docs.json"
+    path.write_text(json.dumps(_document())[:-200], encoding="utf-16")
+
+    with pytest.raises(json.JSONDecodeError):
+        read_sections(path, ["FGBuildableConveyorBelt"], chunk_size=64)
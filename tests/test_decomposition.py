@@ -0,0 +1,107 @@
+from math import isclose
+
+import pytest
+
+import satisfactory_tools.core.decomposition as decomposition
+import satisfactory_tools.core.process as module
+from satisfactory_tools.core.optimizer import ProcessOptimizer
+from satisfactory_tools.core.solution_cache import SolutionCache
+from tests import ArrayMaterials, chain
+
+
+def _loop():
+    source = module.ProcessNode("source", ArrayMaterials(), ArrayMaterials(a=1), 0, 0)
+    make = module.ProcessNode("make", ArrayMaterials(a=1, f=1), ArrayMaterials(c=1, e=2), 0, 0)
+    recycle = module.ProcessNode("recycle", ArrayMaterials(e=1), ArrayMaterials(f=1), 0, 0)
+    return [source, make, recycle]
+
+
+def test_topological_plan_without_lp(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("acyclic plans should not need an LP")
+
+    monkeypatch.setattr(decomposition, "linprog", fail)
+    source, first, second = chain()
+
+    plan = decomposition.topological_plan([source, first, second], ArrayMaterials(c=4))
+
+    assert plan.success
+    assert isclose(plan.objective, 6)
+    assert plan.active() == {source: 2, first: 2, second: 2}
+    assert plan.sensitivity.shadow_price(2) == pytest.approx(1.5)
+    assert plan.sensitivity.reduced_costs.tolist() == pytest.approx([0, 0, 0])
+
+
+def test_topological_plan_solves_loops():
+    nodes = _loop()
+    source, make, recycle = nodes
+
+    plan = decomposition.topological_plan(nodes, ArrayMaterials(c=2))
+    reference = ProcessOptimizer(nodes).minimize_input(ArrayMaterials(c=2))
+
+    # make and recycle feed each other, so they are planned together
+    assert plan.active() == pytest.approx({source: 2, make: 2, recycle: 2})
+    assert isclose(plan.objective, reference.objective)
+    assert plan.sensitivity.shadow_price(2) == pytest.approx(reference.sensitivity.shadow_price(2))
+
+
+def test_topological_plan_available_and_infeasible():
+    source, first, second = chain()
+
+    plan = decomposition.topological_plan([first, second], ArrayMaterials(c=4),
+                                          ArrayMaterials(a=4, b=8))
+
+    assert plan.active() == {first: 2, second: 2}
+
+    plan = decomposition.topological_plan([first, second], ArrayMaterials(c=4))
+
+    assert plan.status == decomposition.INFEASIBLE
+
+
+def test_topological_plan_needs_single_producers():
+    source, first, second = chain()
+    alternate = module.ProcessNode("alternate", ArrayMaterials(a=1), ArrayMaterials(e=4, f=7), 0, 0)
+
+    nodes = [source, first, second, alternate]
+
+    assert decomposition.topological_plan(nodes, ArrayMaterials(c=4)) is None
+
+
+def test_topological_output_plan():
+    source, first, second = chain()
+    nodes = [first, second]
+
+    available, ratios = ArrayMaterials(a=4, b=16), ArrayMaterials(c=2, d=4)
+    plan = decomposition.topological_output_plan(nodes, available, ratios)
+    reference = ProcessOptimizer(nodes).maximize_output(available, ratios)
+
+    assert plan.output_scale == pytest.approx(2)
+    assert isclose(plan.objective, reference.objective)
+    assert decomposition.topological_output_plan(chain(), ArrayMaterials(a=4),
+                                                 ArrayMaterials(c=2)) is None
+
+
+def test_topological_output_plan_available_targets():
+    make = module.ProcessNode("make", ArrayMaterials(a=1), ArrayMaterials(d=1), 0, 0)
+
+    for nodes, available, target in [([make], ArrayMaterials(a=2, c=1), ArrayMaterials(c=1, d=1)),
+                                      ([], ArrayMaterials(c=3), ArrayMaterials(c=1))]:
+        plan = decomposition.topological_output_plan(nodes, available, target)
+        reference = ProcessOptimizer(nodes).maximize_output(available, target)
+
+        assert plan.success and reference.success
+        assert plan.output_scale == pytest.approx(reference.output_scale)
+        assert isclose(plan.objective, reference.objective)
+
+
+def test_process_skips_lp_for_single_producers():
+    cache = SolutionCache()
+
+    solution = module.Process.minimize_input(ArrayMaterials(c=4), _loop(), cache=cache)
+
+    assert solution.success
+    assert cache.stats["misses"] == 0
+
+    module.Process.minimize_input(ArrayMaterials(c=4), _loop(), cache=cache, decompose=False)
+
+    assert cache.stats["misses"] == 1
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from satisfactory_tools.core.material_batch import MaterialBatch
+from tests import ArrayMaterials, Materials
+
+SparseMaterials = ArrayMaterials.sparse_type()
+
+
+@pytest.mark.parametrize("spec_type", [Materials, ArrayMaterials, SparseMaterials])
+def test_material_batch_round_trip(spec_type):
+    specs = [spec_type(a=1, b=2), spec_type(c=3), spec_type()]
+    batch = MaterialBatch.from_specs(specs)
+
+    assert batch.shape == (3, 10)
+    assert batch.to_specs() == specs
+    assert batch[1] == spec_type(c=3)
+
+
+def test_material_batch_empty():
+    batch = MaterialBatch.from_specs([], Materials)
+
+    assert len(batch) == 0
+    assert batch.sum() == Materials()
+
+    with pytest.raises(ValueError):
+        MaterialBatch.from_specs([])
+
+
+@pytest.mark.parametrize("spec_type", [Materials, ArrayMaterials, SparseMaterials])
+def test_material_batch_sum(spec_type):
+    specs = [spec_type(a=1, b=2), spec_type(b=3, c=3), spec_type(d=1)]
+    batch = MaterialBatch.from_specs(specs)
+
+    assert batch.sum() == sum(specs, spec_type())
+    assert batch.sum([1, 2, 0]) == specs[0] + specs[1] * 2
+    assert batch.scale([1, 2, 0]).sum() == batch.sum([1, 2, 0])
+    assert (2 * batch).sum() == batch.sum() * 2
+
+
+def test_material_batch_thresholding():
+    batch = MaterialBatch.from_specs([Materials(a=1, b=4), Materials(c=3, d=5)])
+
+    assert (batch > 3).to_specs() == [Materials(b=4), Materials(d=5)]
+    assert (batch <= 3).to_specs() == [Materials(a=1), Materials(c=3)]
+    assert np.array_equal((batch >= 3).matrix, (batch > 2).matrix)
+
+
+@pytest.mark.parametrize("spec_type", [Materials, ArrayMaterials])
+def test_material_batch_net_flow(spec_type):
+    inputs = [spec_type(a=2, b=4), spec_type(e=4, f=7), spec_type(c=1)]
+    outputs = [spec_type(e=4, f=7), spec_type(c=2, d=4), spec_type(g=3)]
+
+    sum_inputs = sum(inputs, spec_type())
+    sum_outputs = sum(outputs, spec_type())
+    expected_inputs = (sum_inputs - (sum_outputs | sum_inputs)) > 0
+    expected_outputs = (sum_outputs - (sum_inputs | sum_outputs)) > 0
+
+    net_inputs, net_outputs = MaterialBatch.net_flow(MaterialBatch.from_specs(inputs),
+                                                     MaterialBatch.from_specs(outputs))
+
+    assert net_inputs == expected_inputs
+    assert net_outputs == expected_outputs
+    assert net_inputs == spec_type(a=2, b=4)
+    assert net_outputs == spec_type(c=1, d=4, g=3)
@@ -1,7 +1,11 @@
+import pickle
+from dataclasses import FrozenInstanceError
 from math import isclose
 
+import numpy as np
 import pytest
 
+from satisfactory_tools.core.material import make_material_spec
 from tests import Materials
 
 
@@ -135,3 +139,38 @@ def test_materials_thresholding():
     assert greater_equal.f == 6
 
 
+
+
+def test_materials_generated_class():
+    mats = Materials(a=1, f=6)
+
+    assert Materials.material_names() == tuple("abcdefghij")
+    assert not hasattr(mats, "__dict__")
+    assert mats == Materials(1, 0, 0, 0, 0, 6)
+    assert hash(mats) == hash(Materials(a=1.0, f=6.0))
+    assert mats != Materials(a=1)
+    assert Materials.from_array(mats.to_array()) == mats
+    assert np.float64(2) * mats == Materials(a=2, f=12)
+    assert pickle.loads(pickle.dumps(mats)) == mats
+
+    with pytest.raises(FrozenInstanceError):
+        mats.a = 2
+    with pytest.raises(TypeError):
+        Materials(z=1)
+    with pytest.raises(ValueError):
+        Materials.from_array([1, 2])
+
+
+@pytest.mark.parametrize("names", [["a", "a"], ["iron ore"], ["_a"], ["class"]])
+def test_make_material_spec_invalid_names(names):
+    with pytest.raises(ValueError):
+        make_material_spec("Invalid", names)
+
+
+def test_make_material_spec_metadata():
+    spec_type = make_material_spec("WithMetadata", ["a", "b"], metadata=["first", "second"])
+
+    assert spec_type.field_metadata() == ("first", "second")
+    assert Materials.field_metadata() == (None,) * 10
+    with pytest.raises(ValueError):
+        make_material_spec("WithMetadata", ["a", "b"], metadata=["first"])
@@ -0,0 +1,225 @@
+from math import isclose
+
+import pytest
+
+import satisfactory_tools.core.optimizer as optimizer_module
+import satisfactory_tools.core.process as module
+from satisfactory_tools.core.optimizer import ProcessOptimizer
+from tests import ArrayMaterials, chain
+
+
+@pytest.fixture(params=["highs", "linprog"])
+def backend(request, monkeypatch):
+    if request.param == "linprog":
+        monkeypatch.setattr(optimizer_module, "highspy", None)
+    elif optimizer_module.highspy is None:
+        pytest.skip("highspy is not installed")
+    return request.param
+
+
+def _nodes():
+    alternate = module.ProcessNode("alternate", ArrayMaterials(a=1), ArrayMaterials(e=4, f=7), 0, 0)
+    return *chain(), alternate
+
+
+def test_optimizer_resolve_reuses_model(backend):
+    source, first, second, alternate = _nodes()
+    optimizer = ProcessOptimizer([source, first, second])
+
+    solution = optimizer.minimize_input(ArrayMaterials(c=4))
+    model = optimizer._model
+
+    assert solution.success
+    assert isclose(solution[second], 2)
+    assert isclose(solution.objective, 6)
+
+    solution = optimizer.minimize_input(ArrayMaterials(c=8, d=8))
+
+    assert optimizer._model is model
+    assert optimizer.solution is solution
+    assert isclose(solution[second], 4)
+    assert isclose(solution.objective, 12)
+
+
+def test_optimizer_grows_model(backend):
+    source, first, second, alternate = _nodes()
+    optimizer = ProcessOptimizer([source, first, second])
+
+    optimizer.minimize_input(ArrayMaterials(e=4))
+    assert set(optimizer._model.nodes) == {source, first}
+
+    solution = optimizer.minimize_input(ArrayMaterials(c=4))
+
+    assert set(optimizer._model.nodes) == {source, first, second}
+    assert isclose(solution.objective, 6)
+
+
+def test_optimizer_costs(backend):
+    source, first, second, alternate = _nodes()
+    optimizer = ProcessOptimizer([source, first, second, alternate])
+
+    solution = optimizer.minimize_input(ArrayMaterials(c=2))
+
+    # alternate needs half the source of first
+    assert solution.active() == {source: .5, alternate: 1, second: 1}
+
+    optimizer.set_costs({alternate: 10})
+    solution = optimizer.resolve()
+
+    assert solution.active() == {source: 1, first: 1, second: 1}
+
+
+def test_optimizer_available_materials(backend):
+    source, first, second, alternate = _nodes()
+    optimizer = ProcessOptimizer([source, first, second])
+
+    solution = optimizer.minimize_input(ArrayMaterials(c=4),
+                                        available_materials=ArrayMaterials(e=4, f=7))
+
+    assert solution.active() == {source: 1, first: 1, second: 2}
+
+
+def test_optimizer_maximize_output(backend):
+    source, first, second, alternate = _nodes()
+    optimizer = ProcessOptimizer([first, second])
+
+    solution = optimizer.maximize_output(ArrayMaterials(a=8, b=16), ArrayMaterials(c=2, d=4))
+
+    assert isclose(solution.output_scale, 4)
+
+    solution = optimizer.maximize_output(ArrayMaterials(a=4, b=8), ArrayMaterials(c=2, d=4))
+
+    assert isclose(solution.output_scale, 2)
+
+
+def test_optimizer_infeasible(backend):
+    source, first, second, alternate = _nodes()
+    optimizer = ProcessOptimizer([first, second])
+
+    solution = optimizer.minimize_input(ArrayMaterials(c=4))
+
+    assert not solution.success
+    assert solution.status == optimizer_module.INFEASIBLE
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_solve_many(max_workers):
+    source, first, second, alternate = _nodes()
+    targets = [ArrayMaterials(c=2 * level) for level in range(1, 6)] + [ArrayMaterials(e=4)]
+
+    results = list(optimizer_module.solve_many(targets, [source, first, second],
+                                               max_workers=max_workers))
+
+    assert [result.target_index for result in results] == list(range(6))
+    assert all(result.success for result in results)
+    assert [result.objective for result in results[:5]] == pytest.approx([3, 6, 9, 12, 15])
+    assert results[2].active() == pytest.approx({source: 3, first: 3, second: 3})
+    assert results[5].active() == pytest.approx({source: 1, first: 1})
+
+
+def test_solve_many_matches_single_solves():
+    source, first, second, alternate = _nodes()
+    nodes = [source, first, second, alternate]
+    targets = [ArrayMaterials(c=2, e=4), ArrayMaterials(d=8), ArrayMaterials(c=1)]
+
+    for result, target in zip(optimizer_module.solve_many(targets, nodes, max_workers=2), targets):
+        single = module.Process.minimize_input(target, nodes)
+        assert result.objective == pytest.approx(single.objective)
+
+
+def test_minimize_machines(backend):
+    source = module.ProcessNode("source", ArrayMaterials(), ArrayMaterials(a=1), 0, 0)
+    large = module.ProcessNode("large", ArrayMaterials(a=1), ArrayMaterials(c=3), 0, 0)
+    small = module.ProcessNode("small", ArrayMaterials(a=1), ArrayMaterials(c=2), 0, 0)
+
+    optimizer = ProcessOptimizer([source, large, small])
+    plan = optimizer.minimize_machines(ArrayMaterials(c=7), time_limit=5)
+
+    assert plan.status == 0
+    assert plan.gap == pytest.approx(0, abs=1e-9)
+    assert sum(plan.counts().values()) == 6
+    assert all(plan[node] <= count for node, count in plan.counts().items())
+
+
+def test_minimize_machines_heuristic_reports_gap(backend):
+    source = module.ProcessNode("source", ArrayMaterials(), ArrayMaterials(a=1), 0, 0)
+    large = module.ProcessNode("large", ArrayMaterials(a=1), ArrayMaterials(c=3), 0, 0)
+
+    optimizer = ProcessOptimizer([source, large])
+    plan = optimizer.minimize_machines(ArrayMaterials(c=7), heuristic_only=True)
+
+    # 7/3 of each node in the relaxation, three whole machines of each
+    assert plan.counts() == {source: 3, large: 3}
+    assert plan.status == optimizer_module.ITERATION_LIMIT
+    assert plan.bound == pytest.approx((1 + optimizer_module.MACHINE_PENALTY) * 14 / 3)
+    assert 0 < plan.gap < .25
+    assert plan.building_counts() == {"source": 3, "large": 3}
+
+
+def test_sensitivity_report(backend):
+    source = module.ProcessNode("source", ArrayMaterials(), ArrayMaterials(a=1), 0, 1)
+    large = module.ProcessNode("large", ArrayMaterials(a=1), ArrayMaterials(c=3), 0, 1)
+    small = module.ProcessNode("small", ArrayMaterials(a=1), ArrayMaterials(c=2), 0, 0)
+    generator = module.ProcessNode("generator", ArrayMaterials(), ArrayMaterials(), 4, 0)
+
+    optimizer = ProcessOptimizer([source, large, small, generator], include_power=True,
+                                 ranging=True)
+    sensitivity = optimizer.minimize_input(ArrayMaterials(c=6)).sensitivity
+
+    # a third each of large and source, and a sixth of a generator, per extra c
+    assert sensitivity.shadow_price(2) == pytest.approx(2.5 / 3)
+    assert sensitivity.marginal_cost(ArrayMaterials(c=3)) == pytest.approx(2.5)
+    assert sensitivity.power_price == pytest.approx(.25)
+    assert sensitivity.reduced_cost(large) == pytest.approx(0)
+    assert sensitivity.reduced_cost(small) > 0
+    alternate = module.ProcessNode("alternate", ArrayMaterials(a=1), ArrayMaterials(c=4), 0, 0)
+    assert sensitivity.price(alternate) < 0
+
+    if backend == "highs":
+        c_row = sensitivity.materials.tolist().index(2)
+        assert sensitivity.requirement_ranges[c_row][1] == float("inf")
+        assert sensitivity.cost_ranges.shape == (4, 2)
+    else:
+        assert sensitivity.cost_ranges is None
+
+    # ranging is opt-in
+    optimizer = ProcessOptimizer([source, large, small, generator], include_power=True)
+    sensitivity = optimizer.minimize_input(ArrayMaterials(c=6)).sensitivity
+    assert sensitivity.cost_ranges is None and sensitivity.requirement_ranges is None
+    assert sensitivity.shadow_price(2) == pytest.approx(2.5 / 3)
+
+
+def test_rank_alternates(backend):
+    source = module.ProcessNode("source", ArrayMaterials(), ArrayMaterials(a=1), 0, 0)
+    base = module.ProcessNode("base", ArrayMaterials(a=2), ArrayMaterials(c=1), 0, 0)
+    alternates = [module.ProcessNode(f"alternate {i}", ArrayMaterials(a=amount),
+                                     ArrayMaterials(c=1), 0, 0)
+                  for i, amount in enumerate([1.5, .5, 3, 1])]
+    stranded = module.ProcessNode("stranded", ArrayMaterials(g=1), ArrayMaterials(c=5), 0, 0)
+
+    optimizer = ProcessOptimizer([source, base])
+    ranks = optimizer.rank_alternates(ArrayMaterials(c=10), alternates + [stranded], top_k=2,
+                                      max_workers=1)
+
+    assert [rank.node for rank in ranks] == [alternates[1], alternates[3], alternates[0],
+                                             alternates[2], stranded]
+    assert [rank.confirmed for rank in ranks] == [True, True, False, False, False]
+    # 10 base and 20 source, against 10 alternate and 5 source
+    assert ranks[0].improvement == pytest.approx(15)
+    assert ranks[0].scale == pytest.approx(10)
+    assert ranks[2].reduced_cost == pytest.approx(-.5)
+    assert ranks[3].reduced_cost > 0
+    assert ranks[4].reduced_cost == float("inf")
+
+
+def test_rank_alternates_in_parallel(backend):
+    source = module.ProcessNode("source", ArrayMaterials(), ArrayMaterials(a=1), 0, 0)
+    base = module.ProcessNode("base", ArrayMaterials(a=2), ArrayMaterials(c=1), 0, 0)
+    alternates = [module.ProcessNode(f"alternate {i}", ArrayMaterials(a=amount),
+                                     ArrayMaterials(c=1), 0, 0)
+                  for i, amount in enumerate([1.5, .5])]
+
+    ranks = optimizer_module.rank_alternates(ArrayMaterials(c=10), [source, base], alternates,
+                                             max_workers=2)
+
+    assert [rank.improvement for rank in ranks] == pytest.approx([15, 5])
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import satisfactory_tools.core.process as module
+from satisfactory_tools.core.material import make_array_spec
+from satisfactory_tools.core.material_batch import MaterialBatch
+from satisfactory_tools.core.pipeline import ProcessPipeline
+from tests import ArrayMaterials, Materials, chain
+
+
+@pytest.fixture(params=[Materials, ArrayMaterials, ArrayMaterials.sparse_type()])
+def spec_type(request):
+    return request.param
+
+
+def _chain(spec_type):
+    _, first, second = chain(spec_type)
+    third = module.ProcessNode("third", spec_type(c=3, d=1), spec_type(h=5), 0, 0)
+    return first, second, third
+
+
+def test_pipeline_outputs_match_operators(spec_type):
+    first, second, third = _chain(spec_type)
+    pipeline = module.ProcessNode.compile(first, second, third)
+    inputs = spec_type(a=2, b=4, i=1)
+    levels = [0, 1, 2.5, 3, 7.9, 100]
+
+    batch = pipeline.outputs(inputs, levels)
+
+    assert isinstance(batch, MaterialBatch)
+    assert len(batch) == len(levels)
+    for level, outputs in zip(levels, batch):
+        assert outputs == level * inputs >> first >> second >> third
+    assert pipeline.outputs(3 * inputs) == 3 * inputs >> first >> second >> third
+
+
+def test_pipeline_inputs_match_operators(spec_type):
+    first, second, third = _chain(spec_type)
+    pipeline = ProcessPipeline(first, second, third)
+    outputs = spec_type(h=5, d=1)
+    levels = np.linspace(0, 20, 41)
+
+    batch = pipeline.inputs(outputs, levels)
+
+    for level, inputs in zip(levels, batch):
+        assert inputs == first >> second >> third >> level * outputs
+    assert ProcessPipeline(second).inputs(outputs * 4) == second >> outputs * 4
+
+
+def test_pipeline_batches(spec_type):
+    first, second, third = _chain(spec_type)
+    pipeline = ProcessPipeline(first, second)
+    specs = [spec_type(a=2, b=4), spec_type(a=9, b=9), spec_type(a=1)]
+
+    batch = pipeline.outputs(MaterialBatch.from_specs(specs))
+
+    assert batch.to_specs() == [spec >> first >> second for spec in specs]
+    with pytest.raises(ValueError):
+        pipeline.outputs(MaterialBatch.from_specs(specs), levels=[1, 2, 3])
+
+
+def test_pipeline_errors():
+    source = module.ProcessNode("source", Materials(), Materials(a=1), 0, 0)
+    Other = make_array_spec("Other", ["x", "y"])
+
+    with pytest.raises(ValueError):
+        ProcessPipeline()
+    with pytest.raises(ValueError):
+        ProcessPipeline(source, module.ProcessNode("other", Other(x=1), Other(y=1), 0, 0))
+    with pytest.raises(ZeroDivisionError):
+        ProcessPipeline(source).outputs(Materials(a=1))
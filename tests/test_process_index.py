@@ -0,0 +1,103 @@
+import satisfactory_tools.core.process as module
+from satisfactory_tools.core.process_index import ProcessIndex
+from tests import Materials, chain
+
+
+def _chain():
+    unrelated = module.ProcessNode("unrelated", Materials(g=1), Materials(h=1), 0, 0)
+    return *chain(Materials), unrelated
+
+
+def test_process_index_lookup():
+    source, first, second, unrelated = _chain()
+    index = ProcessIndex([source, first, second, unrelated])
+
+    assert index.producers[0] == {source}
+    assert index.consumers[0] == {first}
+    assert len(index) == 4
+    assert list(index) == [source, first, second, unrelated]
+
+    index.remove(first)
+
+    assert first not in index
+    assert index.consumers[0] == set()
+    assert index.producers[4] == set()
+
+
+def test_process_index_edges():
+    source, first, second, unrelated = _chain()
+    index = ProcessIndex([source, first, second, unrelated])
+
+    assert sorted((p.name, c.name, m) for p, c, m in index.edges()) == [
+        ("first", "second", 4), ("first", "second", 5),
+        ("source", "first", 0), ("source", "first", 1)]
+
+
+def test_process_index_upstream():
+    source, first, second, unrelated = _chain()
+    index = ProcessIndex([source, first, second, unrelated])
+
+    assert index.upstream([2]) == {source, first, second}
+    assert index.upstream([4]) == {source, first}
+    assert index.upstream([7]) == {unrelated}
+    assert index.upstream([9]) == set()
+
+
+def test_make_graph_direction():
+    source, first, second, unrelated = _chain()
+    graph = module.Process._make_graph([source, first, second, unrelated])
+
+    assert graph.has_edge(source, first)
+    assert not graph.has_edge(first, source)
+    assert graph.number_of_edges(first, second) == 2
+    assert graph.degree(unrelated) == 0
+
+
+def test_filter_eligible_nodes_reuses_index():
+    source, first, second, unrelated = _chain()
+    index = ProcessIndex([source, first, second, unrelated])
+    output = module.ProcessNode("Output", Materials(e=1), Materials(), 0, 0)
+
+    assert module.Process._filter_eligible_nodes(output, index) == {output, source, first}
+    assert output not in index
+
+
+def test_process_index_closure_cache():
+    source, first, second, unrelated = _chain()
+    index = ProcessIndex([source, first, second, unrelated], closure_cache_size=2)
+
+    closure = index.closure(2)
+
+    assert closure == {source, first, second}
+    assert index.closure(2) is closure
+
+    index.closure(4)
+    index.closure(7)
+
+    assert len(index._closures) == 2
+    assert index.closure(2) is not closure
+
+
+def test_process_index_invalidation():
+    source, first, second, unrelated = _chain()
+    index = ProcessIndex([source, second, unrelated])
+    fingerprint = index.fingerprint
+
+    assert index.closure(2) == {second}
+
+    index.add(first)
+
+    assert index.fingerprint != fingerprint
+    assert index.closure(2) == {source, first, second}
+
+    index.remove(first)
+
+    assert index.fingerprint == fingerprint
+    assert index.closure(2) == {second}
+
+
+def test_process_index_for_nodes():
+    nodes = list(_chain())
+
+    assert ProcessIndex.for_nodes(nodes) is ProcessIndex.for_nodes(reversed(nodes))
+    assert ProcessIndex.for_nodes(nodes[:2]) is not ProcessIndex.for_nodes(nodes)
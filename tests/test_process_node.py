@@ -1,4 +1,8 @@
+import pytest
+from pydantic import ValidationError
+
 import satisfactory_tools.core.process as module
+from satisfactory_tools.core.material import make_array_spec
 from tests import Materials
 
 
@@ -113,3 +117,44 @@ def test_optimization_extraneous_recipes_maximize_output():
 
 # TODO: tests that include power
 # TODO: tests with fork in solution
+
+
+def test_composite_process_node_net_flow():
+    inputs = Materials(a=2, b=4)
+    midputs = Materials(e=4, f=7)
+    outputs = Materials(c=2, d=4)
+
+    first = module.ProcessNode("first", inputs, midputs, 1, 2)
+    second = module.ProcessNode("second", midputs, outputs, 0, 3)
+
+    composite = module.CompositeProcessNode(first, second)
+    joined = module.ProcessNode.from_nodes(first, second)
+
+    for node in (composite, joined):
+        assert node.input_materials == inputs
+        assert node.output_materials == outputs
+        assert node.power_production == 1
+        assert node.power_consumption == 5
+
+    assert composite.nodes == {first, second}
+    assert joined.internal_nodes == {first, second}
+
+
+def test_process_node_validation():
+    inputs = Materials(a=2, b=4)
+    outputs = Materials(c=2, d=4)
+
+    Other = make_array_spec("Other", ["x"])
+
+    node = module.ProcessNode("Test", inputs, outputs, 1, 0)
+    loaded = module.ProcessNode.model_validate(node.model_dump())
+
+    assert not hasattr(node, "__dict__")
+    assert loaded is not node and loaded != node
+    assert loaded.input_materials == inputs
+    assert loaded.power_production == 1.0
+
+    with pytest.raises(ValidationError):
+        module.ProcessNode.model_validate({**node.model_dump(), "input_materials": {"a": 2}})
+    with pytest.raises(ValueError):
+        module.ProcessNode.model_validate({**node.model_dump(), "input_materials": Other(x=1)})
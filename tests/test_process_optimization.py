@@ -0,0 +1,131 @@
+from math import isclose
+
+import numpy as np
+import pytest
+
+import satisfactory_tools.core.process as module
+from satisfactory_tools.core.optimizer import constraint_matrix
+from tests import ArrayMaterials, Materials, chain
+
+
+@pytest.fixture(params=[Materials, ArrayMaterials, ArrayMaterials.sparse_type()])
+def spec_type(request):
+    return request.param
+
+
+def test_constraint_matrix(spec_type):
+    first = module.ProcessNode("first", spec_type(a=2, b=4), spec_type(e=4, f=7), 1, 3)
+    second = module.ProcessNode("second", spec_type(e=4, f=7), spec_type(c=2, e=1), 0, 1)
+
+    matrix, materials = constraint_matrix([first, second])
+
+    assert materials.tolist() == [0, 1, 2, 4, 5]
+    assert np.array_equal(matrix.toarray(), [[-2, 0], [-4, 0], [0, 2], [4, -3], [7, -7]])
+
+    matrix, materials = constraint_matrix([first, second], include_power=True,
+                                          required_materials=np.array([9]))
+
+    assert materials.tolist() == [0, 1, 2, 4, 5, 9]
+    assert matrix.shape == (7, 2)
+    assert np.array_equal(matrix.toarray()[-2:], [[0, 0], [-2, -1]])
+
+
+def test_minimize_input_objective(spec_type):
+    outputs = spec_type(c=2, d=4)
+
+    solution = module.Process.minimize_input(4*outputs, chain(spec_type))
+
+    assert solution.status == 0
+    # four of each recipe
+    assert isclose(solution.objective, 12)
+
+
+def test_maximize_output_objective(spec_type):
+    inputs = spec_type(a=2, b=4)
+    outputs = spec_type(c=2, d=4)
+
+    _, first, second = chain(spec_type)
+
+    solution = module.Process.maximize_output(4*inputs, outputs, [first, second])
+
+    assert solution.status == 0
+    assert isclose(solution.objective, -4 + 8 * .0001)
+
+
+def test_minimize_input_include_power(spec_type):
+    inputs = spec_type(a=2, b=4)
+    outputs = spec_type(c=2, d=4)
+
+    source = module.ProcessNode("source", spec_type(), inputs, 0, 1)
+    first = module.ProcessNode("first", inputs, outputs, 0, 2)
+    fuel = module.ProcessNode("fuel", spec_type(), spec_type(g=1), 0, 0)
+    generator = module.ProcessNode("generator", spec_type(g=1), spec_type(), 6, 0)
+
+    solution = module.Process.minimize_input(2*outputs, [source, first, fuel, generator],
+                                             include_power=True)
+
+    # two each of source and first need 6 power, one generator and its fuel supply it
+    assert solution.status == 0
+    assert isclose(solution.objective, 6)
+
+
+def test_presolve_collapses_chain(spec_type):
+    source, first, _ = chain(spec_type)
+    second = module.ProcessNode("second", spec_type(e=2, f=7), spec_type(c=2, d=4), 0, 0)
+
+    presolved = module.Process.presolve(spec_type(c=4), [source, first, second])
+
+    (merged,) = presolved.nodes
+    assert isinstance(merged, module.CompositeProcessNode)
+    assert dict(presolved.expansions[merged]) == {second: 1, first: 1, source: 1}
+    # first makes more e than second needs, which stays a byproduct
+    expected = spec_type(c=2, d=4, e=2)
+    assert merged.output_materials.to_array().tolist() == expected.to_array().tolist()
+    assert presolved.costs[merged] == 3
+
+    solution = module.Process.minimize_input(spec_type(c=4), [source, first, second], cache=None)
+
+    assert isclose(solution.objective, 6)
+    assert solution.active() == {second: 2, first: 2, source: 2}
+
+
+def test_presolve_drops_dominated_and_unreachable(spec_type):
+    source = module.ProcessNode("source", spec_type(), spec_type(a=1), 0, 0)
+    cheap = module.ProcessNode("cheap", spec_type(a=1), spec_type(c=2), 0, 0)
+    expensive = module.ProcessNode("expensive", spec_type(a=2), spec_type(c=2), 0, 0)
+    stranded = module.ProcessNode("stranded", spec_type(g=1), spec_type(c=4), 0, 0)
+
+    presolved = module.Process.presolve(spec_type(c=4), [source, cheap, expensive, stranded])
+
+    assert presolved.dropped == {expensive, stranded}
+
+    nodes = [source, cheap, expensive, stranded]
+    solution = module.Process.minimize_input(spec_type(c=4), nodes, cache=None)
+    reference = module.Process.minimize_input(spec_type(c=4), nodes, cache=None, presolve=False)
+
+    assert isclose(solution.objective, reference.objective)
+    assert solution.active() == {cheap: 2, source: 2}
+
+
+def test_presolve_keeps_shared_materials(spec_type):
+    source = module.ProcessNode("source", spec_type(), spec_type(a=1), 0, 0)
+    first = module.ProcessNode("first", spec_type(a=1), spec_type(c=1), 0, 0)
+    second = module.ProcessNode("second", spec_type(a=1), spec_type(d=1), 0, 0)
+
+    # a feeds two recipes and c is a target, so nothing can be merged
+    presolved = module.Process.presolve(spec_type(c=1, d=1), [source, first, second])
+
+    assert set(presolved.nodes) == {source, first, second}
+    assert presolved.expansions == {}
+
+
+def test_presolve_expands_sensitivity(spec_type):
+    nodes = chain(spec_type)
+
+    solution = module.Process.minimize_input(spec_type(c=4), nodes, cache=None)
+    reference = module.Process.minimize_input(spec_type(c=4), nodes, cache=None, presolve=False)
+
+    # materials merged away are priced, so the original recipes break even
+    assert isclose(solution.sensitivity.shadow_price(2), reference.sensitivity.shadow_price(2))
+    assert solution.sensitivity.shadow_price(4) > 0
+    assert solution.sensitivity.reduced_costs.tolist() == pytest.approx([0, 0, 0])
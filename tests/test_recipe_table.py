@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from satisfactory_tools.config.machines import MachineData
+from satisfactory_tools.config.recipes import RECIPE_KEY, RecipeData, parse_recipes
+from satisfactory_tools.core.material import make_array_spec
+
+
+def _item(name):
+    return f"BlueprintGeneratedClass'\"/Game/Resource/{name}.{name}_C\"'"
+
+
+def _recipe(class_name, ingredients, products, duration, machines):
+    def amounts(items):
+        return "(" + ",".join(f"(ItemClass={_item(name)},Amount={amount})"
+                              for name, amount in items.items()) + ")"
+
+    return {"ClassName": class_name, "mDisplayName": class_name.replace("_", " "),
+            "mIngredients": amounts(ingredients), "mProduct": amounts(products),
+            "mManufactoringDuration": str(duration),
+            "mProducedIn": "(" + ",".join(f"\"/Game/{name}.{name}_C\"" for name in machines) + ")"}
+
+
+@pytest.fixture
+def recipes():
+    config = {RECIPE_KEY: {recipe["ClassName"]: recipe for recipe in [
+        _recipe("Recipe_Ingot", {"Ore": 1}, {"Ingot": 1}, 2, ["Smelter"]),
+        _recipe("Recipe_Plate", {"Ingot": 3}, {"Plate": 2}, 6, ["Constructor", "WorkBench"]),
+        _recipe("Recipe_Alloy", {"Ore": 2, "Copper": 2}, {"Ingot": 5}, 12, ["Foundry"]),
+    ]}}
+    return parse_recipes(config, materials=["Plate_C", "Ingot_C"])
+
+
+def test_recipe_table_columns(recipes):
+    assert recipes.materials == ("Plate_C", "Ingot_C", "Ore_C", "Copper_C")
+    assert recipes.class_names == ("Recipe_Ingot", "Recipe_Plate", "Recipe_Alloy")
+    assert recipes.machine_names == ("Smelter_C", "Constructor_C", "WorkBench_C", "Foundry_C")
+    assert recipes.durations.tolist() == pytest.approx([2 / 60, 6 / 60, 12 / 60])
+
+    assert recipes.input_amounts.toarray().tolist() == [[0, 0, 1, 0], [0, 3, 0, 0], [0, 0, 2, 2]]
+    assert recipes.outputs.toarray() == pytest.approx(np.array([[0, 30, 0, 0], [20, 0, 0, 0],
+                                                                [0, 25, 0, 0]]))
+    assert recipes.net.toarray()[1] == pytest.approx([20, -30, 0, 0])
+    assert recipes.machines.toarray().tolist() == [[True, False, False, False],
+                                                   [False, True, True, False],
+                                                   [False, False, False, True]]
+
+
+def test_recipe_table_views(recipes):
+    plate = recipes["Recipe_Plate"]
+
+    assert plate == RecipeData(class_name="Recipe_Plate", display_name="Recipe Plate",
+                               inputs={"Ingot_C": 3.0}, outputs={"Plate_C": 2.0}, duration=0.1,
+                               machines={"Constructor_C", "WorkBench_C"})
+    assert recipes[1] == plate
+    assert [recipe.class_name for recipe in recipes] == list(recipes.class_names)
+    assert len(recipes) == 3
+    with pytest.raises(KeyError):
+        recipes["Recipe_Missing"]
+
+
+def test_recipe_table_process_nodes(recipes, monkeypatch):
+    spec_type = make_array_spec("TableMaterials", ["plate", "ingot", "ore", "copper"])
+    machines = [MachineData(class_name="Smelter_C", display_name="Smelter", power_consumption=4,
+                            power_production=0),
+                MachineData(class_name="Constructor_C", display_name="Constructor",
+                            power_consumption=4, power_production=0)]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("nodes should be built from the CSR rows")
+
+    monkeypatch.setattr(spec_type, "from_array", fail)
+    ingot, plate = recipes.process_nodes(spec_type, machines)
+
+    assert isinstance(plate.input_materials, spec_type.sparse_type())
+    assert plate.name == "Recipe Plate"
+    assert plate.input_materials == spec_type.sparse_type()(ingot=30)
+    assert plate.output_materials == spec_type.sparse_type()(plate=20)
+    assert plate.power_consumption == 4
+    assert (ingot >> plate).output_materials.plate == pytest.approx(20)
+
+    # without machines every recipe is included, without power
+    assert [node.name for node in recipes.process_nodes(spec_type)] == list(recipes.display_names)
+    assert recipes.process_nodes(spec_type)[2].power_consumption == 0
+
+    with pytest.raises(ValueError):
+        recipes.process_nodes(make_array_spec("Short", ["plate", "ingot"]))
@@ -0,0 +1,31 @@
+from satisfactory_tools.search import SearchIndex
+
+CHOICES = ["Iron Ingot", "Iron Plate", "Reinforced Iron Plate", "Copper Ingot", "Steel_Pipe",
+           "Rubber"]
+
+
+def test_candidates_ranked_by_shared_trigrams():
+    index = SearchIndex(CHOICES)
+    candidates = index.candidates("iron plate")
+
+    assert [choice for choice, _ in candidates[:2]] == ["Iron Plate", "Reinforced Iron Plate"]
+    assert {choice for choice, _ in candidates} >= {"Iron Ingot"}
+    assert "Rubber" not in dict(candidates)
+
+
+def test_candidates_prefix_and_typo():
+    index = SearchIndex(CHOICES)
+
+    assert index.candidates("st")[0][0] == "Steel_Pipe"
+    assert index.candidates("steel pipe")[0][0] == "Steel_Pipe"
+    assert index.candidates("coper ingt")[0][0] == "Copper Ingot"
+
+
+def test_candidates_limit():
+    index = SearchIndex(CHOICES)
+
+    candidates = index.candidates("iron", limit=2)
+    assert [choice for choice, _ in candidates] == ["Iron Ingot", "Iron Plate"]
+    assert index.candidates("iron", limit=0) == []
+    assert index.candidates("zzz") == []
+    assert index.candidates("") == []
@@ -0,0 +1,46 @@
+from satisfactory_tools.categorized_collection import CategorizedCollection
+from satisfactory_tools.selection import TagSelection
+
+
+def _selection():
+    elements = CategorizedCollection({"a": 1, "b": 2, "c": 3},
+                                     {"x": {"a", "b"}, "y": {"b", "c"}, "empty": set()})
+    return TagSelection(elements)
+
+
+def test_select_updates_counts():
+    selection = _selection()
+    counts = selection.counts
+
+    assert selection.select({"a": True, "b": True}) == {"a", "b"}
+    assert counts == {"x": 2, "y": 1, "empty": 0}
+
+    # repeated and unchanged values are ignored
+    assert selection.select({"a": True, "c": False}) == set()
+    assert selection.select({"b": False}) == {"b"}
+    assert counts == {"x": 1, "y": 0, "empty": 0}
+    assert selection.counts is counts
+    assert "a" in selection and len(selection) == 1
+
+
+def test_toggle():
+    selection = _selection()
+    selection.select({"a": True})
+
+    assert selection.toggle(["a", "b"]) == {"b"}
+    assert selection.counts["x"] == 2
+    assert selection.toggle(["a", "b"]) == {"a", "b"}
+    assert selection.counts == {"x": 0, "y": 0, "empty": 0}
+
+
+def test_counts_match_recount():
+    elements = CategorizedCollection({i: i for i in range(200)},
+                                     {f"t{j}": set(range(j, 200, j + 1)) for j in range(10)})
+    selection = TagSelection(elements)
+
+    selection.toggle(elements.tag("t0"))
+    selection.toggle(elements.tag("t3"))
+    selection.select({i: i % 7 == 0 for i in range(0, 200, 3)})
+
+    assert selection.counts == {tag: sum(key in selection for key in view)
+                                for tag, view in elements.tags.items()}
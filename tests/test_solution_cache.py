@@ -0,0 +1,138 @@
+import pytest
+
+import satisfactory_tools.core.process as module
+from satisfactory_tools.core.optimizer import ProcessOptimizer
+from satisfactory_tools.core.solution_cache import SolutionCache, node_digest
+from tests import ArrayMaterials, chain
+
+# chain() is planned without the LP, and so without the cache, unless decompose=False
+
+
+def test_node_digest_is_content_based():
+    first, second = chain(), chain()
+
+    assert [node_digest(node) for node in first] == [node_digest(node) for node in second]
+    assert node_digest(first[0]) != node_digest(first[1])
+
+
+def test_solution_cache_hits_rebuilt_nodes():
+    cache = SolutionCache()
+    nodes = chain()
+
+    solution = module.Process.minimize_input(ArrayMaterials(c=4), nodes,
+                                             cache=cache, decompose=False)
+
+    assert cache.stats == {"hits": 0, "misses": 1, "entries": 1}
+
+    rebuilt = chain()
+    cached = module.Process.minimize_input(ArrayMaterials(c=4), rebuilt,
+                                           cache=cache, decompose=False)
+
+    assert cache.hits == 1
+    assert cached.objective == solution.objective
+    assert cached.active() == pytest.approx(dict(zip(rebuilt, [2, 2, 2])))
+
+
+def test_solution_cache_key_covers_request():
+    cache = SolutionCache()
+    nodes = chain()
+
+    module.Process.minimize_input(ArrayMaterials(c=4), nodes, cache=cache, decompose=False)
+    module.Process.minimize_input(ArrayMaterials(c=6), nodes, cache=cache, decompose=False)
+    module.Process.minimize_input(ArrayMaterials(c=4), nodes,
+                                  include_power=True, cache=cache, decompose=False)
+    module.Process.minimize_input(ArrayMaterials(c=4), nodes[1:], cache=cache, decompose=False)
+    module.Process.maximize_output(ArrayMaterials(a=4, b=8), ArrayMaterials(c=2), nodes,
+                                   cache=cache, decompose=False)
+
+    assert cache.stats == {"hits": 0, "misses": 5, "entries": 5}
+
+
+def test_solution_cache_resolve_key_covers_model():
+    source_a = module.ProcessNode("source_a", ArrayMaterials(), ArrayMaterials(a=1), 0, 0)
+    make_c = module.ProcessNode("make_c", ArrayMaterials(a=1), ArrayMaterials(c=1), 0, 0)
+    source_b = module.ProcessNode("source_b", ArrayMaterials(), ArrayMaterials(b=1), 0, 0)
+    make_d = module.ProcessNode("make_d", ArrayMaterials(b=1), ArrayMaterials(d=1), 0, 0)
+    nodes = [source_a, make_c, source_b, make_d]
+    cache = SolutionCache()
+
+    make_c_plan = ProcessOptimizer(nodes, cache=cache)
+    make_d_plan = ProcessOptimizer(nodes, cache=cache)
+    make_c_plan.minimize_input(ArrayMaterials(c=3))
+    make_d_plan.minimize_input(ArrayMaterials(d=3))
+    make_c_plan.set_costs({make_c: 5})
+    make_d_plan.set_costs({make_c: 5})
+
+    # both models have row bounds [0, 3], over different materials
+    assert make_c_plan.resolve().objective == pytest.approx(18)
+    solution = make_d_plan.resolve()
+    assert solution.objective == pytest.approx(6)
+    assert solution.active() == pytest.approx({source_b: 3, make_d: 3})
+
+
+def test_solution_cache_lru():
+    cache = SolutionCache(maxsize=2)
+    nodes = chain()
+
+    for level in (2, 4, 6):
+        module.Process.minimize_input(ArrayMaterials(c=level), nodes, cache=cache, decompose=False)
+    module.Process.minimize_input(ArrayMaterials(c=2), nodes, cache=cache, decompose=False)
+
+    assert len(cache) == 2
+    assert cache.hits == 0
+
+
+def test_solution_cache_disk(tmp_path):
+    nodes = chain()
+    module.Process.minimize_input(ArrayMaterials(c=4), nodes,
+                                  cache=SolutionCache(directory=tmp_path), decompose=False)
+
+    cache = SolutionCache(directory=tmp_path)
+    solution = module.Process.minimize_input(ArrayMaterials(c=4), chain(),
+                                             cache=cache, decompose=False)
+
+    assert cache.hits == 1
+    assert solution.objective == pytest.approx(6)
+
+    cache.invalidate(config_version="next")
+    module.Process.minimize_input(ArrayMaterials(c=4), chain(), cache=cache, decompose=False)
+
+    assert cache.misses == 1
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+
+def test_solution_cache_invalidate_keeps_other_files(tmp_path):
+    other = tmp_path / "config-0123.pkl"
+    other.write_bytes(b"not a solution")
+    cache = SolutionCache(directory=tmp_path)
+    module.Process.minimize_input(ArrayMaterials(c=4), chain(), cache=cache, decompose=False)
+
+    cache.invalidate()
+
+    assert list(tmp_path.glob("*.pkl")) == [other]
+
+
+def test_solution_cache_config_version():
+    nodes = chain()
+    cache = SolutionCache()
+    module.Process.minimize_input(ArrayMaterials(c=4), nodes, cache=cache, decompose=False)
+
+    cache.config_version = "update 9"
+    module.Process.minimize_input(ArrayMaterials(c=4), nodes, cache=cache, decompose=False)
+
+    assert cache.misses == 2
+
+
+def test_solution_cache_keeps_sensitivity():
+    cache = SolutionCache()
+    solution = module.Process.minimize_input(ArrayMaterials(c=4), chain(),
+                                             cache=cache, decompose=False)
+
+    rebuilt = chain()
+    cached = module.Process.minimize_input(ArrayMaterials(c=4), rebuilt,
+                                           cache=cache, decompose=False)
+
+    assert cache.hits == 1
+    assert cached.sensitivity.nodes == cached.nodes
+    assert cached.sensitivity.shadow_price(2) == pytest.approx(solution.sensitivity.shadow_price(2))
+    assert [cached.sensitivity.reduced_cost(node) for node in rebuilt] == pytest.approx([0, 0, 0])
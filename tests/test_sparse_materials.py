@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from tests import ArrayMaterials, Materials
+
+SparseMaterials = ArrayMaterials.sparse_type()
+
+
+def test_sparse_materials():
+    mats = SparseMaterials(a=1, f=6, c=0)
+
+    assert mats.a == 1
+    assert mats.b == 0
+    assert mats["f"] == 6
+    assert dict(mats) == dict(Materials(a=1, f=6))
+    assert mats.nonzero()[0].tolist() == [0, 5]
+
+
+def test_sparse_materials_shared_schema():
+    assert SparseMaterials._schema is ArrayMaterials._schema
+    assert SparseMaterials.dense_type() is ArrayMaterials
+    assert ArrayMaterials(a=1, c=2).to_sparse() == SparseMaterials(a=1, c=2)
+    assert SparseMaterials(a=1, c=2).to_dense() == ArrayMaterials(a=1, c=2)
+
+
+@pytest.mark.parametrize("operation", [
+    lambda x, y: x + y,
+    lambda x, y: x - y,
+    lambda x, y: y - x,
+    lambda x, y: x * 2,
+    lambda x, y: 2 * x,
+    lambda x, y: x / 2,
+    lambda x, y: x // 2,
+    lambda x, y: x | y,
+    lambda x, y: y | x,
+    lambda x, y: x < 3,
+    lambda x, y: x <= 3,
+    lambda x, y: x > 3,
+    lambda x, y: x >= 3,
+])
+@pytest.mark.parametrize("other_type", [SparseMaterials, ArrayMaterials])
+def test_sparse_materials_match_dataclass(operation, other_type):
+    values = dict(a=1, b=2, c=3, d=4, e=5, f=6)
+    other = dict(c=3, d=4, e=5, g=1)
+
+    expected = operation(Materials(**values), Materials(**other))
+    result = operation(SparseMaterials(**values), other_type(**other))
+
+    assert dict(result) == dict(expected)
+
+
+def test_sparse_materials_mixed_result_types():
+    sparse = SparseMaterials(a=1)
+    dense = ArrayMaterials(b=1)
+
+    assert isinstance(sparse + sparse, SparseMaterials)
+    assert isinstance(sparse + dense, ArrayMaterials)
+    assert isinstance(dense - sparse, ArrayMaterials)
+    assert isinstance(sparse | dense, SparseMaterials)
+    assert sparse + dense == ArrayMaterials(a=1, b=1)
+
+
+def test_sparse_materials_cancellation_drops_entries():
+    mats = SparseMaterials(a=1, b=2) - SparseMaterials(a=1)
+
+    assert mats.nonzero()[0].tolist() == [1]
+    assert mats == SparseMaterials(b=2)
+
+
+@pytest.mark.parametrize("denominator_type", [SparseMaterials, ArrayMaterials])
+def test_sparse_materials_divide_by_material(denominator_type):
+    numerator = SparseMaterials(a=1, b=2, c=3, d=4, e=5, f=6)
+    denominator = denominator_type(e=2, f=1)
+
+    assert numerator / denominator == 2.5
+    assert numerator // denominator == 2
+    assert SparseMaterials(e=5) / denominator == 0
+
+    with pytest.raises(ZeroDivisionError):
+        numerator / denominator_type()
+
+    with pytest.raises(ZeroDivisionError):
+        numerator // denominator_type()
+
+
+def test_sparse_materials_equality():
+    assert SparseMaterials(a=1, b=2) == ArrayMaterials(a=1, b=2)
+    assert ArrayMaterials(a=1, b=2) == SparseMaterials(a=1, b=2)
+    assert hash(SparseMaterials(a=1, b=2)) == hash(ArrayMaterials(a=1, b=2))
+    assert SparseMaterials(a=1) != SparseMaterials(a=2)
+
+
+def test_sparse_materials_csr():
+    mats = SparseMaterials(b=2, e=5)
+    row = mats.to_csr()
+
+    assert row.shape == (1, len(ArrayMaterials.material_names()))
+    assert np.array_equal(row.toarray()[0], mats.to_array())
+    assert SparseMaterials.from_csr(row) == mats
+    assert np.array_equal(Materials(b=2, e=5).to_csr().toarray(), row.toarray())
@@ -0,0 +1,200 @@
+import asyncio
+import importlib.util
+import re
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import satisfactory_tools
+from satisfactory_tools.categorized_collection import CategorizedCollection
+
+KEYS = [f"item{i:03}" for i in range(200)]
+HEIGHT = 120
+ROW_HEIGHT = 40
+
+
+class _Switch:
+    def __init__(self, on_change=None):
+        self.text = ""
+        self.value = False
+        self.visible = True
+        self._on_change = on_change
+
+    def style(self, style):
+        return self
+
+    def set_text(self, text):
+        self.text = text
+
+    def set_value(self, value):
+        # like nicegui, a changed value fires on_change, also when set from code
+        if value != self.value:
+            self.value = value
+            if self._on_change is not None:
+                self._on_change(SimpleNamespace(value=value))
+
+    def set_visibility(self, visible):
+        self.visible = visible
+
+    def click(self):
+        self.set_value(not self.value)
+
+
+class _Element:
+    def __init__(self):
+        self.height = None
+
+    def style(self, style):
+        if (match := re.fullmatch(r"height: (\d+)px", style)) is not None:
+            self.height = int(match.group(1))
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _UI:
+    """
+    Records the switches and spacers of a virtual selector list, and its scroll handler.
+    """
+    def __init__(self):
+        self.switches = []
+        self.spacers = []
+        self.on_scroll = None
+
+    def scroll_area(self, on_scroll):
+        self.on_scroll = on_scroll
+        return _Element()
+
+    def element(self, tag):
+        spacer = _Element()
+        self.spacers.append(spacer)
+        return spacer
+
+    def switch(self, on_change=None):
+        switch = _Switch(on_change)
+        self.switches.append(switch)
+        return switch
+
+    def scroll(self, row):
+        self.on_scroll(SimpleNamespace(vertical_position=row * ROW_HEIGHT))
+
+    def shown(self):
+        return [switch.text for switch in self.switches if switch.visible]
+
+    def spacer_heights(self):
+        top, bottom = self.spacers
+        return top.height, bottom.height
+
+
+def _extract(query, choices, limit=None):
+    return [(choice, 100 if query in choice else 0) for choice in choices]
+
+
+@pytest.fixture
+def widgets(monkeypatch):
+    # importing the ui package runs the demo app, so load the module on its own, with stand-ins for
+    # the nicegui and thefuzz imports; rendering goes through the stub ui passed to each call
+    monkeypatch.setitem(sys.modules, "nicegui", types.ModuleType("nicegui"))
+    monkeypatch.setattr(sys.modules["nicegui"], "ui", _UI, raising=False)
+    monkeypatch.setitem(sys.modules, "thefuzz", types.ModuleType("thefuzz"))
+    monkeypatch.setattr(sys.modules["thefuzz"], "process", SimpleNamespace(extract=_extract),
+                        raising=False)
+
+    path = Path(satisfactory_tools.__file__).parent / "ui" / "widgets.py"
+    spec = importlib.util.spec_from_file_location("satisfactory_tools.ui.widgets", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def picker(widgets):
+    elements = CategorizedCollection({key: i for i, key in enumerate(KEYS)},
+                                     {"fives": {KEYS[i] for i in range(0, 200, 5)},
+                                      "evens": {KEYS[i] for i in range(0, 200, 2)}})
+    picker = widgets.Picker(elements)
+    picker.debounce = 0
+    return picker
+
+
+@pytest.fixture
+def ui(picker):
+    ui = _UI()
+    picker.render_virtual_selectors(ui, height=HEIGHT)
+    return ui
+
+
+def _filter(picker, search):
+    asyncio.run(picker._debounced_filter(search))
+
+
+def test_virtual_rows_cover_list(picker, ui):
+    rows = HEIGHT // ROW_HEIGHT + 2 * picker.buffer_rows
+
+    assert len(ui.switches) == rows
+    assert ui.shown() == KEYS[:rows]
+    assert ui.spacer_heights() == (0, (len(KEYS) - rows) * ROW_HEIGHT)
+
+    ui.scroll(50)
+
+    assert ui.shown() == KEYS[45:45 + rows]
+    top, bottom = ui.spacer_heights()
+    assert top + rows * ROW_HEIGHT + bottom == len(KEYS) * ROW_HEIGHT
+
+
+def test_scroll_reuses_rows_without_stale_selections(picker, ui):
+    ui.switches[3].click()
+    picker._select({KEYS[50]: True})
+
+    # row 3 shows an unselected key after the scroll, and another row shows the selected KEYS[50]
+    ui.scroll(50)
+
+    assert ui.switches[3].text != KEYS[3]
+    assert picker._selection.selected == {KEYS[3], KEYS[50]}
+    assert [switch.text for switch in ui.switches if switch.value] == [KEYS[50]]
+
+    ui.scroll(0)
+
+    assert picker._selection.selected == {KEYS[3], KEYS[50]}
+    assert [switch.text for switch in ui.switches if switch.value] == [KEYS[3]]
+    assert picker._selection.counts == {"fives": 1, "evens": 1}
+
+
+def test_filter_clamps_window(picker, ui):
+    rows = len(ui.switches)
+    fives = KEYS[::5]
+    ui.scroll(len(KEYS))
+
+    _filter(picker, "fives")
+
+    assert ui.shown() == fives[len(fives) - rows:]
+    assert ui.spacer_heights() == ((len(fives) - rows) * ROW_HEIGHT, 0)
+
+    _filter(picker, "item00")
+
+    assert ui.shown() == KEYS[:10]
+    assert ui.spacer_heights() == (0, 0)
+    assert sum(switch.visible for switch in ui.switches) == 10
+
+
+def test_category_select_toggles_visible_keys(picker, ui):
+    _filter(picker, "fives")
+
+    picker._category_select("evens")
+
+    tens = set(KEYS[::10])
+    assert picker._selection.selected == tens
+    assert picker._selection.counts == {"fives": len(tens), "evens": len(tens)}
+    assert {switch.text for switch in ui.switches if switch.value} == tens & set(ui.shown())
+
+    picker._category_select("evens")
+
+    assert picker._selection.selected == set()
+    assert not any(switch.value for switch in ui.switches)